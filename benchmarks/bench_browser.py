@@ -0,0 +1,208 @@
+"""Browser performance of generated menus, measured in Chromium with Playwright.
+
+Needs Playwright (pip install playwright && playwright install chromium). Run from the repo root:
+    python benchmarks/bench_browser.py                         # 1k, 5k and 20k rows, both page types
+    python benchmarks/bench_browser.py --rows 50000 --modes virtual
+
+For every synthetic sheet size and page type it records:
+  first_paint_ms      first contentful paint
+  interactive_ms      DOMContentLoaded, or the end of the last long task (>50ms) if later
+  search_ms           keystroke to the next painted frame, 120ms input debounce included (p50/p95)
+  add_to_cart_ms      time spent in updateQty (which runs updateUI) per "+" click (p50/p95)
+  add_to_cart_paint_ms  "+" click to the next painted frame (p50/p95)
+  cart_modal_ms       time spent in renderCartItems opening a cart of 50 items
+  cart_modal_paint_ms   checkout bar click to the modal's first painted frame
+
+The numbers and any threshold failures go to a JSON report (--report); the run exits with
+status 1 if a threshold in benchmarks/browser_thresholds.json is exceeded.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from menu_core import convert_data_to_html
+from generate_sample import write_synthetic_csv
+from playwright.sync_api import sync_playwright
+
+THRESHOLDS_PATH = os.path.join(ROOT, "benchmarks", "browser_thresholds.json")
+REPORT_PATH = os.path.join(ROOT, ".cache", "browser_perf.json")
+CART_ITEMS = 50
+SEARCH_TERMS = ["v", "", "soup", "", "pitts", "", "zzz", "", "honey raw", ""]
+ADD_CLICKS = 20
+
+# --- IN-PAGE PROBES ---
+# Installed before any page script runs. Only events and globals the page already has are used,
+# so the probes work on any version of the template.
+PROBES = """
+window.__cgLongTasks = [];
+try {
+    new PerformanceObserver(list => { for (const t of list.getEntries()) window.__cgLongTasks.push(t.startTime + t.duration); })
+        .observe({ type: 'longtask', buffered: true });
+} catch (e) {}
+
+// Resolves after the frame following the current task has been painted
+window.__cgNextPaint = () => new Promise(resolve => requestAnimationFrame(() => setTimeout(resolve, 0)));
+
+// Times a global function (updateQty, renderCartItems, ...) each time the page calls it
+window.__cgTimings = {};
+window.__cgWrap = (name) => {
+    const original = window[name];
+    if (typeof original !== 'function' || original.__cgWrapped) return;
+    window[name] = function () {
+        const start = performance.now();
+        try { return original.apply(this, arguments); }
+        finally { (window.__cgTimings[name] = window.__cgTimings[name] || []).push(performance.now() - start); }
+    };
+    window[name].__cgWrapped = true;
+};
+
+window.__cgTimeClick = (el) => new Promise(resolve => {
+    const start = performance.now();
+    el.click();
+    window.__cgNextPaint().then(() => resolve(performance.now() - start));
+});
+
+// Search: from the input event to the frame after the rows change (nothing changing is a miss)
+window.__cgTimeSearch = (term) => new Promise(resolve => {
+    const input = document.getElementById('cgSearch');
+    const start = performance.now();
+    const observer = new MutationObserver(() => {
+        observer.disconnect();
+        clearTimeout(timeout);
+        window.__cgNextPaint().then(() => resolve(performance.now() - start));
+    });
+    const timeout = setTimeout(() => { observer.disconnect(); resolve(null); }, 3000);
+    observer.observe(document.getElementById('cgList'), { subtree: true, childList: true, attributes: true, attributeFilter: ['style'] });
+    input.value = term;
+    input.dispatchEvent(new Event('input', { bubbles: true }));
+    input.dispatchEvent(new KeyboardEvent('keyup', { bubbles: true }));
+});
+"""
+
+LOAD_METRICS = """() => new Promise(resolve => setTimeout(() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const paint = performance.getEntriesByName('first-contentful-paint')[0] || performance.getEntriesByName('first-paint')[0];
+    const lastLongTask = Math.max(0, ...window.__cgLongTasks);
+    resolve({
+        first_paint_ms: paint ? paint.startTime : null,
+        interactive_ms: Math.max(nav.domContentLoadedEventEnd, lastLongTask),
+    });
+}, 1000))"""
+
+def percentile(values, fraction):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def measure_page(browser, url):
+    page = browser.new_page()
+    page.add_init_script(PROBES)
+    page.goto(url, wait_until="load")
+    # Quiet period after load, so long tasks from the page's own setup are counted
+    result = page.evaluate(LOAD_METRICS)
+    page.evaluate("() => ['updateQty', 'updateUI', 'renderCartItems'].forEach(window.__cgWrap)")
+
+    search = []
+    for term in SEARCH_TERMS:
+        search.append(page.evaluate("(term) => window.__cgTimeSearch(term)", term))
+    result['search_ms'] = {'p50': percentile(search, 0.5), 'p95': percentile(search, 0.95),
+                           'missed': sum(1 for s in search if s is None)}
+
+    paint = []
+    for _ in range(ADD_CLICKS):
+        paint.append(page.evaluate(
+            "() => { const b = document.querySelector('.cg-add-btn'); return b ? window.__cgTimeClick(b) : null; }"))
+    handler = page.evaluate("() => window.__cgTimings.updateQty || []")
+    result['add_to_cart_ms'] = {'p50': percentile(handler, 0.5), 'p95': percentile(handler, 0.95)}
+    result['add_to_cart_paint_ms'] = {'p50': percentile(paint, 0.5), 'p95': percentile(paint, 0.95)}
+
+    # Fill the cart to CART_ITEMS lines, then time opening the modal
+    page.evaluate("""(n) => {
+        const buttons = Array.from(document.querySelectorAll('.cg-add-btn')).slice(0, n);
+        buttons.forEach(b => b.click());
+    }""", CART_ITEMS - ADD_CLICKS)
+    page.evaluate("() => { window.__cgTimings.renderCartItems = []; }")
+    result['cart_modal_paint_ms'] = page.evaluate(
+        "() => window.__cgTimeClick(document.getElementById('checkoutBar'))")
+    render = page.evaluate("() => window.__cgTimings.renderCartItems || []")
+    result['cart_modal_ms'] = render[0] if render else None
+    result['cart_lines'] = page.evaluate("() => document.querySelectorAll('#cartList .cg-cart-item').length")
+    page.close()
+    return result
+
+# --- THRESHOLDS ---
+def flatten(result):
+    """{'search_ms': {'p95': 1}} -> {'search_ms.p95': 1}"""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            for sub, v in value.items():
+                flat[f"{key}.{sub}"] = v
+        else:
+            flat[key] = value
+    return flat
+
+def check_thresholds(case, result, thresholds):
+    """Limits come from thresholds["*"], overridden per case ("static@20000", ...)."""
+    limits = {**thresholds.get("*", {}), **thresholds.get(case, {})}
+    flat = flatten(result)
+    return [f"{case}: {metric} = {flat[metric]:.1f} > {limit}"
+            for metric, limit in limits.items() if flat.get(metric) is not None and flat[metric] > limit]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure generated menus in a real browser.")
+    parser.add_argument("--rows", default="1000,5000,20000", help="Comma-separated sheet sizes")
+    parser.add_argument("--modes", default="static,virtual", help="Comma-separated page types")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH, help="Threshold file")
+    parser.add_argument("--report", default=REPORT_PATH, help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    with open(args.thresholds, "r", encoding="utf-8") as f:
+        thresholds = json.load(f)
+
+    results, failures = {}, []
+    with tempfile.TemporaryDirectory() as tmp, sync_playwright() as p:
+        browser = p.chromium.launch()
+        for n_rows in (int(n) for n in args.rows.split(",")):
+            text = io.StringIO()
+            write_synthetic_csv(text, n_rows)
+            for mode in args.modes.split(","):
+                case = f"{mode}@{n_rows}"
+                path = os.path.join(tmp, f"{case}.html")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(convert_data_to_html(io.StringIO(text.getvalue()), mode=mode))
+                result = results[case] = measure_page(browser, f"file://{path}")
+                failures += check_thresholds(case, result, thresholds)
+                flat = flatten(result)
+                print(f"{case:<16} paint {flat['first_paint_ms'] or 0:7.0f}  interactive {flat['interactive_ms']:7.0f}  "
+                      f"search p95 {flat['search_ms.p95'] or 0:6.0f}  add p95 {flat['add_to_cart_paint_ms.p95'] or 0:5.0f}  "
+                      f"cart {flat['cart_modal_paint_ms'] or 0:5.0f}  (ms)")
+        browser_version = browser.version
+        browser.close()
+
+    report = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'browser': f"chromium {browser_version}",
+        'machine': platform.platform(),
+        'thresholds': thresholds,
+        'results': results,
+        'failures': failures,
+    }
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nReport written to {args.report}")
+    for line in failures:
+        print(f"❌ {line}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Memory per item: Catalog records (__slots__, integer cents) vs. the old per-item dicts.
+
+Run from the repo root:
+    python benchmarks/bench_catalog_memory.py [copies]
+
+The sheet is repeated `copies` times (default 50) so the per-item numbers aren't dominated
+by fixed costs.
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from menu_core import Catalog, parse_catalog, iter_catalog_rows, scan_price, Section
+
+INPUT_CSV = "Core Goods Product List - Sheet1.csv"
+
+def parse_row_dicts(row):
+    """The pre-catalog representation: one dict per product plus a p_info dict."""
+    base_name = row[0].replace('"', '&quot;')
+    raw_price_str = row[1] if len(row) > 1 else ""
+    notes = " ".join(row[2:]) if len(row) > 2 else ""
+    row_info, size_matches = scan_price(raw_price_str)
+    if len(size_matches) > 1:
+        return [{'name': f"{base_name} ({size_lbl})", 'price_str': f"${price_val}", 'notes': notes,
+                 'p_info': {'std': float(price_val), 'bulk': 0.0, 'thresh': 0}}
+                for price_val, size_lbl in size_matches]
+    return [{'name': base_name, 'price_str': raw_price_str, 'notes': notes, 'p_info': row_info}]
+
+def parse_dicts(file_obj):
+    sections = [[None, []]]
+    for record in iter_catalog_rows(file_obj):
+        if isinstance(record, Section):
+            sections.append([(record.title, record.sid), []])
+        else:
+            sections[-1][1].extend(parse_row_dicts(record))
+    return sections
+
+def measure(build, text):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(io.StringIO(text))
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with open(INPUT_CSV, "r", encoding="utf-8") as f:
+        text = f.read() * copies
+
+    dicts, dict_bytes, dict_time = measure(parse_dicts, text)
+    catalog, catalog_bytes, catalog_time = measure(parse_catalog, text)
+    n_items = sum(1 for _ in catalog.items())
+    assert n_items == sum(len(items) for _, items in dicts)
+
+    blob = catalog.to_bytes()
+    js = catalog.to_json()
+    assert Catalog.from_bytes(blob).to_json() == js
+
+    print(f"{n_items} items ({copies} copies of the sheet)")
+    print(f"  dicts   : {dict_bytes / n_items:7.1f} bytes/item, parse {dict_time * 1000:7.1f} ms")
+    print(f"  catalog : {catalog_bytes / n_items:7.1f} bytes/item, parse {catalog_time * 1000:7.1f} ms")
+    print(f"  saving  : {1 - catalog_bytes / dict_bytes:.0%}")
+    print(f"  serialized: JSON {len(js) / n_items:.1f} bytes/item, binary {len(blob) / n_items:.1f} bytes/item")
+
+if __name__ == "__main__":
+    main()
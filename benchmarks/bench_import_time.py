@@ -0,0 +1,64 @@
+"""Cold-start cost of importing the engine: menu_core on its own vs. with Streamlit loaded.
+
+Run from the repo root:
+    python benchmarks/bench_import_time.py [runs]
+
+Every import happens in a fresh interpreter (default 15 runs per case; the median counts), so
+nothing is already cached in sys.modules. "streamlit + menu_core" is what any script importing
+convert_menu paid before the engine was split out, when convert_menu imported Streamlit at the top.
+"""
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Runs in the child: time the imports, then report the child's own peak memory
+CHILD = """
+import time, resource, json
+start = time.perf_counter()
+{imports}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+CASES = {
+    "python (nothing)": "",
+    "menu_core": "import menu_core",
+    "convert_menu": "import convert_menu",
+    "streamlit + menu_core": "import streamlit\nimport menu_core",
+}
+
+def run_case(imports, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", CHILD.format(imports=imports)], cwd=ROOT,
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        samples.append(json.loads(out.stdout))
+    return samples, None
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    print(f"{'imports':<24}{'median ms':>11}{'min ms':>9}{'peak RSS MB':>13}")
+    medians = {}
+    for label, imports in CASES.items():
+        samples, error = run_case(imports, runs)
+        if samples is None:
+            print(f"{label:<24}  skipped: {error}")
+            continue
+        times = [s['seconds'] * 1000 for s in samples]
+        medians[label] = statistics.median(times)
+        rss = statistics.median(s['max_rss_kb'] for s in samples) / 1024
+        print(f"{label:<24}{medians[label]:>11.1f}{min(times):>9.1f}{rss:>13.1f}")
+
+    if "streamlit + menu_core" in medians:
+        saved = medians["streamlit + menu_core"] - medians["menu_core"]
+        print(f"\nImporting the engine without Streamlit saves {saved:.0f} ms per process "
+              f"({medians['streamlit + menu_core'] / medians['menu_core']:.0f}x faster).")
+
+if __name__ == "__main__":
+    main()
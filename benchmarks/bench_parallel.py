@@ -0,0 +1,58 @@
+"""Speedup of convert_parallel over the serial converter, by number of worker processes.
+
+Run from the repo root:
+    python benchmarks/bench_parallel.py                 # 100k-row synthetic sheet
+    python benchmarks/bench_parallel.py --rows 500000
+
+Workers go 1, 2, 4, ... up to the machine's core count (which is printed: the speedup can't
+beat it). Every parallel page is checked against the serial one, byte for byte.
+"""
+import io
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from menu_core import convert_data_to_html, convert_parallel, scan_price_terms
+from generate_sample import write_synthetic_csv
+
+def best_time(func, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        scan_price_terms.cache_clear()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare serial and parallel conversion.")
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic sheet size (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best counts")
+    args = parser.parse_args(argv)
+
+    text = io.StringIO()
+    write_synthetic_csv(text, args.rows)
+    csv_text = text.getvalue()
+    cores = os.cpu_count() or 1
+
+    serial, expected = best_time(lambda: convert_data_to_html(io.StringIO(csv_text)), args.repeat)
+    print(f"{args.rows:,} rows, {cores} cores")
+    print(f"{'workers':<10}{'seconds':>10}{'speedup':>10}")
+    print(f"{'serial':<10}{serial:>10.2f}{1:>10.2f}")
+    workers = 1
+    while True:
+        seconds, page = best_time(lambda: convert_parallel(io.StringIO(csv_text), workers), args.repeat)
+        if page != expected:
+            print(f"❌ {workers} workers: output differs from the serial page")
+            return 1
+        print(f"{workers:<10}{seconds:>10.2f}{serial / seconds:>10.2f}")
+        if workers >= cores:
+            break
+        workers = min(workers * 2, cores)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
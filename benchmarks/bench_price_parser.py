@@ -0,0 +1,89 @@
+"""Microbenchmark: single-pass price tokenizer vs. the old regex waterfall.
+
+Run from the repo root:
+    python benchmarks/bench_price_parser.py
+"""
+import csv
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from menu_core import scan_price, scan_price_terms
+
+INPUT_CSV = "Core Goods Product List - Sheet1.csv"
+
+# --- THE OLD WATERFALL (kept here as the reference implementation) ---
+def legacy_parse_price_info(text):
+    info = {'std': 0.0, 'bulk': 0.0, 'thresh': 0}
+    if not text: return info
+    prices = re.findall(r'\$(\d+\.?\d*)', text)
+    if '+' in text and len(prices) >= 2:
+        info['std'] = float(prices[0])
+        info['bulk'] = float(prices[1])
+        thresh_match = re.search(r'(\d+)\+', text)
+        if thresh_match:
+            info['thresh'] = int(thresh_match.group(1))
+        return info
+    bundle_match = re.search(r'(\d+)\s*(?:/|for)\s*\$(\d+\.?\d*)', text)
+    if bundle_match:
+        qty = int(bundle_match.group(1))
+        total_bundle_price = float(bundle_match.group(2))
+        if len(prices) >= 2 and float(prices[0]) != total_bundle_price:
+            info['std'] = float(prices[0])
+        else:
+            info['std'] = total_bundle_price / qty
+        info['bulk'] = total_bundle_price / qty
+        info['thresh'] = qty
+        return info
+    if len(prices) > 0:
+        info['std'] = float(prices[0])
+        return info
+    raw_match = re.search(r'(\d+\.\d{2})', text)
+    if raw_match:
+        info['std'] = float(raw_match.group(1))
+    return info
+
+def legacy_scan(text):
+    # convert_data_to_html used to run the size findall first, then the waterfall
+    size_matches = re.findall(r'\$?(\d+(?:\.\d{2})?)\s*(sm|lg|small|large|pt|qt|pint|quart|half|whole)\b', text, re.IGNORECASE)
+    return legacy_parse_price_info(text), size_matches
+
+def load_price_cells(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [row[1].strip() for row in csv.reader(f) if len(row) > 1]
+
+def main():
+    cells = load_price_cells(INPUT_CSV)
+    extra = ["2/$5.99", "2 for $5", "$3 each / 6 for $15", "approx $4.50 / lb", "4.99",
+             "$6 half pt, $11 pt (+$1.50 jar deposit)", "$2.00/each or $1.65/each for 6+"]
+    cells += extra
+
+    # Same answers first, then speed
+    for text in cells:
+        info, sizes = scan_price(text)
+        old_info, old_sizes = legacy_scan(text)
+        assert info == old_info and sizes == old_sizes, text
+
+    number = 200
+    old_t = min(timeit.repeat(lambda: [legacy_scan(c) for c in cells], number=number, repeat=5))
+    # The parser itself, without the per-cell memo
+    parse_uncached = scan_price_terms.__wrapped__
+    new_t = min(timeit.repeat(lambda: [parse_uncached(c) for c in cells], number=number, repeat=5))
+    per_cell = number * len(cells)
+
+    # One pass over the sheet, the way a conversion sees it: repeated cells hit the memo
+    def one_pass():
+        scan_price_terms.cache_clear()
+        for c in cells:
+            scan_price(c)
+    memo_t = min(timeit.repeat(one_pass, number=number, repeat=5))
+
+    print(f"{len(cells)} price cells ({len(set(cells))} distinct) x {number} runs")
+    print(f"  regex waterfall       : {old_t / per_cell * 1e6:6.2f} µs/cell")
+    print(f"  tokenizer             : {new_t / per_cell * 1e6:6.2f} µs/cell  ({old_t / new_t:.2f}x)")
+    print(f"  tokenizer + cell memo : {memo_t / per_cell * 1e6:6.2f} µs/cell  ({old_t / memo_t:.2f}x)")
+
+if __name__ == "__main__":
+    main()
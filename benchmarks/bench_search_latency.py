@@ -0,0 +1,85 @@
+"""Search latency on a large menu: the old per-keystroke scan of every row vs. the prebuilt index.
+
+Needs Playwright (pip install playwright && playwright install chromium). Run from the repo root:
+    python benchmarks/bench_search_latency.py [copies]
+
+The sheet is repeated `copies` times (default 40). Each query is timed from the start of the
+filter work to the next animation frame, so the layout/paint cost of the rows it hides or shows
+is included. The 120ms input debounce is left out: it bounds how often the work runs while
+typing, not how long it takes.
+"""
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from menu_core import convert_data_to_html
+from playwright.sync_api import sync_playwright
+
+INPUT_CSV = "Core Goods Product List - Sheet1.csv"
+# What someone typing "vegan soup" produces, one keystroke at a time, and then clearing it
+QUERIES = ["v", "ve", "veg", "vega", "vegan", "vegan ", "vegan s", "vegan so", "vegan sou",
+           "vegan soup", "", "pitts", "zzz", ""]
+
+# The handler the page used before the index: a substring test and a style write on every row
+OLD_SEARCH = """(term) => {
+    term = term.toLowerCase();
+    document.querySelectorAll('.cg-item-row').forEach(row => {
+        const txt = row.getAttribute('data-search');
+        row.style.display = txt.includes(term) ? 'flex' : 'none';
+    });
+}"""
+
+TIME_QUERIES = """async ([queries, handler]) => {
+    const run = handler === 'index' ? applySearch : eval(handler);
+    const times = [];
+    for (const q of queries) {
+        const start = performance.now();
+        run(q);
+        await new Promise(resolve => requestAnimationFrame(() => resolve()));
+        times.push(performance.now() - start);
+    }
+    return times;
+}"""
+
+def summarize(label, times):
+    times = sorted(times)
+    p50 = times[len(times) // 2]
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"{label:<22} p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   max {times[-1]:7.1f} ms")
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    with open(INPUT_CSV, "r", encoding="utf-8") as f:
+        text = f.read() * copies
+    page_html = convert_data_to_html(io.StringIO(text))
+    with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False, encoding="utf-8") as f:
+        f.write(page_html)
+        path = f.name
+
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            results = {}
+            # A fresh page per handler so one doesn't inherit the other's row styles
+            for label, handler in (("querySelectorAll scan", OLD_SEARCH), ("prebuilt index", "index")):
+                page = browser.new_page()
+                page.goto(f"file://{path}")
+                rows = page.locator(".cg-item-row").count()
+                page.evaluate(TIME_QUERIES, [QUERIES, handler])  # warm-up
+                times = []
+                for _ in range(5):
+                    times += page.evaluate(TIME_QUERIES, [QUERIES, handler])
+                results[label] = times
+                page.close()
+            browser.close()
+    finally:
+        os.unlink(path)
+
+    print(f"{rows} rows ({copies} copies of the sheet), {len(QUERIES)} queries x 5 runs")
+    for label, times in results.items():
+        summarize(label, times)
+
+if __name__ == "__main__":
+    main()
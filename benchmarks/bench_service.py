@@ -0,0 +1,133 @@
+"""Load test for convert_service.py: concurrent clients posting sheets, with latency and throughput.
+
+Run from the repo root:
+    python benchmarks/bench_service.py                          # starts its own service
+    python benchmarks/bench_service.py --requests 500 --concurrency 32 --sheets 50
+    python benchmarks/bench_service.py --url http://127.0.0.1:8765
+
+Requests cycle through --sheets different synthetic sheets, so the first request for each one is
+a real conversion and later ones hit the result cache (--sheets equal to --requests means no hits).
+A last pass sends the ETags back and should get nothing but 304s. Requests turned away with 503
+are counted, not retried: more clients than the service's queue shows its backpressure.
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+from collections import Counter
+from urllib.parse import urlsplit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from generate_sample import write_synthetic_csv
+
+async def request(host, port, method, path, body=b"", headers=None):
+    """(status, headers, body) for one request on its own connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = [f"{method} {path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        status_line, *lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        response_headers = dict(line.split(": ", 1) for line in lines if ": " in line)
+        payload = await reader.readexactly(int(response_headers.get("Content-Length", 0)))
+        return int(status_line.split(" ")[1]), response_headers, payload
+    finally:
+        writer.close()
+
+async def run_load(host, port, sheets, total, concurrency, path, etags=None):
+    """Sends `total` requests with `concurrency` in flight. Returns (seconds, [(status, latency)], etags)."""
+    results, seen = [], {}
+    next_index = iter(range(total))
+
+    async def client():
+        for i in next_index:
+            sheet = i % len(sheets)
+            headers = {'If-None-Match': etags[sheet]} if etags else None
+            start = time.perf_counter()
+            status, response_headers, _ = await request(host, port, "POST", path, sheets[sheet], headers)
+            results.append((status, time.perf_counter() - start))
+            if 'ETag' in response_headers:
+                seen[sheet] = response_headers['ETag']
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, results, seen
+
+def report(label, seconds, results):
+    latencies = sorted(latency for _, latency in results)
+    pick = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(Counter(s for s, _ in results).items()))
+    print(f"{label:<12}{len(results) / seconds:>9.1f}{pick(0.5):>9.1f}{pick(0.95):>9.1f}{pick(0.99):>9.1f}   {statuses}")
+
+async def main_async(args, host, port):
+    sheets = []
+    for seed in range(args.sheets):
+        text = io.StringIO()
+        write_synthetic_csv(text, args.rows, seed)
+        sheets.append(text.getvalue().encode("utf-8"))
+    path = f"/convert?mode={args.mode}"
+
+    print(f"{args.requests} requests, {args.concurrency} at a time, {args.sheets} sheets of {args.rows:,} rows")
+    print(f"{'pass':<12}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}   statuses")
+    seconds, results, etags = await run_load(host, port, sheets, args.requests, args.concurrency, path)
+    report("load", seconds, results)
+    if len(etags) == len(sheets):
+        seconds, results, _ = await run_load(host, port, sheets, args.requests, args.concurrency, path,
+                                             [etags[i] for i in range(len(sheets))])
+        report("if-none-match", seconds, results)
+    _, _, metrics = await request(host, port, "GET", "/metrics")
+    print("\nService metrics:")
+    print(json.dumps(json.loads(metrics), indent=1))
+
+def wait_for(host, port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _, _ = asyncio.run(request(host, port, "GET", "/health"))
+            if status == 200:
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive convert_service.py with concurrent requests.")
+    parser.add_argument("--url", help="A running service (default: start one on --port)")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the service this starts (default: 8766)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for the service this starts")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per pass (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight (default: 16)")
+    parser.add_argument("--sheets", type=int, default=20, help="Different sheets to cycle through (default: 20)")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per synthetic sheet (default: 2000)")
+    parser.add_argument("--mode", default="static", help="Output mode to request (default: static)")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        command = [sys.executable, os.path.join(ROOT, "convert_service.py"), "--port", str(port)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        if not wait_for(host, port):
+            print(f"❌ No service answering on {host}:{port}")
+            return 1
+        asyncio.run(main_async(args, host, port))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Throughput, peak memory and output size of the converter on synthetic sheets of growing size.
+
+Run from the repo root:
+    python benchmarks/bench_suite.py                      # 1k, 10k and 100k rows
+    python benchmarks/bench_suite.py --rows 1000,1000000  # any sizes
+    python benchmarks/bench_suite.py --save-baseline      # record this machine's numbers
+
+When a baseline exists, any case that got slower, or uses more memory or writes more output,
+by more than --tolerance (default 25%) is reported and the run exits with status 1.
+Baselines are per machine, so benchmarks/baseline.json is not checked in.
+"""
+import io
+import os
+import sys
+import csv
+import json
+import math
+import time
+import argparse
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from menu_core import parse_price_info, generate_badges, convert_data_to_html, scan_price_terms
+from generate_sample import write_synthetic_csv
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# --- CASES ---
+# Each case takes the sheet's CSV text and returns (rows processed, output size in bytes)
+def bench_parse_price_info(csv_text):
+    prices = [row[1] for row in csv.reader(io.StringIO(csv_text)) if len(row) > 1]
+    scan_price_terms.cache_clear()  # every run starts as cold as a fresh process
+    for price in prices:
+        parse_price_info(price)
+    return len(prices), 0
+
+def bench_generate_badges(csv_text):
+    notes = [" ".join(row[2:]) for row in csv.reader(io.StringIO(csv_text)) if len(row) > 2]
+    size = 0
+    for text in notes:
+        size += len(generate_badges(text))
+    return len(notes), size
+
+def bench_convert_data_to_html(csv_text):
+    scan_price_terms.cache_clear()
+    page = convert_data_to_html(io.StringIO(csv_text))
+    return csv_text.count("\n"), len(page.encode("utf-8"))
+
+CASES = {
+    "parse_price_info": bench_parse_price_info,
+    "generate_badges": bench_generate_badges,
+    "convert_data_to_html": bench_convert_data_to_html,
+}
+
+MIN_RUN_SECONDS = 0.2
+
+def measure(func, csv_text, repeat):
+    """Best-of-`repeat` throughput, then one more run under tracemalloc for the peak.
+    Small sheets are converted several times per timed run, so timer noise doesn't dominate."""
+    start = time.perf_counter()
+    rows, size = func(csv_text)
+    loops = max(1, math.ceil(MIN_RUN_SECONDS / (time.perf_counter() - start)))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(csv_text)
+        best = min(best, (time.perf_counter() - start) / loops)
+    # Timed separately: tracemalloc slows allocation-heavy code down several times
+    tracemalloc.start()
+    func(csv_text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'rows_per_sec': rows / best, 'peak_kb': peak / 1024, 'output_bytes': size}
+
+# --- BASELINES ---
+# metric -> True when bigger is better
+METRICS = {'rows_per_sec': True, 'peak_kb': False, 'output_bytes': False}
+
+def regressions(result, baseline, tolerance):
+    """Human-readable descriptions of every metric that moved the wrong way by more than `tolerance`."""
+    found = []
+    for metric, higher_is_better in METRICS.items():
+        old, new = baseline.get(metric), result[metric]
+        if not old:
+            continue
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > tolerance:
+            found.append(f"{metric} {old:,.0f} -> {new:,.0f} ({change:+.0%})")
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the converter on synthetic sheets.")
+    parser.add_argument("--rows", default="1000,10000,100000",
+                        help="Comma-separated sheet sizes (default: 1000,10000,100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best counts")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed change against the baseline before a run fails (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Save these results as the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+
+    results = {}
+    failures = []
+    print(f"{'case':<34}{'rows/sec':>14}{'peak KB':>12}{'output KB':>12}")
+    for n_rows in (int(n) for n in args.rows.split(",")):
+        text = io.StringIO()
+        write_synthetic_csv(text, n_rows)
+        csv_text = text.getvalue()
+        for name, func in CASES.items():
+            key = f"{name}@{n_rows}"
+            result = results[key] = measure(func, csv_text, args.repeat)
+            print(f"{key:<34}{result['rows_per_sec']:>14,.0f}{result['peak_kb']:>12,.0f}"
+                  f"{result['output_bytes'] / 1024:>12,.0f}")
+            if key in baseline and not args.save_baseline:
+                for problem in regressions(result, baseline[key], args.tolerance):
+                    failures.append(f"{key}: {problem}")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif failures:
+        print("\nRegressions against the baseline:")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    elif baseline:
+        print("\nNo regressions against the baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""Converts many product-list CSVs at once (several stores, archived weeks).
+
+    python convert_batch.py exports/ "archive/2024-*.csv" --out site/ --workers 4
+
+Each CSV becomes <out>/<name>.html, the same bytes the Streamlit app would produce for it.
+Files whose contents (and the badge/price config) haven't changed since the last run are skipped.
+With --publish the pages are built for hosting instead: shared, content-hashed CSS/JS under
+<out>/assets, minified HTML, and .gz/.br siblings for everything (see publish_page).
+--publish --mode sharded splits very large menus into sections fetched as the customer scrolls.
+--publish --offline adds a service worker, so repeat visits open the page from the browser's cache.
+--images DIR adds product photos, resized into <out>/images (see product_images.py).
+With --watch it keeps running and rebuilds a page whenever its CSV is saved (and every page
+when a photo in the --images folder changes).
+--history DB records every sheet's prices (see price_history.py) and marks the ones that changed.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from menu_core import (convert_data_to_html, open_upload, map_input, result_key, publish_page, parse_catalog,
+                      format_publish_report, FragmentCache, PUBLISH_MODES, _atomic_write_text)
+from price_history import PriceHistory, describe_input
+from product_images import ImageLibrary
+
+# Remembers the input hash behind each output file, for skipping unchanged inputs
+MANIFEST_NAME = ".convert_batch.json"
+
+def find_inputs(patterns):
+    """CSV paths for a mix of files, directories (their *.csv) and glob patterns, without duplicates."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "*.csv"))
+        elif glob.has_magic(pattern):
+            matches = glob.glob(pattern)
+        else:
+            matches = [pattern]
+        paths.extend(sorted(matches))
+    return list(dict.fromkeys(os.path.normpath(p) for p in paths))
+
+def output_path(csv_path, out_dir):
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(csv_path))[0] + ".html")
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def record_prices(history, csv_path, data, fragment_cache=None):
+    """Adds the sheet's prices to the history file and returns the changes to mark on the page."""
+    menu, week = describe_input(csv_path)
+    with open_upload(data) as stream:
+        catalog = parse_catalog(stream, fragment_cache)
+    with PriceHistory(history) as store:
+        store.record(menu, week, catalog)
+        return store.price_changes(menu, week)
+
+def record_file(csv_path, history):
+    """Records one CSV's prices without converting it: the first pass of a batch with a history."""
+    with map_input(csv_path) as data:
+        record_prices(history, csv_path, data)
+
+def changes_version(changes):
+    """A hash of the marked prices, for the skip key: an unchanged sheet gets a new page when an
+    earlier week is recorded or edited."""
+    listed = sorted([name] + before.to_list() for name, before in changes.items())
+    return hashlib.sha256(json.dumps(listed).encode("utf-8")).hexdigest()[:12]
+
+def convert_file(csv_path, out_path, mode="static", previous_key=None, publish=False, fragment_cache=None,
+                 history=None, offline=False, images=None, compare=True, changes=None):
+    """Converts one CSV. Runs in a worker process, so it only takes and returns plain values
+    (a FragmentCache is only passed in watch mode, where everything runs in one process).
+    With a `history` file path the prices are recorded there and changed ones are marked;
+    `changes` are ones run_batch has already read back, so the sheet isn't recorded a second time.
+    `offline` adds a service worker and manifest to a published page, and `images`, a folder of
+    product photos, adds them (processed beforehand by run_batch or the Watcher, so this only
+    reads their index).
+    compare=False skips the single-file size comparison in the publish report (see publish_page).
+
+    Returns {'key', 'skipped', 'seconds', 'bytes', 'report', 'changes'}; 'report' is the publish
+    report, if any, and 'changes' the number of marked prices."""
+    start = time.perf_counter()
+    library = ImageLibrary(images, os.path.dirname(out_path)).load() if images else None
+    # Mapped, not read: the hash and the parser both work on the page cache's copy of the file
+    with map_input(csv_path) as data:
+        if history and changes is None:
+            changes = record_prices(history, csv_path, data, fragment_cache)
+        key = result_key(data, mode + ("+publish" if publish else "") + ("+offline" if offline else "")
+                         + (f"+history:{changes_version(changes)}" if history else "")
+                         + (f"+images:{library.version()}" if library else ""))
+        if key == previous_key and os.path.exists(out_path):
+            return {'key': key, 'skipped': True, 'seconds': time.perf_counter() - start, 'bytes': 0, 'report': None,
+                    'changes': 0}
+        if publish:
+            out_dir, file_name = os.path.split(out_path)
+            report = publish_page(data, out_dir, os.path.splitext(file_name)[0], mode, fragment_cache, changes,
+                                  offline, library, compare)
+            size = report['artifacts'][file_name]['raw']
+            report = format_publish_report(report)
+        else:
+            with open_upload(data) as stream:
+                page = convert_data_to_html(stream, fragment_cache, mode=mode, price_changes=changes, images=library)
+            _atomic_write_text(out_path, page)
+            size, report = len(page.encode("utf-8")), None
+    return {'key': key, 'skipped': False, 'seconds': time.perf_counter() - start, 'bytes': size, 'report': report,
+            'changes': len(changes or ())}
+
+def output_paths(inputs, out_dir):
+    outputs = {path: output_path(path, out_dir) for path in inputs}
+    if len(set(outputs.values())) != len(outputs):
+        raise ValueError("Two inputs have the same file name and would overwrite each other's page")
+    return outputs
+
+def save_manifest(out_dir, manifest):
+    _atomic_write_text(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=1, sort_keys=True))
+
+def run_batch(inputs, out_dir, workers=None, mode="static", force=False, publish=False, log=print, history=None,
+              offline=False, images=None):
+    """Converts `inputs` into `out_dir` with a pool of `workers` processes.
+
+    Returns {csv_path: result dict or {'error': message}}, in input order."""
+    outputs = output_paths(inputs, out_dir)
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(out_dir)
+    results = {}
+    if images:
+        # Once, before the pool starts, so workers don't process the same new photos side by side
+        library = ImageLibrary(images, out_dir).update(workers)
+        for name, error in library.errors.items():
+            log(f"❌ {os.path.join(images, name)}: {error}")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        marked = {}
+        if history:
+            # Every sheet is recorded before any page is built, so a page isn't compared against
+            # a history that another worker is still filling in (archived weeks converted together)
+            recorded = {path: pool.submit(record_file, path, history) for path in inputs}
+            # Then the changes are read back here, so the workers don't parse and record again.
+            # A sheet that couldn't be recorded fails the same way below, which reports it.
+            with PriceHistory(history) as store:
+                marked = {path: store.price_changes(*describe_input(path))
+                          for path, future in recorded.items() if future.exception() is None}
+        futures = {
+            pool.submit(convert_file, path, out, mode, manifest.get(os.path.basename(out)), publish, None, history,
+                        offline, images, True, marked.get(path)): path
+            for path, out in outputs.items()
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                results[path] = {'error': f"{type(e).__name__}: {e}"}
+                log(f"❌ {path}: {results[path]['error']}")
+                continue
+            results[path] = result
+            manifest[os.path.basename(outputs[path])] = result['key']
+            if result['skipped']:
+                log(f"   {path}: unchanged, skipped")
+            else:
+                changes = f", {result['changes']} price changes" if history else ""
+                log(f"✅ {path} -> {outputs[path]} ({result['bytes'] / 1024:.0f} KB, {result['seconds']:.2f}s{changes})")
+                if result['report']:
+                    log(result['report'])
+
+    save_manifest(out_dir, manifest)
+    return {path: results[path] for path in inputs}
+
+# --- WATCH MODE ---
+# Polls the inputs rather than using OS file events: it needs nothing beyond the standard
+# library and behaves the same on every platform and on network drives.
+WATCH_INTERVAL = 0.5   # seconds between polls
+WATCH_DEBOUNCE = 1.0   # a file has to stop changing for this long before it is rebuilt
+FRAGMENT_DIR = ".fragments"
+
+def snapshot(patterns):
+    """{csv path: (mtime_ns, size)} for every input that exists right now."""
+    found = {}
+    for path in find_inputs(patterns):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        found[path] = (st.st_mtime_ns, st.st_size)
+    return found
+
+class Watcher:
+    """Rebuilds the page of each input that changes, one at a time, in this process.
+
+    A save usually shows up as several writes, so a file is only rebuilt once it has been
+    quiet for `debounce` seconds. Each input keeps a FragmentCache between rebuilds, so only
+    the rows that were edited are parsed and rendered again. With `images`, the photo folder is
+    watched too: once it settles after a change, the photos are processed and every page rebuilt."""
+
+    def __init__(self, patterns, out_dir, mode="static", publish=False, debounce=WATCH_DEBOUNCE, log=print,
+                 history=None, offline=False, images=None):
+        self.patterns = patterns
+        self.out_dir = out_dir
+        self.mode = mode
+        self.publish = publish
+        self.history = history
+        self.offline = offline
+        self.images = images
+        self.debounce = debounce
+        self.log = log
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest = load_manifest(out_dir)
+        self.fragments = {}
+        self.seen = snapshot(patterns)
+        # Everything is checked once at startup; unchanged inputs are skipped by the manifest
+        self.changed = dict.fromkeys(self.seen, float("-inf"))
+        self.photos = self.photos_changed = None
+        if images:
+            self.photos = snapshot([os.path.join(glob.escape(images), "*")])
+            self.update_photos()
+
+    def poll(self, now=None):
+        """Looks for changes and rebuilds the inputs that have settled. Returns their paths."""
+        now = time.monotonic() if now is None else now
+        current = snapshot(self.patterns)
+        for path, signature in current.items():
+            if self.seen.get(path) != signature:
+                self.seen[path] = signature
+                self.changed[path] = now  # every new write restarts the wait
+        if self.images:
+            photos = snapshot([os.path.join(glob.escape(self.images), "*")])
+            if photos != self.photos:
+                self.photos, self.photos_changed = photos, now
+            elif self.photos_changed is not None and now - self.photos_changed >= self.debounce:
+                self.photos_changed = None
+                self.update_photos()
+                # Rebuilt now, like at startup: pages whose photos didn't change are skipped
+                self.changed.update(dict.fromkeys(current, float("-inf")))
+        ready = [path for path, since in self.changed.items() if path in current and now - since >= self.debounce]
+        for path in [path for path in self.changed if path not in current]:
+            del self.changed[path]
+        if not ready:
+            return []
+        try:
+            outputs = output_paths(current, self.out_dir)
+        except ValueError as e:
+            self.log(f"❌ {e}")
+            return []
+        for path in ready:
+            startup = self.changed.pop(path) == float("-inf")
+            self.rebuild(path, outputs[path], startup)
+        return ready
+
+    def update_photos(self):
+        try:
+            library = ImageLibrary(self.images, self.out_dir).update()
+        except (OSError, ImportError) as e:
+            self.log(f"❌ {self.images}: {e}")
+            return
+        for name, error in library.errors.items():
+            self.log(f"❌ {os.path.join(self.images, name)}: {error}")
+
+    def rebuild(self, path, out_path, startup=False):
+        name = os.path.basename(out_path)
+        cache = self.fragments.get(path)
+        if cache is None:
+            cache_path = os.path.join(self.out_dir, FRAGMENT_DIR, os.path.splitext(name)[0] + ".json")
+            cache = self.fragments[path] = FragmentCache(cache_path)
+        cache.next_run()
+        try:
+            result = convert_file(path, out_path, self.mode, self.manifest.get(name), self.publish, cache, self.history,
+                                  self.offline, self.images, compare=False)
+        except Exception as e:
+            self.log(f"❌ {path}: {type(e).__name__}: {e}")
+            return
+        if result['skipped']:
+            self.log(f"   {path}: unchanged, skipped")
+            return
+        cache.save()
+        self.manifest[name] = result['key']
+        save_manifest(self.out_dir, self.manifest)
+        message = f"✅ {path} -> {out_path} in {result['seconds']:.2f}s"
+        if not startup:
+            # From the save that triggered the rebuild to the new page being in place
+            message += f", {time.time() - self.seen[path][0] / 1e9:.2f}s after the save"
+        self.log(f"{message} ({cache.summary()})")
+        if result['report']:
+            self.log(result['report'])
+
+    def run(self, interval=WATCH_INTERVAL):
+        self.log(f"Watching {', '.join(self.patterns)} (Ctrl+C to stop)")
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert many product-list CSVs to menu pages in parallel.")
+    parser.add_argument("inputs", nargs="+", help="CSV files, directories of CSVs, or glob patterns")
+    parser.add_argument("--out", default="site", help="Output directory (default: site)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--mode", choices=PUBLISH_MODES, default="static",
+                        help="Page type (default: static); sharded needs --publish")
+    parser.add_argument("--force", action="store_true", help="Convert every file, even unchanged ones")
+    parser.add_argument("--publish", action="store_true",
+                        help="Build for hosting: separate hashed CSS/JS, minified HTML, .gz/.br files")
+    parser.add_argument("--offline", action="store_true",
+                        help="With --publish: add a service worker so repeat visits load from the browser's cache")
+    parser.add_argument("--images", metavar="DIR",
+                        help="Add product photos from this folder, named after the items (see product_images.py)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and rebuild each page whenever its CSV (or, with --images, a photo) changes")
+    parser.add_argument("--history", metavar="DB",
+                        help="Record prices in this SQLite file and mark the ones that changed since last week")
+    args = parser.parse_args(argv)
+    if args.mode == "sharded" and not args.publish:
+        parser.error("--mode sharded writes a site of several files for a web server; add --publish")
+    if args.offline and not args.publish:
+        parser.error("--offline needs the page served over HTTP(S) by a web server; add --publish")
+    if args.images and not os.path.isdir(args.images):
+        parser.error(f"--images: {args.images} isn't a folder")
+
+    if args.watch:
+        try:
+            Watcher(args.inputs, args.out, args.mode, args.publish, history=args.history, offline=args.offline,
+                    images=args.images).run()
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        return 0
+
+    inputs = find_inputs(args.inputs)
+    if not inputs:
+        print("❌ Error: No CSV files found")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        results = run_batch(inputs, args.out, args.workers, args.mode, args.force, args.publish, history=args.history,
+                            offline=args.offline, images=args.images)
+    except (ValueError, ImportError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    converted = [r for r in results.values() if 'error' not in r and not r['skipped']]
+    skipped = sum(1 for r in results.values() if r.get('skipped'))
+    failed = sum(1 for r in results.values() if 'error' in r)
+    busy = sum(r['seconds'] for r in converted)
+    print(f"\n{len(converted)} converted, {skipped} unchanged, {failed} failed in {elapsed:.2f}s "
+          f"({busy:.2f}s of conversion work)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
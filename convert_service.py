@@ -0,0 +1,272 @@
+"""A local HTTP service that converts sheets for scripts, other stores' tools, etc.
+
+    python convert_service.py --port 8765 --workers 4
+
+    curl --data-binary @sheet.csv http://127.0.0.1:8765/convert > menu.html
+    curl --data-binary @sheet.csv "http://127.0.0.1:8765/convert?mode=virtual" > menu.html
+    curl --data-binary @sheet.csv http://127.0.0.1:8765/catalog         # the parsed Catalog as JSON
+    curl http://127.0.0.1:8765/metrics
+
+Conversions run in a pool of worker processes, so a big sheet doesn't hold up the others. Only
+so many may wait for a worker (--queue); past that the service answers 503 with Retry-After
+instead of queueing without bound. Results are cached by a hash of the input, the config and
+the page templates (result_key), and that hash is the ETag: a client that sends it back in
+If-None-Match gets a 304 without anything being converted, until the sheet or the service's
+version of the page changes. benchmarks/bench_service.py drives it with concurrent requests.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import deque, Counter
+from urllib.parse import urlsplit, parse_qs
+from menu_core import (convert_data_to_html, parse_catalog, open_upload, check_input_size, result_key,
+                       ResultCache, OUTPUT_MODES, MAX_INPUT_BYTES)
+
+DEFAULT_PORT = 8765
+MAX_HEADER_BYTES = 16 * 1024
+METRICS_WINDOW = 60   # seconds of requests that throughput is measured over
+LATENCY_SAMPLES = 2048
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+CONTENT_TYPES = {'convert': "text/html; charset=utf-8", 'catalog': "application/json"}
+
+def convert_bytes(kind, data, mode):
+    """Runs in a worker process: the page (or the catalog JSON) for raw CSV bytes, encoded."""
+    with open_upload(data) as stream:
+        if kind == "catalog":
+            return parse_catalog(stream).to_json().encode("utf-8")
+        return convert_data_to_html(stream, mode=mode).encode("utf-8")
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ServiceMetrics:
+    """Request counts and latencies. Latency percentiles are over the last LATENCY_SAMPLES
+    requests; throughput is over the last METRICS_WINDOW seconds."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.statuses = Counter()
+        self.cache = Counter()   # 'hit', 'miss', 'not modified', 'joined' (waited on the same conversion)
+        self.recent = deque(maxlen=LATENCY_SAMPLES)   # (finished at, seconds)
+
+    def record(self, status, seconds, now=None):
+        self.statuses[status] += 1
+        self.recent.append((time.monotonic() if now is None else now, seconds))
+
+    def to_dict(self, pending=0, running=0, now=None):
+        now = time.monotonic() if now is None else now
+        latencies = sorted(seconds for _, seconds in self.recent)
+        window = min(METRICS_WINDOW, now - self.started) or 1
+        finished = sum(1 for at, _ in self.recent if now - at <= METRICS_WINDOW)
+        percentile = lambda p: round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2) \
+            if latencies else None
+        return {
+            'uptime_s': round(now - self.started, 1),
+            'requests': sum(self.statuses.values()),
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'cache': dict(self.cache),
+            'throughput_rps': round(finished / window, 2),
+            'latency_ms': {'p50': percentile(0.5), 'p95': percentile(0.95), 'p99': percentile(0.99),
+                           'max': round(latencies[-1] * 1000, 2) if latencies else None},
+            'pending': pending,
+            'running': running,
+        }
+
+class ConversionService:
+    """The service state: the worker pool, the result cache and the metrics. start() serves it
+    on asyncio's streams; route() answers one parsed request."""
+
+    def __init__(self, workers=None, queue=None, cache_bytes=64 * 1024 * 1024, max_bytes=MAX_INPUT_BYTES):
+        from concurrent.futures import ProcessPoolExecutor  # here, like the profilers: costly to import
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Conversions allowed to wait for a worker; past that, requests are turned away
+        self.queue = self.workers * 4 if queue is None else queue
+        self.slots = asyncio.Semaphore(self.workers)
+        self.pending = 0
+        self.running = 0
+        self.inflight = {}   # key -> asyncio.Future, so identical requests share one conversion
+        self.cache = ResultCache(max_entries=256, max_bytes=cache_bytes)
+        self.max_bytes = max_bytes
+        self.metrics = ServiceMetrics()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+
+    async def convert(self, kind, data, mode, key):
+        """(result bytes, how it was served) for one request, converting at most once per `key`."""
+        result = self.cache.get(key)
+        if result is not None:
+            return result, "hit"
+        if key in self.inflight:
+            try:
+                return await asyncio.shield(self.inflight[key]), "joined"
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise  # this request was cancelled itself
+                # The request that started the conversion went away: this one starts it again
+                return await self.convert(kind, data, mode, key)
+        if self.pending >= self.workers + self.queue:
+            raise HTTPError(503, f"{self.pending} conversions already waiting; try again shortly")
+        future = self.inflight[key] = asyncio.get_running_loop().create_future()
+        self.pending += 1
+        try:
+            # The semaphore keeps waiting requests here, not inside the pool's unbounded queue
+            async with self.slots:
+                self.running += 1
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        self.pool, convert_bytes, kind, bytes(data), mode)
+                finally:
+                    self.running -= 1
+            self.cache.put(key, result, len(result))
+            future.set_result(result)
+            return result, "miss"
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved, so asyncio doesn't warn when nobody joined
+            raise
+        finally:
+            self.pending -= 1
+            del self.inflight[key]
+
+    async def route(self, method, target, headers, body):
+        """(status, headers, body bytes) for one request."""
+        url = urlsplit(target)
+        kind = url.path.strip("/")
+        if url.path == "/metrics":
+            payload = self.metrics.to_dict(self.pending, self.running)
+            return 200, {'Content-Type': "application/json"}, json.dumps(payload, indent=1).encode("utf-8")
+        if url.path == "/health":
+            return 200, {'Content-Type': "text/plain"}, b"ok\n"
+        if kind not in CONTENT_TYPES:
+            raise HTTPError(404, f"No such endpoint: {url.path}")
+        if method != "POST":
+            raise HTTPError(405, "POST the CSV as the request body")
+        mode = parse_qs(url.query).get("mode", ["static"])[0]
+        if mode not in OUTPUT_MODES:
+            raise HTTPError(400, f"Unknown output mode: {mode!r} (expected one of {OUTPUT_MODES})")
+
+        # The ETag is the cache key, so it can be checked before converting anything
+        key = result_key(body, kind + ":" + mode)
+        etag = f'"{key[:32]}"'
+        if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            self.metrics.cache['not modified'] += 1
+            return 304, {'ETag': etag}, b""
+        result, served = await self.convert(kind, body, mode, key)
+        self.metrics.cache[served] += 1
+        return 200, {'Content-Type': CONTENT_TYPES[kind], 'ETag': etag, 'X-Cache': served}, result
+
+    async def handle(self, reader, writer):
+        """One connection: requests are answered in turn until the client closes it (HTTP/1.1 keep-alive)."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return  # closed between requests
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, 400, {}, b"Headers too large\n", time.perf_counter(), close=True)
+                    return
+                start = time.perf_counter()
+                keep_alive = await self.handle_request(head, reader, writer, start)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, head, reader, writer, start):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            await self.respond(writer, 400, {}, b"Bad request line\n", start, close=True)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        try:
+            body = b""
+            if method == "POST":
+                if "content-length" not in headers:
+                    raise HTTPError(411, "Send the CSV with a Content-Length")
+                length = int(headers["content-length"])
+                try:
+                    check_input_size(length, self.max_bytes)
+                except ValueError as e:
+                    keep_alive = False  # the body isn't read, so the connection can't be reused
+                    raise HTTPError(413, str(e))
+                body = await reader.readexactly(length)
+            status, extra, payload = await self.route(method, target, headers, body)
+        except HTTPError as e:
+            status, extra, payload = e.status, {'Content-Type': "text/plain; charset=utf-8"}, f"{e}\n".encode("utf-8")
+            if e.status == 503:
+                extra['Retry-After'] = "1"
+        except ValueError as e:  # a malformed Content-Length
+            status, extra, payload = 400, {'Content-Type': "text/plain; charset=utf-8"}, f"{e}\n".encode("utf-8")
+            keep_alive = False
+        except Exception as e:
+            status, extra, payload = 500, {'Content-Type': "text/plain; charset=utf-8"}, \
+                f"{type(e).__name__}: {e}\n".encode("utf-8")
+        await self.respond(writer, status, extra, payload, start, close=not keep_alive)
+        return keep_alive
+
+    async def respond(self, writer, status, headers, payload, start, close=False):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Length: {len(payload)}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        if close:
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+        self.metrics.record(status, time.perf_counter() - start)
+
+# --- COMMAND LINE ---
+async def serve(args):
+    service = ConversionService(args.workers, args.queue, args.cache_mb * 1024 * 1024)
+    server = await service.start(args.host, args.port)
+    print(f"Converting on http://{args.host}:{args.port} with {service.workers} workers "
+          f"(up to {service.queue} waiting; Ctrl+C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve CSV-to-menu conversions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--queue", type=int, default=None,
+                        help="Conversions that may wait for a worker before requests get 503 (default: 4 per worker)")
+    parser.add_argument("--cache-mb", type=int, default=64, help="Result cache size in MB (default: 64)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,143 @@
 import os
-from convert_menu import convert_data_to_html
+import csv
+import random
+import argparse
+from menu_core import write_html, convert_data_to_html, FragmentCache
 
 # Path to your test CSV and output HTML
 INPUT_CSV = "Core Goods Product List - Sheet1.csv"
 OUTPUT_HTML = "tests/sample_menu.html"
+OUTPUT_VIRTUAL_HTML = "tests/sample_menu_virtual.html"
+
+# --- SYNTHETIC DATA ---
+# Word lists for sheets shaped like the real export, for benchmarks and scale testing
+SECTIONS = ["PREPARED FOODS", "BEVERAGES", "BAKERY ITEMS", "DAIRY & EGGS", "MEAT & FISH",
+            "PRODUCE", "PANTRY", "FROZEN", "SNACKS", "HOUSEHOLD"]
+SUBSECTIONS = ["Bread - Frozen", "Bagels", "English Muffins - frozen; fresh arrive Thursday",
+               "Gluten-Free", "Cheese", "Jams & Spreads"]
+KINDS = ["Soup", "Salad", "Bread", "Cheese", "Yogurt", "Jam", "Honey", "Sausage", "Granola",
+         "Pasta", "Salsa", "Tea", "Coffee", "Cookies", "Pierogies", "Broth", "Hummus", "Butter"]
+FLAVORS = ["Roasted Garlic", "Spinach & Cheddar", "Peach", "Everything", "Hot Pepper", "Plain",
+           "Vanilla", "Maple", "Blueberry", "Kalamata Olive", "Smoked", "Mushroom", "Chive", "Raw"]
+VENDORS = ["Barmy Soda (Pittsburgh)", "Allegro Bakery (Pittsburgh)", "Lakeside Bagel (Edinboro)",
+           "86 Acres (Saegertown)", "Wild for Salmon (Bloomsburg)", "Breezy Ridge Acres (Jackson Center)",
+           "Mumma Bees Gluten Free Bakery (Oil City)", "Minerva Dairy (Minerva, OH)"]
+DIETS = ["vegan & gluten-free", "gluten-free", "vegan", "organic", "local", "dairy-free", "keto",
+         "contains milk", "gluten-free; contains milk", "contains eggs, milk & wheat"]
+UNITS = ["lb", "jar", "bottle", "bag", "6-pack", "2-pack", "dozen"]
+JUNK = ["Core Goods Item List - Week of 2/11/26 - 2/15/26",
+        "*This list may be easier to view by turning your phone sideways or on a tablet or computer",
+        "For new weeks, we update this list by 5pm on Tuesday & we do our best to update it as items run out. ",
+        "Tax included in all prices"]
+
+def _dollars(rng, low=1, high=30):
+    return f"{rng.randint(low, high)}.{rng.choice(['29', '49', '79', '89', '99'])}"
+
+def synthetic_price(rng):
+    """A price cell in one of the shapes the real sheet uses, roughly as often as it uses them."""
+    pick = rng.random()
+    if pick < 0.40:
+        return f"${_dollars(rng)}"
+    if pick < 0.65:
+        return f"${_dollars(rng)} / {rng.choice(UNITS)}"
+    if pick < 0.75:
+        small = rng.randint(3, 9)
+        return rng.choice([f"${small}.99 sm / ${small * 2 - 1}.99 lg", f"${small} half pt, ${small * 2 - 1} pt"])
+    if pick < 0.83:
+        each = rng.randint(2, 6)
+        return f"${each}/each or ${each - 1}.65/each for {rng.choice([4, 6, 12])}+"
+    if pick < 0.90:
+        qty = rng.choice([2, 3, 6])
+        return f"${qty + 1} each / {qty} for ${qty * qty + 2}"
+    if pick < 0.95:
+        return f"${_dollars(rng)} (+$1 jar deposit)"
+    return rng.choice(["Varies", ""])
+
+def synthetic_rows(n_rows, seed=0):
+    """Yields exactly `n_rows` CSV rows: junk preamble, section and column header rows, blank
+    spacer rows, sub-headers and items with every price shape the parser handles."""
+    rng = random.Random(seed)
+    blank = ["", "", "", ""]
+    emitted = 0
+
+    def section_start():
+        # A section opens with its title, a spacer and the Item,Price,Notes row
+        yield blank
+        yield [rng.choice(SECTIONS), "", "", ""]
+        yield blank
+        yield ["Item", "Price", rng.choice(["Notes", "Farm/Notes"]), ""]
+
+    queue = [[line, "", "", ""] for line in JUNK[:3]] + list(section_start())
+    while emitted < n_rows:
+        if queue:
+            row = queue.pop(0)
+        else:
+            pick = rng.random()
+            if pick < 0.01:
+                queue.extend(section_start())
+                continue
+            elif pick < 0.02:
+                row = [rng.choice(SUBSECTIONS), "", "", ""]
+            elif pick < 0.025:
+                row = [rng.choice(JUNK), "", "", ""]
+            elif pick < 0.05:
+                row = blank
+            else:
+                notes = rng.choice(VENDORS) if rng.random() < 0.6 else rng.choice(DIETS)
+                row = [f"{rng.choice(KINDS)} - {rng.choice(FLAVORS)}", synthetic_price(rng), notes, ""]
+        yield row
+        emitted += 1
+
+def write_synthetic_csv(out, n_rows, seed=0):
+    writer = csv.writer(out, lineterminator="\n")
+    for row in synthetic_rows(n_rows, seed):
+        writer.writerow(row)
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate the sample menu used by the frontend tests.")
+    parser.add_argument("--fragment-cache", metavar="PATH",
+                        help="Reuse rendered rows from this cache file (created if missing)")
+    parser.add_argument("--synthetic", type=int, metavar="ROWS",
+                        help="Write a synthetic sheet with this many rows instead (e.g. 1000 to 1000000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --synthetic (default: 0)")
+    parser.add_argument("--output", metavar="PATH",
+                        help="Where --synthetic writes (default: .cache/synthetic-ROWS.csv)")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        path = args.output or os.path.join(".cache", f"synthetic-{args.synthetic}.csv")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            write_synthetic_csv(out, args.synthetic, args.seed)
+        print(f"✅ Success! Generated {path} ({args.synthetic} rows)")
+        return
+
     if not os.path.exists(INPUT_CSV):
         print(f"❌ Error: Cannot find {INPUT_CSV}")
         return
 
     print(f"Reading from {INPUT_CSV}...")
     
-    with open(INPUT_CSV, "r", encoding="utf-8") as f:
-        # We pass the file object directly to the function we refactored
-        html_content = convert_data_to_html(f)
-    
     # Ensure tests dir exists
     os.makedirs(os.path.dirname(OUTPUT_HTML), exist_ok=True)
     
-    with open(OUTPUT_HTML, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    fragments = FragmentCache(args.fragment_cache) if args.fragment_cache else None
+
+    # Stream rows straight into the output file instead of building the page in memory
+    with open(INPUT_CSV, "r", encoding="utf-8") as f, open(OUTPUT_HTML, "w", encoding="utf-8") as out:
+        write_html(f, out, fragments)
+
+    # Same menu in the large-menu (virtualized) mode, for the frontend tests
+    with open(INPUT_CSV, "r", encoding="utf-8") as f:
+        virtual_html = convert_data_to_html(f, mode="virtual")
+    with open(OUTPUT_VIRTUAL_HTML, "w", encoding="utf-8") as out:
+        out.write(virtual_html)
+
+    if fragments:
+        fragments.save()
+        print(f"   Rows: {fragments.summary()}")
         
-    print(f"✅ Success! Generated {OUTPUT_HTML}")
+    print(f"✅ Success! Generated {OUTPUT_HTML} and {OUTPUT_VIRTUAL_HTML}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
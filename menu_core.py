@@ -0,0 +1,2065 @@
+"""The menu engine: parses the weekly product-list CSV and renders the menu page.
+
+No UI dependencies, so scripts, batch jobs and tests can import it without loading Streamlit.
+The Streamlit app (convert_menu.py) is a thin shell over it and re-exports everything here.
+"""
+import csv
+import re
+import io
+import html
+import os
+import sys
+import json
+import struct
+import hashlib
+import gzip
+import mmap
+import codecs
+import tempfile
+import functools
+import contextlib
+import time
+from array import array
+from collections import OrderedDict
+
+# --- CONFIGURATION ---
+BADGE_MAP = {
+    'gluten-free': {'label': 'GF', 'color': '#e67c23'},
+    'gf':          {'label': 'GF', 'color': '#e67c23'},
+    'vegan':       {'label': 'V',  'color': '#27ae60'},
+    'organic':     {'label': 'Org', 'color': '#2980b9'},
+    'local':       {'label': 'Loc', 'color': '#8e44ad'},
+    'dairy-free':  {'label': 'DF', 'color': '#c0392b'},
+    'keto':        {'label': 'Keto', 'color': '#16a085'},
+}
+
+SKIP_PHRASES = [
+    "week of", "turn your phone", "update this list", 
+    "items run out", "tax included", "easier to view"
+]
+
+THUMB_PX = 80  # CSS width of a row's product photo (.cg-thumb)
+
+# --- KEYWORD MATCHING ---
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+class KeywordMatcher:
+    """Precompiled badge + junk-phrase matcher. Built once from the config, then one scan per text."""
+
+    def __init__(self, badge_map, skip_phrases):
+        self.badge_keys = list(badge_map)
+        self.badge_html = {
+            key: f"<span class='cg-badge' style='background-color:{style['color']}'>{style['label']}</span>"
+            for key, style in badge_map.items()
+        }
+        # Longest first, so at any start position the regex captures the longest key that fits
+        by_length = sorted(self.badge_keys, key=len, reverse=True)
+        alternation = "|".join(re.escape(k) for k in by_length)
+        # Zero-width lookahead: every start position is tried, so overlapping keys are still found
+        self.badge_re = re.compile(r'\b(?=(' + alternation + r')\b)') if by_length else None
+        # A shorter key that is a prefix of the captured one also matched there, as long as the
+        # character that follows it in the longer key is a word boundary. That is fixed per key pair.
+        self.implied = {
+            key: [p for p in self.badge_keys
+                  if p and p != key and key.startswith(p)
+                  and _is_word_char(p[-1]) != _is_word_char(key[len(p)])]
+            for key in self.badge_keys
+        }
+        self.skip_re = re.compile("|".join(re.escape(p) for p in skip_phrases)) if skip_phrases else None
+
+    def find_badges(self, lower_text):
+        """Returns the matching BADGE_MAP keys, in BADGE_MAP order."""
+        if self.badge_re is None: return []
+        found = set()
+        for m in self.badge_re.finditer(lower_text):
+            key = m.group(1)
+            found.add(key)
+            found.update(self.implied[key])
+        return [k for k in self.badge_keys if k in found]
+
+    def is_junk(self, lower_text):
+        return self.skip_re is not None and self.skip_re.search(lower_text) is not None
+
+_keywords = KeywordMatcher(BADGE_MAP, SKIP_PHRASES)
+
+def reload_keywords():
+    """Rebuilds the matcher. Call this after changing BADGE_MAP or SKIP_PHRASES at runtime."""
+    global _keywords
+    _keywords = KeywordMatcher(BADGE_MAP, SKIP_PHRASES)
+
+def generate_badges(text):
+    badge_html = _keywords.badge_html
+    badges_html = "".join(badge_html[key] for key in _keywords.find_badges(text.lower()))
+    return text + " " + badges_html
+
+def is_junk_row(line_text):
+    """True if the (lower-cased) row text contains any of the SKIP_PHRASES."""
+    return _keywords.is_junk(line_text)
+
+# --- PRICE PARSING ---
+# Size labels that split one row into several products ("$4.99 sm / $6.99 lg")
+SIZE_LABELS = {'sm', 'lg', 'small', 'large', 'pt', 'qt', 'pint', 'quart', 'half', 'whole'}
+
+# Token kinds. Punctuation ('$', '.', '/', '+') uses the character itself as its kind.
+T_NUM = 'num'     # a run of digits (a quantity, or part of an amount)
+T_FOR = 'for'     # the word "for", as in "2 for $5"
+T_SIZE = 'size'   # a size label from SIZE_LABELS
+T_WORD = 'word'   # any other run of letters
+T_WS = 'ws'       # a run of whitespace
+T_OTHER = 'other'
+
+def tokenize_price(text):
+    """Splits a price cell into (kind, text) tokens in one left-to-right scan."""
+    tokens = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        j = i + 1
+        if ch.isdecimal():
+            while j < n and text[j].isdecimal(): j += 1
+            tokens.append((T_NUM, text[i:j]))
+        elif ch.isalpha():
+            while j < n and text[j].isalpha(): j += 1
+            word = text[i:j]
+            if word == 'for':
+                tokens.append((T_FOR, word))
+            elif word.casefold() in SIZE_LABELS:
+                tokens.append((T_SIZE, word))
+            else:
+                tokens.append((T_WORD, word))
+        elif ch.isspace():
+            while j < n and text[j].isspace(): j += 1
+            tokens.append((T_WS, text[i:j]))
+        elif ch in '$./+':
+            tokens.append((ch, ch))
+        else:
+            tokens.append((T_OTHER, ch))
+        i = j
+    return tokens
+
+def _amount_at(tokens, k):
+    """Reads a dollar amount whose digits start at tokens[k]: "5", "5.", "5.99"."""
+    amount = tokens[k][1]
+    if k + 1 < len(tokens) and tokens[k + 1][0] == '.':
+        amount += '.'
+        if k + 2 < len(tokens) and tokens[k + 2][0] == T_NUM:
+            amount += tokens[k + 2][1]
+    return amount
+
+def _ends_word(tokens, k):
+    """True if nothing word-like follows tokens[k] (the label in "6.99 lg" but not in "6.99 lg2")."""
+    if k + 1 >= len(tokens): return True
+    kind, value = tokens[k + 1]
+    return kind != T_NUM and not (kind == T_OTHER and _is_word_char(value))
+
+def _size_match_at(tokens, k):
+    """Tries to read "<price> <size>" starting at the digits in tokens[k].
+    Returns (price, label, index after the label) or None."""
+    n = len(tokens)
+    num = tokens[k][1]
+    # "6.99 lg": the cents are only taken when there are exactly two of them
+    if k + 2 < n and tokens[k + 1][0] == '.' and tokens[k + 2][0] == T_NUM and len(tokens[k + 2][1]) == 2:
+        price, m = num + '.' + tokens[k + 2][1], k + 3
+    else:
+        price, m = num, k + 1
+    if m < n and tokens[m][0] == T_WS: m += 1
+    if m < n and tokens[m][0] == T_SIZE and _ends_word(tokens, m):
+        return price, tokens[m][1], m + 1
+    return None
+
+def _bundle_at(tokens, k):
+    """Tries to read "<qty> / $<total>" or "<qty> for $<total>" starting at tokens[k]."""
+    n = len(tokens)
+    m = k + 1
+    if m < n and tokens[m][0] == T_WS: m += 1
+    if m < n and tokens[m][0] in ('/', T_FOR):
+        m += 1
+        if m < n and tokens[m][0] == T_WS: m += 1
+        if m + 1 < n and tokens[m][0] == '$' and tokens[m + 1][0] == T_NUM:
+            return tokens[k][1], _amount_at(tokens, m + 1)
+    return None
+
+# Price cells repeat a lot ("$2.99", "$5.99 / lb", ...), so each distinct cell is only parsed once
+@functools.lru_cache(maxsize=4096)
+def scan_price_terms(text):
+    """Parses a price cell from a single token stream, keeping the amounts as written.
+    Returns (terms, size_matches). terms is (std_amount, std_per, bulk_amount, bulk_per, thresh):
+    the unit price is amount / per, so "2/$5.99" gives ('5.99', 2, '5.99', 2, 2). Missing amounts
+    are None. size_matches is a tuple of (price, label) pairs such as (('4.99', 'sm'), ('6.99', 'lg'))."""
+    if not text: return (None, 1, None, 1, 0), ()
+
+    tokens = tokenize_price(text)
+    prices = []            # every "$<amount>", in order
+    has_plus = False
+    thresh = None          # digits right before the first "+", e.g. "6+"
+    bundle = None          # (qty, total) from the first "2/$5" or "2 for $5"
+    raw = None             # first "4.99" style number, for when the $ sign is missing
+    size_matches = []
+    next_size = 0          # size matches never overlap
+
+    n = len(tokens)
+    for k, (kind, value) in enumerate(tokens):
+        if kind == T_NUM:
+            # Most numbers are followed by nothing that could start a deal or a size,
+            # so look at the next token before trying the longer patterns
+            after = tokens[k + 1][0] if k + 1 < n else None
+            if after is None or after in (T_OTHER, T_WORD, '$'):
+                continue
+            if k >= next_size:
+                size = _size_match_at(tokens, k)
+                if size:
+                    size_matches.append(size[:2])
+                    next_size = size[2]
+            if bundle is None:
+                bundle = _bundle_at(tokens, k)
+            if raw is None and after == '.' and k + 2 < n \
+                    and tokens[k + 2][0] == T_NUM and len(tokens[k + 2][1]) >= 2:
+                raw = value + '.' + tokens[k + 2][1][:2]
+        elif kind == '$':
+            if k + 1 < n and tokens[k + 1][0] == T_NUM:
+                prices.append(_amount_at(tokens, k + 1))
+        elif kind == '+':
+            has_plus = True
+            if thresh is None and k and tokens[k - 1][0] == T_NUM:
+                thresh = tokens[k - 1][1]
+
+    # Results are cached and shared, so hand out an immutable copy
+    size_matches = tuple(size_matches)
+
+    # 1. Tiered Deal: "$2.00/each or $1.65/each for 6+"
+    if has_plus and len(prices) >= 2:
+        return (prices[0], 1, prices[1], 1, int(thresh) if thresh is not None else 0), size_matches
+
+    # 2. Bundle Deal: "$3 each / 6 for $15" OR "2/$5.99"
+    if bundle:
+        qty = int(bundle[0])
+        total_bundle_price = bundle[1]
+
+        if len(prices) >= 2 and float(prices[0]) != float(total_bundle_price):
+            std = (prices[0], 1)
+        else:
+            std = (total_bundle_price, qty)
+
+        return (*std, total_bundle_price, qty, qty), size_matches
+
+    # 3. Standard / Integer Fallback
+    if prices:
+        return (prices[0], 1, None, 1, 0), size_matches
+
+    # 4. Raw Number Fallback (If they forgot the $ sign, e.g., "4.99")
+    if raw:
+        return (raw, 1, None, 1, 0), size_matches
+
+    return (None, 1, None, 1, 0), size_matches
+
+def scan_price(text):
+    """Like scan_price_terms, but with the terms turned into {'std', 'bulk', 'thresh'} floats."""
+    (std_amount, std_per, bulk_amount, bulk_per, thresh), size_matches = scan_price_terms(text)
+    info = {
+        'std': float(std_amount) / std_per if std_amount is not None else 0.0,
+        'bulk': float(bulk_amount) / bulk_per if bulk_amount is not None else 0.0,
+        'thresh': thresh,
+    }
+    return info, list(size_matches)
+
+def parse_price_info(text):
+    """Parses a price string into {'std', 'bulk', 'thresh'} (see scan_price)."""
+    return scan_price(text)[0]
+
+_SPLIT_NAME_RE = re.compile(r"^(.*) \(([^()]+)\)$")
+
+def split_size(name):
+    """("Soup", "qt") for a row split by size ("Soup (qt)"); (name, None) otherwise."""
+    match = _SPLIT_NAME_RE.match(name)
+    if match and match.group(2).casefold() in SIZE_LABELS:
+        return match.group(1), match.group(2)
+    return name, None
+
+def amount_to_cents(amount):
+    """'5.99' -> 599, '5' -> 500, '5.' -> 500. Anything past the cents is rounded half up."""
+    whole, _, frac = amount.partition('.')
+    cents = int(whole) * 100 + int((frac + '00')[:2])
+    if len(frac) > 2 and int(frac[2]) >= 5:
+        cents += 1
+    return cents
+
+# --- PAGE TEMPLATE ---
+# The stylesheet and the cart/search script are the same for every menu
+PAGE_CSS = """
+    body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; background: #fafafa; color: #333; margin: 0; padding-bottom: 100px; }
+    .cg-app { max-width: 800px; margin: 0 auto; background: white; min-height: 100vh; position: relative; }
+    .cg-controls { position: sticky; top: 0; background: white; padding: 15px; border-bottom: 1px solid #eee; z-index: 100; box-shadow: 0 2px 10px rgba(0,0,0,0.05); }
+    .cg-search { width: 100%; padding: 12px 15px; border: 2px solid #ddd; border-radius: 8px; font-size: 16px; outline: none; box-sizing: border-box; -webkit-appearance: none; }
+    .cg-search:focus { border-color: #2c5e2e; }
+    .cg-nav { overflow-x: auto; white-space: nowrap; padding: 10px 0 0 0; -webkit-overflow-scrolling: touch; scrollbar-width: none; }
+    .cg-nav::-webkit-scrollbar { display: none; }
+    .cg-nav a { display: inline-block; padding: 6px 12px; margin-right: 8px; background: #f4f4f4; border-radius: 20px; text-decoration: none; color: #444; font-size: 14px; font-weight: 600; }
+    .cg-nav a.active { background: #2c5e2e; color: white; }
+    .cg-content { padding: 0 15px 40px 15px; }
+    .cg-section-title { color: #2c5e2e; margin-top: 35px; border-bottom: 2px solid #2c5e2e; padding-bottom: 5px; font-size: 1.3em; scroll-margin-top: 150px; }
+    .cg-item-row { display: flex; justify-content: space-between; align-items: start; padding: 15px 0; border-bottom: 1px solid #eee; min-height: 50px; }
+    .cg-item-info { flex: 1; padding-right: 15px; }
+    .cg-thumb { flex: none; width: 80px; height: auto; margin-right: 12px; border-radius: 6px; object-fit: cover; background: #f2f2f2 center / cover no-repeat; }
+    .cg-name { font-weight: 700; display: block; font-size: 1.05em; margin-bottom: 4px; color: #222; }
+    .cg-meta { font-size: 0.9em; color: #666; line-height: 1.4; display: block; margin-bottom: 4px; }
+    .cg-price { font-weight: 700; color: #2c5e2e; font-size: 1.1em; }
+    .cg-price.unknown { color: #999; font-weight: normal; font-size: 0.9em; }
+    .cg-subheader { background: #e8f5e9; padding: 8px 12px; font-weight: 700; color: #1b4d20; border-radius: 6px; margin-top: 20px; font-size: 0.95em; }
+    .cg-badge { display: inline-block; font-size: 0.7em; color: white; padding: 2px 6px; border-radius: 4px; margin-left: 6px; vertical-align: middle; font-weight: 700; text-transform: uppercase; }
+    
+    .cg-qty-wrapper { display: flex; align-items: center; background: #f4f4f4; border-radius: 25px; height: 36px; padding: 2px; }
+    .cg-qty-btn { width: 32px; height: 32px; border-radius: 50%; border: none; background: white; cursor: pointer; font-weight: bold; font-size: 18px; color: #2c5e2e; display: flex; align-items: center; justify-content: center; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }
+    .cg-qty-val { min-width: 24px; text-align: center; font-weight: bold; font-size: 14px; color: #333; }
+    .cg-add-btn { background: #2c5e2e; color: white; border: none; width: 36px; height: 36px; border-radius: 50%; font-size: 20px; cursor: pointer; display: flex; align-items: center; justify-content: center; }
+    .hidden { display: none !important; }
+
+    .cg-checkout-bar { position: fixed; bottom: 30px; left: 50%; transform: translateX(-50%) translateY(150px); background: #222; color: white; padding: 12px 30px; border-radius: 50px; font-weight: bold; cursor: pointer; box-shadow: 0 5px 20px rgba(0,0,0,0.3); z-index: 900; display: flex; align-items: center; gap: 10px; transition: all 0.3s cubic-bezier(0.175, 0.885, 0.32, 1.275); min-width: 200px; justify-content: center; }
+    .cg-checkout-bar.visible { transform: translateX(-50%) translateY(0); }
+
+    .cg-top-btn { position: fixed; bottom: 100px; right: 20px; background: rgba(255,255,255,0.9); color: #2c5e2e; border: 1px solid #ddd; width: 45px; height: 45px; border-radius: 50%; font-size: 20px; display: flex; align-items: center; justify-content: center; cursor: pointer; opacity: 0; transition: opacity 0.3s; pointer-events: none; z-index: 800; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+    .cg-top-btn.visible { opacity: 1; pointer-events: auto; }
+
+    .cg-modal-overlay { position: fixed; top: 0; left: 0; right: 0; bottom: 0; background: rgba(0,0,0,0.5); z-index: 1000; display: none; align-items: flex-end; justify-content: center; backdrop-filter: blur(2px); }
+    .cg-modal-overlay.open { display: flex; }
+    .cg-modal { background: white; width: 100%; max-width: 600px; border-radius: 20px 20px 0 0; padding: 25px; box-sizing: border-box; max-height: 85vh; display: flex; flex-direction: column; animation: slideUp 0.3s ease-out; }
+    @keyframes slideUp { from { transform: translateY(100%); } to { transform: translateY(0); } }
+    .cg-modal-header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px; border-bottom: 1px solid #eee; padding-bottom: 15px; }
+    .cg-modal-title { font-size: 1.5em; font-weight: bold; color: #2c5e2e; margin: 0; }
+    .cg-close-btn { background: none; border: none; font-size: 24px; color: #999; cursor: pointer; padding: 0 10px; }
+    .cg-empty-btn { background: none; border: 1px solid #e74c3c; color: #e74c3c; border-radius: 4px; padding: 5px 10px; font-size: 0.8em; font-weight: bold; cursor: pointer; margin-right: auto; margin-left: 15px; }
+    .cg-cart-list { overflow-y: auto; flex: 1; margin-bottom: 20px; }
+    .cg-cart-item { display: flex; justify-content: space-between; align-items: center; padding: 15px 0; border-bottom: 1px solid #f5f5f5; }
+    .cg-cart-name { font-weight: 600; flex: 1; padding-right: 10px; }
+    .cg-cart-controls { display: flex; align-items: center; gap: 10px; background: #f9f9f9; padding: 5px; border-radius: 20px; }
+    .cg-cart-footer { border-top: 1px solid #eee; padding-top: 20px; }
+    .cg-total-row { display: flex; justify-content: space-between; font-size: 1.2em; font-weight: bold; margin-bottom: 20px; }
+    .cg-send-btn { background: #2c5e2e; color: white; width: 100%; padding: 15px; border: none; border-radius: 12px; font-size: 1.1em; font-weight: bold; cursor: pointer; text-align: center; display: block; text-decoration: none; }
+"""
+
+PAGE_JS = """
+    // --- CART ---
+    // One entry per item id (the row's data-id), holding everything the cart shows, so lines
+    // work whether or not their row is on the page. The count and the total (integer cents)
+    // are kept up to date by each change instead of being recomputed over the whole cart.
+    const cart = new Map();
+    let cartCount = 0;
+    let cartCents = 0;
+    // item id -> the +/- controls on the page for it (rows with the same name share an id)
+    const controls = new Map();
+    const cartLines = new Map();
+
+    function registerControls(root) {
+        root.querySelectorAll('.cg-qty-wrapper').forEach(w => {
+            const list = controls.get(w.dataset.id);
+            if (list) list.push(w); else controls.set(w.dataset.id, [w]);
+        });
+    }
+
+    function unregisterControls(root) {
+        root.querySelectorAll('.cg-qty-wrapper').forEach(w => {
+            const list = controls.get(w.dataset.id);
+            if (!list) return;
+            const i = list.indexOf(w);
+            if (i >= 0) list.splice(i, 1);
+            if (list.length === 0) controls.delete(w.dataset.id);
+        });
+    }
+
+    function cartEntry(wrapper) {
+        // data-cents is "std_cents std_per bulk_cents bulk_per"; the unit price is cents / per
+        const [c, cp, b, bp] = wrapper.dataset.cents.split(' ').map(Number);
+        return { id: wrapper.dataset.id, name: wrapper.closest('.cg-item-row').querySelector('.cg-name').textContent,
+                 raw: wrapper.dataset.r, c: c, cp: cp, b: b, bp: bp, t: parseInt(wrapper.dataset.bt), qty: 0, cents: 0 };
+    }
+
+    function isBulk(item, qty) { return item.t > 0 && qty >= item.t; }
+
+    function unitCents(item, qty) { return isBulk(item, qty) ? item.b / item.bp : item.c / item.cp; }
+
+    function updateQty(id, change, wrapper) {
+        let item = cart.get(id);
+        if (!item) {
+            if (change <= 0 || !wrapper) return;
+            item = cartEntry(wrapper);
+            cart.set(id, item);
+        }
+        const qty = Math.max(0, item.qty + change);
+        const cents = Math.round(unitCents(item, qty) * qty);
+        cartCount += qty - item.qty;
+        cartCents += cents - item.cents;
+        item.qty = qty;
+        item.cents = cents;
+        if (qty === 0) cart.delete(id);
+        updateItemControls(id, qty);
+        updateUI();
+        if (document.getElementById('cartModal').classList.contains('open')) updateCartLine(item);
+        saveCart();
+    }
+
+    function qtyControlsHtml(qty) {
+        return `<button class="cg-qty-btn" data-act="dec">-</button><div class="cg-qty-val">${qty}</div><button class="cg-qty-btn" data-act="inc">+</button>`;
+    }
+
+    const ADD_BUTTON_HTML = `<button class="cg-add-btn" data-act="add">+</button>`;
+
+    function updateItemControls(id, qty) {
+        for (const wrapper of controls.get(id) || []) {
+            const val = wrapper.querySelector('.cg-qty-val');
+            if (qty > 0 && val) val.textContent = qty;
+            else if (qty > 0) wrapper.innerHTML = qtyControlsHtml(qty);
+            else if (val) wrapper.innerHTML = ADD_BUTTON_HTML;
+        }
+    }
+
+    function emptyCart() {
+        if (cart.size === 0) return;
+        if (confirm("Are you sure you want to empty your cart?")) {
+            const ids = Array.from(cart.keys());
+            cart.clear(); cartCount = 0; cartCents = 0;
+            ids.forEach(id => updateItemControls(id, 0));
+            updateUI(); renderCartItems(); closeCart(); saveCart();
+        }
+    }
+
+    function calculateTotal() {
+        return { count: cartCount, total: (cartCents / 100).toFixed(2) };
+    }
+
+    const cartCountEl = document.getElementById('cartCount');
+    const cartTotalEl = document.getElementById('cartTotal');
+    const checkoutBar = document.getElementById('checkoutBar');
+    function updateUI() {
+        cartCountEl.textContent = cartCount;
+        cartTotalEl.textContent = '$' + (cartCents / 100).toFixed(2);
+        checkoutBar.classList.toggle('visible', cartCount > 0);
+    }
+
+    function cartLineHtml(item) {
+        const unit = unitCents(item, item.qty) / 100;
+        let note = "";
+        if (isBulk(item, item.qty)) { note = `<span style="color:#27ae60; font-size:0.8em; margin-left:5px;">(Bulk!)</span>`; }
+        else if (item.t > 0) { note = `<span style="color:#e67c23; font-size:0.8em; margin-left:5px;">(Buy ${item.t} for $${(item.b / item.bp / 100).toFixed(2)} ea)</span>`; }
+        return `<div class="cg-cart-name">${item.name} ${note}<br><span style="font-weight:normal; font-size:0.85em; color:#666;">@ $${unit.toFixed(2)}</span></div><div class="cg-cart-controls"><button class="cg-qty-btn" data-act="dec">-</button><span class="cg-qty">${item.qty}</span><button class="cg-qty-btn" data-act="inc">+</button></div>`;
+    }
+
+    const EMPTY_CART_HTML = "<p style='text-align:center; color:#999;'>Your cart is empty.</p>";
+
+    function renderCartItems() {
+        // Only when the modal opens; after that, changes patch their own line
+        const container = document.getElementById('cartList');
+        cartLines.clear();
+        if (cart.size === 0) { container.innerHTML = EMPTY_CART_HTML; return; }
+        const parts = [];
+        for (const item of cart.values()) parts.push(`<div class="cg-cart-item" data-id="${item.id}">${cartLineHtml(item)}</div>`);
+        container.innerHTML = parts.join('');
+        container.querySelectorAll('.cg-cart-item').forEach(line => cartLines.set(line.dataset.id, line));
+    }
+
+    function updateCartLine(item) {
+        const container = document.getElementById('cartList');
+        let line = cartLines.get(item.id);
+        if (item.qty === 0) {
+            if (line) { line.remove(); cartLines.delete(item.id); }
+            if (cart.size === 0) container.innerHTML = EMPTY_CART_HTML;
+            return;
+        }
+        if (!line) {
+            if (cartLines.size === 0) container.innerHTML = "";
+            line = document.createElement('div');
+            line.className = 'cg-cart-item';
+            line.dataset.id = item.id;
+            container.appendChild(line);
+            cartLines.set(item.id, line);
+        }
+        line.innerHTML = cartLineHtml(item);
+    }
+
+    function openCart() { renderCartItems(); document.getElementById('cartModal').classList.add('open'); document.body.style.overflow = 'hidden'; }
+    function closeCart() { document.getElementById('cartModal').classList.remove('open'); document.body.style.overflow = ''; }
+
+    function sendEmail() {
+        let body = "Hi Core Goods,\\n\\nI'd like to place an order for pickup:\\n\\n";
+        for (const item of cart.values()) {
+            const p = unitCents(item, item.qty) / 100;
+            const lbl = isBulk(item, item.qty) && p < item.c / item.cp / 100 ? " (BULK)" : "";
+            body += `- [${item.qty}x] ${item.name} @ $${p.toFixed(2)}${lbl}\\n`;
+        }
+        body += `\\nEstimated Total: $${(cartCents / 100).toFixed(2)}\\n\\nThanks!`;
+        window.location.href = `mailto:coregoodsoc@gmail.com?subject=Order%20for%20Pickup&body=${encodeURIComponent(body)}`;
+    }
+
+    // --- SAVED CART ---
+    // The cart is kept in localStorage, per page, so a reload doesn't lose it. Restored items take
+    // their prices from the current menu, and items it no longer sells are dropped: on the standard
+    // page that is its rows; large-menu pages build few rows up front, so their script passes
+    // restoreCart the menu's item data instead. A sharded page can't see the shards it hasn't
+    // fetched, so a cart saved from other shards (a new week's menu) isn't restored.
+    const CART_KEY = 'cgCart:' + location.pathname;
+
+    function shardVersion() {
+        // Shard file names are content hashes, so these change whenever any row does
+        return Array.from(document.querySelectorAll('.cg-shard'), el => el.dataset.src).join(' ');
+    }
+
+    function saveCart() {
+        const saved = { shards: shardVersion(), items: Array.from(cart.values()) };
+        try { localStorage.setItem(CART_KEY, JSON.stringify(saved)); }
+        catch (e) {}  // storage full or disabled: the cart still works for this visit
+    }
+
+    function restoreCart(findEntry) {
+        // findEntry(id) is a fresh cart entry for an item without a row, or undefined if it isn't sold
+        let saved = null;
+        try { saved = JSON.parse(localStorage.getItem(CART_KEY)); } catch (e) {}
+        if (!saved || !Array.isArray(saved.items) || saved.shards !== shardVersion()) return;
+        const sharded = shardVersion() !== '';
+        for (const entry of saved.items) {
+            const wrapper = (controls.get(entry.id) || [])[0];
+            if (!wrapper) {
+                const current = findEntry ? findEntry(entry.id) : sharded ? entry : undefined;
+                if (!current) continue;
+                cart.set(entry.id, Object.assign({}, current, { qty: 0, cents: 0 }));
+            }
+            updateQty(entry.id, entry.qty, wrapper);
+        }
+    }
+
+    // Every +/- on the page and in the cart goes through this one listener
+    document.addEventListener('click', (e) => {
+        const button = e.target.closest('[data-act]');
+        if (!button) return;
+        const owner = button.closest('[data-id]');
+        if (!owner) return;
+        const wrapper = owner.classList.contains('cg-qty-wrapper') ? owner : null;
+        updateQty(owner.dataset.id, button.dataset.act === 'dec' ? -1 : 1, wrapper);
+    });
+    registerControls(document.getElementById('cgList'));
+    if (!document.querySelector('.cg-vlist')) restoreCart();  // large-menu pages restore it with their data
+
+    const nav = document.getElementById('cgNav');
+    sections.forEach(s => {
+        const a = document.createElement('a'); a.innerText = s.Title; a.href = "#" + s.Id;
+        a.onclick = (e) => { e.preventDefault(); document.querySelectorAll('.cg-nav a').forEach(l => l.classList.remove('active')); e.target.classList.add('active'); document.getElementById(s.Id).scrollIntoView({ behavior: 'smooth', block: 'start' }); };
+        nav.appendChild(a);
+    });
+
+    // --- SEARCH ---
+    // The index maps every word to the rows that contain it: {t: sorted words, p: row ids per word}.
+    // A query matches the rows where each of its words starts some word of the item's name or notes.
+    const searchRows = Array.from(document.querySelectorAll('.cg-item-row'));
+    // let, not const: the sharded page swaps in the full index when it is first needed
+    let searchIndex = JSON.parse(document.getElementById('cgSearchIndex').textContent) || buildSearchIndex(searchRows);
+    const WORD_RE = /[\\p{L}\\p{N}]+/gu;
+
+    function buildSearchIndex(rows) {
+        const postings = new Map();
+        rows.forEach((row, id) => {
+            for (const w of new Set(row.getAttribute('data-search').match(WORD_RE) || [])) {
+                if (!postings.has(w)) postings.set(w, []);
+                postings.get(w).push(id);
+            }
+        });
+        const t = Array.from(postings.keys()).sort();
+        return { t: t, p: t.map(w => postings.get(w)) };
+    }
+
+    function findMatches(term) {
+        // Returns a Set of row ids, or null when the query has no words (show everything)
+        const words = term.toLowerCase().match(WORD_RE);
+        if (!words) return null;
+        let result = null;
+        for (const word of words) {
+            // Binary search for the first indexed word >= the query word, then walk its prefixes
+            let lo = 0, hi = searchIndex.t.length;
+            while (lo < hi) { const mid = (lo + hi) >> 1; if (searchIndex.t[mid] < word) lo = mid + 1; else hi = mid; }
+            const ids = new Set();
+            for (let i = lo; i < searchIndex.t.length && searchIndex.t[i].startsWith(word); i++) {
+                for (const id of searchIndex.p[i]) if (result === null || result.has(id)) ids.add(id);
+            }
+            result = ids;
+            if (result.size === 0) break;
+        }
+        return result;
+    }
+
+    const rowVisible = new Uint8Array(searchRows.length).fill(1);
+    function applySearch(term) {
+        const matches = findMatches(term);
+        for (let id = 0; id < searchRows.length; id++) {
+            const show = (matches === null || matches.has(id)) ? 1 : 0;
+            // Only rows whose visibility changed are touched
+            if (show !== rowVisible[id]) { rowVisible[id] = show; searchRows[id].style.display = show ? '' : 'none'; }
+        }
+    }
+
+    let searchTimer = null;
+    document.getElementById('cgSearch').addEventListener('input', (e) => {
+        clearTimeout(searchTimer);
+        const term = e.target.value;
+        searchTimer = setTimeout(() => applySearch(term), 120);
+    });
+    document.getElementById('cartModal').addEventListener('click', (e) => { if (e.target === document.getElementById('cartModal')) closeCart(); });
+    window.addEventListener('scroll', () => {
+        const btn = document.getElementById('cgTopBtn');
+        if (window.scrollY > 400) btn.classList.add('visible'); else btn.classList.remove('visible');
+    });
+"""
+
+def get_html_head(assets=None):
+    """Everything before the item list. Doesn't depend on the CSV, so it can be sent first.
+    With `assets` (see publish_assets) the stylesheet is linked instead of inlined, and so is the
+    web app manifest of an offline page."""
+    if assets is None:
+        styles = f"<style>{PAGE_CSS}</style>"
+    else:
+        styles = f'<link rel="stylesheet" href="{assets["css"]}">'
+        if "manifest" in assets:
+            styles += f'\n<link rel="manifest" href="{assets["manifest"]}">\n<meta name="theme-color" content="{THEME_COLOR}">'
+    return f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
+<title>Core Goods Order</title>
+{styles}
+</head>
+<body>
+<div class="cg-app">
+    <div class="cg-controls">
+        <input type="text" id="cgSearch" class="cg-search" placeholder="Search menu...">
+        <div class="cg-nav" id="cgNav"></div>
+    </div>
+    <div class="cg-content" id="cgList">
+        """
+
+def get_html_tail(sections, extra_script="", search_index=None, assets=None):
+    """Everything after the item list, including the section nav (built once all rows are seen).
+    `extra_script` goes after the main script, so it can build on (or replace) its functions.
+    Without a prebuilt `search_index` the page indexes its rows itself when it loads.
+    With `assets` the main script is loaded from its file; only the nav data stays inline. An offline
+    page (assets has "sw") also registers its service worker."""
+    js_sections = "const sections = [\n"
+    for title, sid in sections:
+        js_sections += f"{{Title: '{title}', Id: '{sid}'}},\n"
+    js_sections += "];"
+    index_json = search_index.to_json() if search_index is not None else "null"
+    if assets is None:
+        scripts = f"<script>\n    {js_sections}{PAGE_JS}</script>"
+    else:
+        scripts = f'<script>\n    {js_sections}\n</script>\n<script src="{assets["app"]}"></script>'
+        if "sw" in assets:
+            scripts += _SW_REGISTER.format(url=assets["sw"], page=assets["page"])
+
+    return f"""
+    </div>
+</div>
+<button id="cgTopBtn" class="cg-top-btn" onclick="window.scrollTo({{top:0, behavior:'smooth'}})">↑</button>
+<div id="checkoutBar" class="cg-checkout-bar" onclick="openCart()">
+    <span>🛒 Review Order</span>
+    <span id="cartCount" style="background: white; color: black; padding: 2px 8px; border-radius: 10px; font-size: 0.9em; margin-left: 8px;">0</span>
+</div>
+<div id="cartModal" class="cg-modal-overlay">
+    <div class="cg-modal">
+        <div class="cg-modal-header">
+            <div class="cg-modal-title">Your Order</div>
+            <button class="cg-empty-btn" onclick="emptyCart()">Empty Cart</button>
+            <button class="cg-close-btn" onclick="closeCart()">&times;</button>
+        </div>
+        <div class="cg-cart-list" id="cartList"></div>
+        <div class="cg-cart-footer">
+            <div class="cg-total-row">
+                <span>Total Estimate:</span>
+                <span id="cartTotal">$0.00</span>
+            </div>
+            <button class="cg-send-btn" onclick="sendEmail()">Send Order via Email</button>
+        </div>
+    </div>
+</div>
+<script id="cgSearchIndex" type="application/json">{index_json}</script>
+{scripts}{extra_script}
+</body>
+</html>
+    """
+
+def get_html_template(sections, body_content, search_index=None, assets=None):
+    return get_html_head(assets) + body_content + get_html_tail(sections, search_index=search_index, assets=assets)
+
+# --- CATALOG MODEL ---
+# Parsing produces these records; the renderers (and caches, exports, ...) only consume them.
+CATALOG_VERSION = 1
+
+def item_id(name):
+    """Id for an item on the page and in the cart. It only depends on the name, so the same
+    product keeps its id from week to week."""
+    return hashlib.blake2s(name.encode("utf-8"), digest_size=5).hexdigest()
+
+class Item:
+    """One product. Prices are integer cents; the unit price is cents / per, where per is the
+    bundle size for deals like "2/$5.99" and 1 otherwise."""
+    __slots__ = ('name', 'price_str', 'notes', 'std_cents', 'std_per', 'bulk_cents', 'bulk_per', 'thresh')
+
+    def __init__(self, name, price_str, notes, std_cents=0, std_per=1, bulk_cents=0, bulk_per=1, thresh=0):
+        self.name = name
+        self.price_str = price_str
+        self.notes = notes
+        self.std_cents = std_cents
+        self.std_per = std_per
+        self.bulk_cents = bulk_cents
+        self.bulk_per = bulk_per
+        self.thresh = thresh
+
+    @property
+    def std(self):
+        """Standard unit price in dollars, as the page and cart use it."""
+        return self.std_cents / 100 / self.std_per
+
+    @property
+    def bulk(self):
+        return self.bulk_cents / 100 / self.bulk_per
+
+    def to_list(self):
+        return [self.name, self.price_str, self.notes, self.std_cents, self.std_per,
+                self.bulk_cents, self.bulk_per, self.thresh]
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(*values)
+
+    def __eq__(self, other):
+        return isinstance(other, Item) and self.to_list() == other.to_list()
+
+    def __repr__(self):
+        return f"Item({self.name!r}, {self.price_str!r}, std_cents={self.std_cents}, std_per={self.std_per})"
+
+class Section:
+    """A section header and its items. Items listed before the first header go in a
+    section whose title and sid are None."""
+    __slots__ = ('title', 'sid', 'items')
+
+    def __init__(self, title, sid, items=None):
+        self.title = title
+        self.sid = sid
+        self.items = items if items is not None else []
+
+# Binary layout (little-endian): magic, a header of counts, then four columns -
+# items per section, string lengths (-1 for None), the integer price fields of every item,
+# and all strings as one UTF-8 blob. Decoding is a handful of array/bytes calls, not a loop
+# over struct.unpack.
+_BIN_MAGIC = b"CGCAT"
+_BIN_HEADER = struct.Struct("<IIIIcc")
+
+def _narrowest_code(values):
+    """Smallest signed array typecode that holds every value."""
+    low, high = (min(values), max(values)) if values else (0, 0)
+    for code, bits in (("h", 16), ("i", 32)):
+        if -2**(bits - 1) <= low and high < 2**(bits - 1): return code
+    return "q"
+
+def _le_array(typecode, values=()):
+    arr = array(typecode, values)
+    if sys.byteorder == "big": arr.byteswap()
+    return arr
+
+def _read_array(typecode, buf, pos, count):
+    arr = array(typecode)
+    end = pos + count * arr.itemsize
+    arr.frombytes(buf[pos:end])
+    if sys.byteorder == "big": arr.byteswap()
+    return arr, end
+
+class Catalog:
+    """Everything parsed from one sheet, in order. Serializes to JSON and to a compact binary form."""
+    __slots__ = ('sections',)
+
+    def __init__(self, sections=None):
+        self.sections = sections if sections is not None else []
+
+    def items(self):
+        for section in self.sections:
+            yield from section.items
+
+    def nav(self):
+        """(title, sid) pairs for the section nav."""
+        return [(section.title, section.sid) for section in self.sections if section.sid]
+
+    def to_dict(self):
+        return {
+            'version': CATALOG_VERSION,
+            'sections': [
+                {'title': s.title, 'id': s.sid, 'items': [item.to_list() for item in s.items]}
+                for s in self.sections
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != CATALOG_VERSION:
+            raise ValueError(f"Unsupported catalog version: {data.get('version')!r}")
+        return cls([
+            Section(s['title'], s['id'], [Item.from_list(values) for values in s['items']])
+            for s in data['sections']
+        ])
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_bytes(self):
+        counts = []
+        strings = []
+        ints = []
+        for section in self.sections:
+            counts.append(len(section.items))
+            strings += (section.title, section.sid)
+            for item in section.items:
+                strings += (item.name, item.price_str, item.notes)
+                ints += (item.std_cents, item.std_per, item.bulk_cents, item.bulk_per, item.thresh)
+        lengths = [-1 if value is None else len(value) for value in strings]
+        blob = "".join(value for value in strings if value is not None).encode("utf-8")
+        # Columns use the narrowest integer type that fits, usually 16 bits
+        len_code, int_code = _narrowest_code(lengths), _narrowest_code(ints)
+        return b"".join([
+            _BIN_MAGIC,
+            _BIN_HEADER.pack(CATALOG_VERSION, len(self.sections), len(lengths), len(ints),
+                             len_code.encode("ascii"), int_code.encode("ascii")),
+            _le_array("I", counts).tobytes(),
+            _le_array(len_code, lengths).tobytes(),
+            _le_array(int_code, ints).tobytes(),
+            blob,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data):
+        buf = memoryview(data)
+        if bytes(buf[:len(_BIN_MAGIC)]) != _BIN_MAGIC:
+            raise ValueError("Not a catalog file")
+        pos = len(_BIN_MAGIC)
+        version, n_sections, n_strings, n_ints, len_code, int_code = _BIN_HEADER.unpack_from(buf, pos)
+        if version != CATALOG_VERSION:
+            raise ValueError(f"Unsupported catalog version: {version!r}")
+        pos += _BIN_HEADER.size
+        counts, pos = _read_array("I", buf, pos, n_sections)
+        lengths, pos = _read_array(len_code.decode("ascii"), buf, pos, n_strings)
+        ints, pos = _read_array(int_code.decode("ascii"), buf, pos, n_ints)
+        text = str(buf[pos:], "utf-8")
+
+        strings = []
+        offset = 0
+        for length in lengths:
+            if length < 0:
+                strings.append(None)
+            else:
+                strings.append(text[offset:offset + length])
+                offset += length
+
+        sections = []
+        s_pos = i_pos = 0
+        for count in counts:
+            section = Section(strings[s_pos], strings[s_pos + 1])
+            s_pos += 2
+            for _ in range(count):
+                section.items.append(Item(*strings[s_pos:s_pos + 3], *ints[i_pos:i_pos + 5]))
+                s_pos += 3
+                i_pos += 5
+            sections.append(section)
+        return cls(sections)
+
+# --- SEARCH INDEX ---
+_SEARCH_WORD_RE = re.compile(r"[^\W_]+")
+
+class SearchIndex:
+    """Word -> row ids index over item names and notes, embedded in the page so the search box
+    doesn't have to scan every row. Items must be added in the order their rows appear."""
+
+    def __init__(self):
+        self.count = 0
+        self.postings = {}
+
+    def add(self, name, notes):
+        row_id = self.count
+        self.count += 1
+        text = f"{html.unescape(name)} {notes}".lower()
+        for word in set(_SEARCH_WORD_RE.findall(text)):
+            self.postings.setdefault(word, []).append(row_id)
+
+    def extend(self, other):
+        """Appends the rows of another index after this one's, for indexes built in parallel."""
+        for word, ids in other.postings.items():
+            self.postings.setdefault(word, []).extend(row_id + self.count for row_id in ids)
+        self.count += other.count
+
+    def to_json(self):
+        words = sorted(self.postings)
+        data = json.dumps({'t': words, 'p': [self.postings[w] for w in words]}, separators=(',', ':'))
+        return data.replace("</", "<\\/")
+
+# --- INSTRUMENTATION ---
+class ConversionStats:
+    """Per-stage timings and counters for one conversion. Pass one as `stats=` to
+    convert_data_to_html (or the other entry points) and read it afterwards.
+
+    Stages share one running clock: each lap() charges the time since the previous lap to a
+    stage, so the stages add up to the total even though rows stream through all of them.
+    `profile` can be "cprofile" or "tracemalloc" for a report on top of the timers."""
+
+    STAGES = ("read", "junk filter", "headers", "price parsing", "badges", "html", "search index",
+              "fragment cache", "assembly")
+    PROFILERS = ("cprofile", "tracemalloc")
+
+    def __init__(self, profile=None):
+        if profile is not None and profile not in self.PROFILERS:
+            raise ValueError(f"Unknown profiler: {profile!r} (expected one of {self.PROFILERS})")
+        self.profile = profile
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.counts = {'rows': 0, 'blank rows': 0, 'junk rows': 0, 'table headers': 0, 'sections': 0,
+                       'items': 0, 'split rows': 0, 'unpriced items': 0, 'cached rows': 0}
+        self.total_seconds = 0.0
+        self.peak_bytes = None
+        self.profile_report = ""
+        self._clock = None
+        self._profiler = None
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.seconds[stage] += now - self._clock
+        self._clock = now
+
+    # The profilers are imported here rather than at the top: pstats alone costs more to import
+    # than the rest of the engine, and most conversions never profile
+    def start(self):
+        if self.profile == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profile == "tracemalloc":
+            import tracemalloc
+            tracemalloc.start()
+        self._started = self._clock = time.perf_counter()
+
+    def stop(self):
+        self.lap("assembly")
+        self.total_seconds = self._clock - self._started
+        if self.profile == "cprofile":
+            import pstats
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(25)
+            self.profile_report = out.getvalue()
+            self._profiler = None
+        elif self.profile == "tracemalloc":
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            top = snapshot.statistics("lineno")[:15]
+            self.profile_report = "\n".join(str(stat) for stat in top)
+
+    def to_dict(self):
+        return {'total_seconds': self.total_seconds, 'seconds': dict(self.seconds), 'counts': dict(self.counts),
+                'peak_bytes': self.peak_bytes}
+
+    def summary(self):
+        """One line per stage that took any time, slowest first."""
+        lines = [f"{stage:<16}{seconds * 1000:9.1f} ms {seconds / (self.total_seconds or 1):6.0%}"
+                 for stage, seconds in sorted(self.seconds.items(), key=lambda kv: -kv[1]) if seconds]
+        lines.append(f"{'total':<16}{self.total_seconds * 1000:9.1f} ms")
+        lines.append(", ".join(f"{count} {name}" for name, count in self.counts.items()))
+        return "\n".join(lines)
+
+# --- REUSABLE LOGIC (Separated from UI) ---
+def is_section_header(row):
+    """True for a section header row such as "BEVERAGES,,,", given the row's stripped cells."""
+    return row[0].isupper() and len(row[0]) > 3 and not row[1]
+
+def section_id(title, used):
+    """Page id for a section header. Repeated titles get "-x" suffixes; `used` is the set of ids
+    given out so far, and the new one is added to it."""
+    sid = title.lower().replace(' ', '-')
+    while sid in used: sid += "-x"
+    used.add(sid)
+    return sid
+
+def iter_catalog_rows(file_obj, stats=None):
+    """First half of the parse: cleans and classifies the CSV rows.
+    Yields a Section for every header row and the list of cells for every item row."""
+    return iter_records(csv.reader(file_obj), stats)
+
+def iter_records(rows, stats=None):
+    """iter_catalog_rows for rows that are already split into cells (a csv.reader, a list)."""
+    sids = set()
+    timed = stats is not None
+
+    for row in rows:
+        row = [c.strip() for c in row]
+        if timed:
+            stats.counts['rows'] += 1
+            stats.lap("read")
+        if not any(row):
+            if timed: stats.counts['blank rows'] += 1
+            continue
+        
+        # 0. JUNK FILTER
+        line_text = " ".join(row).lower()
+        if is_junk_row(line_text):
+            if timed:
+                stats.counts['junk rows'] += 1
+                stats.lap("junk filter")
+            continue
+        if timed: stats.lap("junk filter")
+
+        # 1. Section Header
+        if is_section_header(row):
+            sid = section_id(row[0], sids)
+            if timed:
+                stats.counts['sections'] += 1
+                stats.lap("headers")
+            yield Section(row[0], sid)
+            continue
+        
+        # 2. Skip Table Headers
+        if row[0].lower().startswith("item"):
+            if timed:
+                stats.counts['table headers'] += 1
+                stats.lap("headers")
+            continue
+        if timed: stats.lap("headers")
+
+        # 3. Handle Items
+        if row[0]:
+            yield row
+
+def parse_row_items(row, stats=None):
+    """Turns one item row into the products it lists (more than one for "sm / lg" rows)."""
+    base_name = row[0].replace('"', '&quot;')
+    raw_price_str = row[1] if len(row) > 1 else ""
+    notes = " ".join(row[2:]) if len(row) > 2 else ""
+    
+    # --- THE MAGIC FIX ---
+    # Look for explicit sizes (sm, lg, pt, qt, half, whole) next to a price.
+    # The same scan also gives us the price terms for the unsplit row.
+    terms, size_matches = scan_price_terms(raw_price_str)
+    
+    # If we find MULTIPLE sizes in one row, we split them into distinct products
+    if len(size_matches) > 1:
+        # "$6.99" on its own is always a plain standard price
+        items = [Item(f"{base_name} ({size_lbl})", f"${price_val}", notes, amount_to_cents(price_val))
+                 for price_val, size_lbl in size_matches]
+    else:
+        # Normal behavior for standard items or bundle deals
+        std_amount, std_per, bulk_amount, bulk_per, thresh = terms
+        items = [Item(
+            base_name, raw_price_str, notes,
+            amount_to_cents(std_amount) if std_amount is not None else 0, std_per,
+            amount_to_cents(bulk_amount) if bulk_amount is not None else 0, bulk_per,
+            thresh,
+        )]
+    if stats is not None:
+        count_items(stats, items)
+        stats.lap("price parsing")
+    return items
+
+def count_items(stats, items):
+    stats.counts['items'] += len(items)
+    stats.counts['split rows'] += len(items) > 1
+    stats.counts['unpriced items'] += sum(1 for item in items if not item.std_cents)
+
+def parse_catalog(file_obj, fragment_cache=None, stats=None):
+    """Parses a whole sheet into a Catalog."""
+    catalog = Catalog([Section(None, None)])
+    for record in iter_catalog_rows(file_obj, stats):
+        if isinstance(record, Section):
+            catalog.sections.append(record)
+        elif fragment_cache is None:
+            catalog.sections[-1].items.extend(parse_row_items(record, stats))
+        else:
+            items = fragment_cache.parse_row(record)
+            if stats is not None:
+                stats.counts['cached rows'] += 1
+                count_items(stats, items)
+                stats.lap("fragment cache")
+            catalog.sections[-1].items.extend(items)
+    if not catalog.sections[0].items:
+        del catalog.sections[0]
+    return catalog
+
+def price_change_html(previous, item):
+    """A "was $X" note for an item whose unit price changed since `previous` (an earlier week's Item)."""
+    # Unit prices compared as fractions of integer cents: std_cents / std_per
+    old, new = previous.std_cents * item.std_per, item.std_cents * previous.std_per
+    if not previous.std_cents or not item.std_cents or old == new:
+        return ""
+    arrow, color = ("▼", "#27ae60") if new < old else ("▲", "#999")
+    return f" <span class='cg-was' style='color:{color}; font-size:0.8em; font-weight:normal;'>{arrow} was {previous.price_str}</span>"
+
+def image_html(image):
+    """The row's <img> for a ProductImage (see product_images): loaded lazily, at the width from its
+    srcset that suits the screen, with its size set up front so the row doesn't move when it arrives
+    and the tiny inline placeholder showing until then."""
+    srcset = ", ".join(f"{url} {width}w" for url, width in image.files)
+    height = round(THUMB_PX * image.height / image.width)
+    return (f'<img class="cg-thumb" src="{image.files[0][0]}" srcset="{srcset}" sizes="{THUMB_PX}px" '
+            f'width="{THUMB_PX}" height="{height}" loading="lazy" decoding="async" alt="" '
+            f'style="background-image:url({image.placeholder})">')
+
+def render_item(item, stats=None, previous=None, image=None):
+    """HTML for a single product row. With `previous`, the same item from an earlier week,
+    a changed price is annotated; with `image`, a ProductImage, the row shows the photo."""
+    if stats is not None: stats.lap("html")
+    badges = generate_badges(item.notes)
+    if stats is not None: stats.lap("badges")
+    name = item.name
+    price_str = item.price_str
+    item_notes = item.notes
+
+    p_info = {'std': item.std, 'bulk': item.bulk, 'thresh': item.thresh}
+    display_price = price_str if price_str else "See details"
+
+    # The markup keeps the indentation it had when it was built inline in the row loop,
+    # so generated pages stay byte-for-byte the same.
+    button_html = ""
+    if p_info['std'] > 0:
+        # The page's one click listener finds the item by data-id; data-cents holds the
+        # integer prices the cart totals with ("std_cents std_per bulk_cents bulk_per")
+        button_html = f"""
+                    <div class="cg-qty-wrapper" 
+                         data-id="{item_id(name)}"
+                         data-p="{p_info['std']}"
+                         data-bp="{p_info['bulk']}"
+                         data-bt="{p_info['thresh']}"
+                         data-r="{display_price}"
+                         data-cents="{item.std_cents} {item.std_per} {item.bulk_cents} {item.bulk_per}">
+                        <button class="cg-add-btn" data-act="add">+</button>
+                    </div>
+                    """
+
+    price_class = "cg-price" if p_info['std'] > 0 else "cg-price unknown"
+    price_note = price_change_html(previous, item) if previous is not None else ""
+    photo = f"\n                    {image_html(image)}" if image is not None else ""
+
+    return f"""
+                <div class="cg-item-row" data-search="{name.lower()} {item_notes.lower()}">{photo}
+                    <div class="cg-item-info">
+                        <span class="cg-name">{name}</span>
+                        <span class="cg-meta">{badges}</span>
+                        <span class="{price_class}">{display_price}{price_note}</span>
+                    </div>
+                    {button_html}
+                </div>
+                """
+
+def render_section_header(section):
+    return f"<h2 id='{section.sid}' class='cg-section-title'>{section.title}</h2>"
+
+def iter_body_html(file_obj, sections, fragment_cache=None, search_index=None, stats=None, price_changes=None,
+                   images=None):
+    """Yields the HTML for each CSV row as it is read. Section headers are appended to `sections`
+    and items to `search_index`, if given. With a FragmentCache, rows that haven't changed since
+    the last run are not re-parsed. `price_changes` ({name: earlier Item}, see PriceHistory)
+    annotates the prices that changed, and `images` (an ImageLibrary) adds product photos."""
+    timed = stats is not None
+    for record in iter_catalog_rows(file_obj, stats):
+        if isinstance(record, Section):
+            sections.append((record.title, record.sid))
+            yield render_section_header(record)
+            # Whatever the caller did with the chunk (joining, writing) counts as assembly
+            if timed: stats.lap("assembly")
+        elif fragment_cache is None:
+            for item in parse_row_items(record, stats):
+                if search_index is not None:
+                    search_index.add(item.name, item.notes)
+                    if timed: stats.lap("search index")
+                html_row = render_item(item, stats, price_changes.get(item.name) if price_changes else None,
+                                       images.find(item) if images is not None else None)
+                if timed: stats.lap("html")
+                yield html_row
+                if timed: stats.lap("assembly")
+        else:
+            entry = fragment_cache.lookup(record)
+            if timed:
+                stats.counts['cached rows'] += 1
+                count_items(stats, [Item.from_list(values) for values in entry['items']])
+                stats.lap("fragment cache")
+            if search_index is not None:
+                for values in entry['items']: search_index.add(values[0], values[2])
+                if timed: stats.lap("search index")
+            extras = None
+            if price_changes or images is not None:
+                items = [Item.from_list(values) for values in entry['items']]
+                extras = [(price_changes.get(item.name) if price_changes else None,
+                           images.find(item) if images is not None else None) for item in items]
+            if extras and any(previous or image for previous, image in extras):
+                # The cached HTML has no annotation or photo; these rows are rendered again
+                yield "".join(render_item(item, previous=previous, image=image)
+                              for item, (previous, image) in zip(items, extras))
+            else:
+                yield entry['html']
+            if timed: stats.lap("assembly")
+
+def build_search_index(catalog):
+    index = SearchIndex()
+    for item in catalog.items():
+        index.add(item.name, item.notes)
+    return index
+
+def iter_catalog_html(catalog, price_changes=None, images=None):
+    """Streams the page for an already parsed Catalog."""
+    price_changes = price_changes or {}
+    yield get_html_head()
+    for section in catalog.sections:
+        if section.sid:
+            yield render_section_header(section)
+        for item in section.items:
+            yield render_item(item, previous=price_changes.get(item.name),
+                              image=images.find(item) if images is not None else None)
+    yield get_html_tail(catalog.nav(), search_index=build_search_index(catalog))
+
+def render_catalog(catalog, price_changes=None, images=None):
+    return "".join(iter_catalog_html(catalog, price_changes, images))
+
+# --- VIRTUALIZED OUTPUT ---
+# For very long menus: the items ship as one JSON blob and the page only builds the rows
+# that are on (or near) the screen. Search, cart and nav are the same as the standard page.
+OUTPUT_MODES = ("static", "virtual")
+
+_VIRTUAL_JS = """
+(function() {
+    const data = JSON.parse(document.getElementById('cgData').textContent);
+    const CHUNK = 40;       // rows built or dropped together
+    const EST_ROW = 96;     // px per row until a chunk has been measured
+    const lists = [];
+
+    function rowHtml(it) {
+        const [name, price, notes, std, bulk, thresh, badgeIds, id, cents, was, photo] = it;
+        const display = price || 'See details';
+        const badges = badgeIds.map(i => `<span class='cg-badge' style='background-color:${data.badges[i][1]}'>${data.badges[i][0]}</span>`).join('');
+        let button = '';
+        if (std > 0) {
+            // Rows that are already in the cart are built with their counter, not the + button
+            const inCart = cart.get(id);
+            button = `<div class="cg-qty-wrapper" data-id="${id}" data-p="${std}" data-bp="${bulk}" data-bt="${thresh}" data-r="${display}" data-cents="${cents.join(' ')}">${inCart ? qtyControlsHtml(inCart.qty) : ADD_BUTTON_HTML}</div>`;
+        }
+        return `<div class="cg-item-row" data-search="${it.search}">${photo || ''}<div class="cg-item-info"><span class="cg-name">${name}</span><span class="cg-meta">${notes} ${badges}</span><span class="${std > 0 ? 'cg-price' : 'cg-price unknown'}">${display}${was || ''}</span></div>${button}</div>`;
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            const chunk = entry.target;
+            if (entry.isIntersecting && !chunk.rendered) {
+                chunk.innerHTML = chunk.items.map(rowHtml).join('');
+                chunk.style.height = '';
+                chunk.rendered = true;
+                registerControls(chunk);
+            } else if (!entry.isIntersecting && chunk.rendered) {
+                // Keep the measured height so the scrollbar doesn't jump
+                chunk.style.height = chunk.offsetHeight + 'px';
+                unregisterControls(chunk);
+                chunk.innerHTML = '';
+                chunk.rendered = false;
+            }
+        });
+    }, { rootMargin: '1500px 0px' });
+
+    function buildList(list, items) {
+        list.el.querySelectorAll('.cg-vchunk').forEach(c => observer.unobserve(c));
+        unregisterControls(list.el);
+        list.el.innerHTML = '';
+        for (let i = 0; i < items.length; i += CHUNK) {
+            const chunk = document.createElement('div');
+            chunk.className = 'cg-vchunk';
+            chunk.items = items.slice(i, i + CHUNK);
+            chunk.style.height = (chunk.items.length * EST_ROW) + 'px';
+            list.el.appendChild(chunk);
+            observer.observe(chunk);
+        }
+    }
+
+    // Row ids in the search index count items across all sections, in page order
+    let firstId = 0;
+    document.querySelectorAll('.cg-vlist').forEach((el, i) => {
+        const items = data.sections[i];
+        items.forEach(it => { it.search = (it[0] + ' ' + it[2]).toLowerCase(); });
+        lists.push({ el: el, items: items, firstId: firstId });
+        firstId += items.length;
+        buildList(lists[i], items);
+    });
+
+    // Saved items are priced from the data, since their rows may not be built yet
+    const byId = new Map();
+    data.sections.forEach(items => items.forEach(it => { if (it[3] > 0) byId.set(it[7], it); }));
+    const text = document.createElement('textarea');
+    restoreCart(id => {
+        const it = byId.get(id);
+        if (!it) return undefined;
+        text.innerHTML = it[0];  // names are HTML in the data; the cart keeps the text, as cartEntry does
+        const [c, cp, b, bp] = it[8];
+        return { id: id, name: text.value, raw: it[1] || 'See details', c: c, cp: cp, b: b, bp: bp, t: it[5] };
+    });
+
+    // Filter the data, not the DOM: only matching rows are ever built
+    let searchTimer = null;
+    document.getElementById('cgSearch').addEventListener('input', (e) => {
+        clearTimeout(searchTimer);
+        const term = e.target.value;
+        searchTimer = setTimeout(() => {
+            const matches = findMatches(term);
+            lists.forEach(list => buildList(list, matches === null ? list.items
+                : list.items.filter((it, j) => matches.has(list.firstId + j))));
+        }, 120);
+    });
+})();
+"""
+
+def catalog_to_page_data(catalog, price_changes=None, images=None):
+    """The compact JSON the virtualized page renders from: a badge table plus, per section, one
+    [name, price, notes, std, bulk, thresh, badge ids, item id, [std_cents, std_per, bulk_cents, bulk_per]]
+    array per item. Items in `price_changes` get the price_change_html note as a tenth value, and
+    items with a photo in `images` get its image_html as an eleventh (after a null tenth if need be)."""
+    badge_keys = _keywords.badge_keys
+    badge_index = {key: i for i, key in enumerate(badge_keys)}
+    sections = [
+        [[item.name, item.price_str, item.notes, item.std, item.bulk, item.thresh,
+          [badge_index[key] for key in _keywords.find_badges(item.notes.lower())],
+          item_id(item.name), [item.std_cents, item.std_per, item.bulk_cents, item.bulk_per]]
+         for item in section.items]
+        for section in catalog.sections
+    ]
+    if price_changes or images is not None:
+        price_changes = price_changes or {}
+        for section, values in zip(catalog.sections, sections):
+            for item, row in zip(section.items, values):
+                note = price_change_html(price_changes[item.name], item) if item.name in price_changes else None
+                image = images.find(item) if images is not None else None
+                if image is not None:
+                    row.extend([note, image_html(image)])
+                elif note is not None:
+                    row.append(note)
+    return {
+        'badges': [[BADGE_MAP[key]['label'], BADGE_MAP[key]['color']] for key in badge_keys],
+        'sections': sections,
+    }
+
+def get_virtual_script(catalog, assets=None, price_changes=None, images=None):
+    data_json = json.dumps(catalog_to_page_data(catalog, price_changes, images), separators=(',', ':'))
+    # "</script>" inside the JSON would end the tag early
+    data_json = data_json.replace("</", "<\\/")
+    script = f"<script>{_VIRTUAL_JS}</script>" if assets is None else f'<script src="{assets["virtual"]}"></script>'
+    return f"""
+<script id="cgData" type="application/json">{data_json}</script>
+{script}"""
+
+def render_catalog_virtual(catalog, assets=None, price_changes=None, images=None):
+    """Same page as render_catalog, but rows are built in the browser as they scroll into view."""
+    body = []
+    for section in catalog.sections:
+        if section.sid:
+            body.append(render_section_header(section))
+        body.append("<div class='cg-vlist'></div>")
+    return get_html_head(assets) + "".join(body) + get_html_tail(
+        catalog.nav(), get_virtual_script(catalog, assets, price_changes, images), build_search_index(catalog), assets)
+
+def iter_html(file_obj, fragment_cache=None, assets=None, stats=None, price_changes=None, images=None):
+    """Streams the full page in chunks. Only the nav and the search index grow with the CSV."""
+    sections = []
+    search_index = SearchIndex()
+    yield get_html_head(assets)
+    yield from iter_body_html(file_obj, sections, fragment_cache, search_index, stats, price_changes, images)
+    # The nav and the index are only complete once every row is read
+    yield get_html_tail(sections, search_index=search_index, assets=assets)
+
+def write_html(file_obj, out, fragment_cache=None):
+    """Writes the page straight to any object with a .write() (open file, socket.makefile(), ...)."""
+    for chunk in iter_html(file_obj, fragment_cache):
+        out.write(chunk)
+
+def convert_data_to_html(file_obj, fragment_cache=None, mode="static", assets=None, stats=None,
+                         price_changes=None, images=None):
+    """The whole page as a string. mode="virtual" builds rows in the browser (see render_catalog_virtual).
+    `assets` links the stylesheet and scripts from separate files instead of inlining them.
+    A ConversionStats passed as `stats` is filled in with per-stage timings and counts.
+    `price_changes` ({name: earlier Item}, see PriceHistory.changes) annotates changed prices.
+    `images`, an ImageLibrary (see product_images), adds product photos; the page links them
+    relative to the library's output folder."""
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {mode!r} (expected one of {OUTPUT_MODES})")
+    if stats is not None: stats.start()
+    try:
+        if mode == "virtual":
+            return render_catalog_virtual(parse_catalog(file_obj, fragment_cache, stats), assets, price_changes,
+                                          images)
+        return "".join(iter_html(file_obj, fragment_cache, assets, stats, price_changes, images))
+    finally:
+        if stats is not None: stats.stop()
+
+def render_sections(file_obj, fragment_cache=None, search_index=None, stats=None):
+    """Renders the body grouped by section, as a list of (title, sid, html).
+    Rows that come before the first section header are grouped under (None, None)."""
+    sections = []
+    groups = [(None, None, [])]
+    for chunk in iter_body_html(file_obj, sections, fragment_cache, search_index, stats):
+        # iter_body_html records a header in `sections` just before yielding it
+        if len(sections) == len(groups):
+            groups.append((*sections[-1], []))
+        groups[-1][2].append(chunk)
+    return [(title, sid, "".join(chunks)) for title, sid, chunks in groups if chunks]
+
+# --- PARALLEL CONVERSION ---
+# Rows only depend on each other through the section headers: which rows are headers and the
+# ids they get. A quick pre-scan finds the headers and gives out the ids in order; the rows in
+# between are parsed and rendered by a process pool and stitched back together in order.
+PARALLEL_CHUNK_ROWS = 2000  # long sections are split further, so one big section still spreads out
+
+def split_at_sections(rows, chunk_rows=PARALLEL_CHUNK_ROWS):
+    """The pre-scan: `rows` (lists of cells) as an ordered list of Sections and lists of the rows
+    between them, no list longer than `chunk_rows`. Headers are found exactly as iter_records
+    finds them, but only rows whose first cell could start a header are looked at closely."""
+    parts = []
+    chunk = []
+    sids = set()
+    for row in rows:
+        first = row[0].strip() if row else ""
+        if first.isupper() and len(first) > 3:
+            cells = [c.strip() for c in row]
+            if not is_junk_row(" ".join(cells).lower()) and is_section_header(cells):
+                if chunk: parts.append(chunk)
+                parts.append(Section(cells[0], section_id(cells[0], sids)))
+                chunk = []
+                continue
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            parts.append(chunk)
+            chunk = []
+    if chunk: parts.append(chunk)
+    return parts
+
+def _render_chunk(rows):
+    """Worker side of convert_parallel: the HTML for rows without section headers, and their
+    search index (row ids starting at 0)."""
+    index = SearchIndex()
+    html_rows = []
+    for record in iter_records(rows):
+        for item in parse_row_items(record):
+            index.add(item.name, item.notes)
+            html_rows.append(render_item(item))
+    return "".join(html_rows), index
+
+def convert_parallel(file_obj, workers=None, chunk_rows=PARALLEL_CHUNK_ROWS, assets=None):
+    """convert_data_to_html (standard page) with the rows parsed and rendered by `workers`
+    processes (default: one per CPU). The page is identical; it is only worth it for big sheets."""
+    from concurrent.futures import ProcessPoolExecutor  # here, like the profilers: costly to import
+    parts = split_at_sections(csv.reader(file_obj), chunk_rows)
+    chunks = [part for part in parts if not isinstance(part, Section)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Big chunks keep pickling overhead down; map() returns them in order
+        rendered = iter(pool.map(_render_chunk, chunks))
+        body = []
+        sections = []
+        search_index = SearchIndex()
+        for part in parts:
+            if isinstance(part, Section):
+                sections.append((part.title, part.sid))
+                body.append(render_section_header(part))
+            else:
+                html_rows, index = next(rendered)
+                body.append(html_rows)
+                search_index.extend(index)
+    return get_html_head(assets) + "".join(body) + get_html_tail(sections, search_index=search_index,
+                                                                   assets=assets)
+
+# --- INPUT ---
+# Biggest CSV accepted. Real weekly sheets are well under 1 MB; this only stops a wrong file
+# (or a runaway export) from taking the worker down.
+MAX_INPUT_BYTES = 64 * 2**20
+# How much of a file without a BOM is checked for UTF-8 before falling back to Windows-1252
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+def check_input_size(size, max_bytes=MAX_INPUT_BYTES):
+    if max_bytes is not None and size > max_bytes:
+        raise ValueError(f"The file is {size / 2**20:.1f} MB, over the {max_bytes / 2**20:.0f} MB limit. "
+                         "Is it the weekly product list?")
+
+def detect_encoding(data):
+    """Encoding of raw CSV bytes from the BOM, or from the first ENCODING_SNIFF_BYTES if there is none.
+    Sheets saved from Excel on Windows without "UTF-8" picked come out as Windows-1252."""
+    view = memoryview(data)
+    head = bytes(view[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    sample = bytes(view[:ENCODING_SNIFF_BYTES])
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A character cut in half by the end of the sample doesn't count
+        if not (len(sample) < view.nbytes and e.reason == "unexpected end of data"):
+            return "cp1252"
+    return "utf-8"
+
+class _BufferReader(io.RawIOBase):
+    """Reads a bytes-like object (bytes, an mmap, an upload's getbuffer()) in place, without copying it."""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+    def close(self):
+        # Lets the owner of the buffer (an mmap) close it once the text stream is done
+        self._view.release()
+        super().close()
+
+def open_upload(data, max_bytes=MAX_INPUT_BYTES):
+    """Text stream over raw CSV bytes, decoded the same way wherever they come from
+    (the upload box, the batch CLI), so the same file always gives the same page.
+
+    The bytes are decoded incrementally as csv.reader asks for rows, so the only full copy in
+    memory is `data` itself. Use it as a context manager when `data` is an mmap, so the mmap
+    can be closed afterwards. Raises ValueError if `data` is bigger than `max_bytes`."""
+    view = memoryview(data)
+    check_input_size(view.nbytes, max_bytes)
+    encoding = detect_encoding(view)
+    return io.TextIOWrapper(io.BufferedReader(_BufferReader(view)), encoding=encoding,
+                            errors='replace', newline='')
+
+@contextlib.contextmanager
+def map_input(path, max_bytes=MAX_INPUT_BYTES):
+    """The bytes of the file at `path`, memory-mapped rather than read. For the command-line tools."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        check_input_size(size, max_bytes)
+        if size == 0:  # an empty file can't be mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+# --- RESULT CACHE ---
+def config_fingerprint():
+    """Hash of everything in the config that changes the output."""
+    config = {'badges': BADGE_MAP, 'skip': SKIP_PHRASES, 'sizes': sorted(SIZE_LABELS)}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+def renderer_fingerprint():
+    """Hash of what the page is built from besides the rows: the head and tail markup with the
+    stylesheet and cart script, and the other page scripts. Rows are covered by FRAGMENT_VERSION.
+    Stored results and ETags keyed on it go stale when an upgrade changes the page."""
+    parts = [str(FRAGMENT_VERSION), get_html_head(), get_html_tail([]), _VIRTUAL_JS, _SHARD_JS, _SW_JS,
+             _SW_REGISTER, _ICON_SVG]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+def result_key(data, mode="static"):
+    """Cache key for converting the raw uploaded bytes with the current config and renderer."""
+    h = hashlib.sha256(data)
+    h.update(config_fingerprint().encode("ascii"))
+    h.update(renderer_fingerprint().encode("ascii"))
+    h.update(mode.encode("ascii"))
+    return h.hexdigest()
+
+class ResultCache:
+    """In-memory LRU of conversion results, capped by entry count and by total size."""
+
+    def __init__(self, max_entries=16, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # key -> (value, size), least recently used first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None: return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size):
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        # Anything bigger than the whole cache is just not kept
+        if size > self.max_bytes: return
+        self._entries[key] = (value, size)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+# Bump this whenever parse_row_items or render_item change what they produce
+FRAGMENT_VERSION = 3
+
+def _atomic_write_text(path, text):
+    _atomic_write_bytes(path, text.encode("utf-8"))
+
+def _atomic_write_bytes(path, data):
+    """Writes to a temp file in the same directory, then renames it over `path`."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp makes the file private; outputs are meant to be served and shared
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class FragmentCache:
+    """On-disk cache of parsed and rendered item rows, keyed by a hash of the row's name, price and notes.
+
+    Only rows used by the latest conversion are written back by save(), so the file follows
+    the current sheet instead of growing week after week."""
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # Changing the config or the renderer invalidates every stored row
+        self._salt = f"{FRAGMENT_VERSION}:{config_fingerprint()}"
+        self._stored = {}
+        self._used = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._stored = json.load(f)
+            except (OSError, ValueError):
+                # A damaged cache file only costs us a full rebuild
+                self._stored = {}
+
+    def row_key(self, row):
+        price = row[1] if len(row) > 1 else ""
+        notes = " ".join(row[2:]) if len(row) > 2 else ""
+        payload = json.dumps([self._salt, row[0], price, notes])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, row):
+        """{'items': [Item.to_list(), ...], 'html': ...} for an item row, parsed and rendered on a miss.
+        hits and misses count distinct rows of this run: a row looked up again (a second pass over
+        the sheet, or the same row listed twice) was already counted."""
+        key = self.row_key(row)
+        entry = self._used.get(key)
+        if entry is not None:
+            return entry
+        entry = self._stored.get(key)
+        if entry is None:
+            self.misses += 1
+            items = parse_row_items(row)
+            entry = {'items': [item.to_list() for item in items],
+                     'html': "".join(render_item(item) for item in items)}
+        else:
+            self.hits += 1
+        self._used[key] = entry
+        return entry
+
+    def render_row(self, row):
+        """HTML for an item row, from the cache when the same row was seen before."""
+        return self.lookup(row)['html']
+
+    def parse_row(self, row):
+        """Items for an item row, from the cache when the same row was seen before."""
+        return [Item.from_list(values) for values in self.lookup(row)['items']]
+
+    def summary(self):
+        return f"{self.hits} rows reused, {self.misses} rows parsed"
+
+    def next_run(self):
+        """Starts another conversion with the same cache, for long-running callers (watch mode):
+        the rows of the last conversion become the stored rows and the counters start over."""
+        if self._used:
+            self._stored, self._used = self._used, {}
+        self.hits = self.misses = 0
+
+    def save(self):
+        _atomic_write_text(self.path, json.dumps(self._used))
+
+# --- PUBLISH MODE ---
+# For hosting the menu rather than handing out one file: the stylesheet and scripts go into
+# content-hashed files that browsers can cache forever (a new week's menu only re-downloads the
+# HTML), the HTML is minified, and every file gets .gz and .br siblings for the web server.
+try:
+    import brotli
+except ImportError:  # Optional: without it only the .gz siblings are written
+    brotli = None
+
+ASSET_DIR = "assets"
+PUBLISH_NAME = "core_goods_menu"
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    # Not around ':' in general, since "a :hover" and "a:hover" are different selectors
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+_RAW_TEXT_RE = re.compile(r"(<script\b.*?</script>|<style\b.*?</style>)", re.S)
+
+def minify_html(page):
+    """Drops indentation and blank lines. Any whitespace run that contains a line break becomes a
+    single line break, which renders the same; scripts and styles are left alone."""
+    parts = _RAW_TEXT_RE.split(page)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s*\n\s*", "\n", parts[i])
+    return "".join(parts).strip() + "\n"
+
+def write_compressed(path, data):
+    """Writes `data` to `path` plus path.gz and path.br (when brotli is installed).
+    Returns the sizes as {'raw', 'gz', 'br'}, with 'br' None if it wasn't written."""
+    _atomic_write_bytes(path, data)
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    _atomic_write_bytes(path + ".gz", gz)
+    sizes = {'raw': len(data), 'gz': len(gz), 'br': None}
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        _atomic_write_bytes(path + ".br", br)
+        sizes['br'] = len(br)
+    return sizes
+
+def compressed_sizes(data):
+    return {'raw': len(data), 'gz': len(gzip.compress(data, compresslevel=9, mtime=0)),
+            'br': len(brotli.compress(data, quality=11)) if brotli is not None else None}
+
+def _publish_file(out_dir, url, data):
+    """Writes a content-hashed file at out_dir/url with its compressed siblings, unless an
+    earlier run already did (the name says the content is the same). Returns its sizes."""
+    path = os.path.join(out_dir, *url.split("/"))
+    if os.path.exists(path) and os.path.exists(path + ".gz") and (brotli is None or os.path.exists(path + ".br")):
+        return {'raw': len(data), 'gz': os.path.getsize(path + ".gz"),
+                'br': os.path.getsize(path + ".br") if brotli is not None else None}
+    return write_compressed(path, data)
+
+def publish_assets(out_dir, mode="static"):
+    """Writes the stylesheet and scripts a `mode` page needs under out_dir/assets.
+
+    Returns (assets, sizes): the URLs to pass as `assets` when rendering (relative to out_dir),
+    and {url: sizes} for the report. The names carry a hash of the content, so a file that
+    already exists is already right and is left alone."""
+    files = {'css': ("menu", "css", minify_css(PAGE_CSS)), 'app': ("menu", "js", PAGE_JS)}
+    if mode == "virtual":
+        files['virtual'] = ("menu-virtual", "js", _VIRTUAL_JS)
+    elif mode == "sharded":
+        files['shards'] = ("menu-shards", "js", _SHARD_JS)
+    assets, sizes = {}, {}
+    for role, (stem, ext, text) in files.items():
+        data = text.encode("utf-8")
+        url = f"{ASSET_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{ext}"
+        sizes[url] = _publish_file(out_dir, url, data)
+        assets[role] = url
+    return assets, sizes
+
+def publish_page(data, out_dir, name=PUBLISH_NAME, mode="static", fragment_cache=None, price_changes=None,
+                 offline=False, images=None, compare=True):
+    """Publishes the menu for the raw CSV bytes `data` as out_dir/<name>.html plus its assets.
+    The page is written last, so it never links to a file that isn't there yet; with `offline`,
+    only its service worker (see OFFLINE PAGES) comes after it, since it is versioned by the page.
+
+    Returns a report: {'artifacts': {path: sizes}, 'single_file': sizes of the one-file page}.
+    Building the one-file page is a second conversion; with compare=False (watch mode, where
+    rebuild time matters) it is skipped and 'single_file' is None."""
+    assets, artifacts = publish_assets(out_dir, mode)
+    if offline:
+        offline_assets, offline_sizes = publish_offline_assets(out_dir, name)
+        assets.update(offline_assets)
+        artifacts.update(offline_sizes)
+    shards = {}
+    with open_upload(data) as stream:
+        if mode == "sharded":
+            page, shards = publish_shards(parse_catalog(stream, fragment_cache), out_dir, assets,
+                                          price_changes=price_changes, images=images)
+        else:
+            page = convert_data_to_html(stream, fragment_cache, mode=mode, assets=assets, price_changes=price_changes,
+                                        images=images)
+    page = minify_html(page).encode("utf-8")
+    artifacts = {f"{name}.html": write_compressed(os.path.join(out_dir, f"{name}.html"), page),
+                 **artifacts, **shards}
+    if offline:
+        artifacts[assets['sw']] = publish_service_worker(out_dir, page, assets)
+    if not compare:
+        return {'artifacts': artifacts, 'single_file': None}
+    # A sharded site is compared against the standard page, since it replaces it for big menus.
+    # Not through the fragment cache: its counters are the report of the real conversion.
+    with open_upload(data) as stream:
+        single = convert_data_to_html(stream, mode="static" if mode == "sharded" else mode,
+                                      price_changes=price_changes, images=images).encode("utf-8")
+    return {'artifacts': artifacts, 'single_file': compressed_sizes(single)}
+
+def _kb(size):
+    return "-" if size is None else f"{size / 1024:.1f} KB"
+
+def format_publish_report(report):
+    """A table of every artifact's size raw / gzip / brotli, and what a returning visitor saves."""
+    lines = [f"{'artifact':<40}{'raw':>11}{'gzip':>11}{'brotli':>11}{'saved':>8}"]
+    rows = {path: sizes for path, sizes in report['artifacts'].items() if not path.startswith(SHARD_DIR + "/")}
+    shards = [sizes for path, sizes in report['artifacts'].items() if path.startswith(SHARD_DIR + "/")]
+    if shards:
+        # One line for all of them; a big menu has hundreds
+        rows[f"{SHARD_DIR}/ ({len(shards)} files)"] = {
+            size: None if any(s[size] is None for s in shards) else sum(s[size] for s in shards)
+            for size in ('raw', 'gz', 'br')}
+    for path, sizes in rows.items():
+        best = min(size for size in (sizes['gz'], sizes['br']) if size is not None)
+        lines.append(f"{path:<40}{_kb(sizes['raw']):>11}{_kb(sizes['gz']):>11}{_kb(sizes['br']):>11}"
+                     f"{1 - best / sizes['raw']:>8.0%}")
+    # Transfer per visit, compressed the best way available, against the old single file.
+    # Shards are cached like the assets: a returning visitor only fetches the changed sections.
+    key = 'gz' if brotli is None else 'br'
+    pages = [sizes[key] for path, sizes in rows.items() if path.endswith(".html")]
+    first = sum(sizes[key] for sizes in report['artifacts'].values())
+    if report['single_file'] is None:
+        lines.append(f"Published: {_kb(first)} on a first visit, {_kb(sum(pages))} once the assets are cached ({key}).")
+    else:
+        single = report['single_file'][key]
+        lines.append(f"Single-file page: {_kb(single)} ({key}). Published: {_kb(first)} on a first visit, "
+                     f"{_kb(sum(pages))} once the assets are cached ({1 - sum(pages) / single:.0%} less).")
+    if any(path.endswith(".sw.js") for path in rows):
+        lines.append("Offline: repeat visits open the page from the service worker's cache; it is "
+                     "refreshed in the background.")
+    if brotli is None:
+        lines.append("brotli isn't installed, so no .br files were written (pip install brotli).")
+    return "\n".join(lines)
+
+# --- SHARDED SITE ---
+# For catalogs too big for one document: the page holds the nav and the section headers, and
+# each section's rows are a separate HTML fragment (a shard) that is fetched when it nears the
+# screen or a search needs it. Shards and the search index are named by a hash of their content
+# like the assets, so an unchanged section is never downloaded twice. Needs a web server:
+# browsers don't fetch() from file:// pages.
+PUBLISH_MODES = OUTPUT_MODES + ("sharded",)
+SHARD_DIR = "shards"
+# Longer sections are split over several shards, so each one stays quick to fetch and build
+SHARD_MAX_ITEMS = 500
+EST_ROW_PX = 96  # placeholder height per row until a shard arrives
+
+_SHARD_JS = """
+(function() {
+    // Row ids (for search) run across the shards in page order; each shard knows its first one.
+    // Shards are never dropped once loaded, so their +/- controls stay registered with the cart.
+    const INDEX_URL = document.currentScript.dataset.index;
+    const shards = Array.from(document.querySelectorAll('.cg-shard'), el => ({
+        el: el, first: parseInt(el.dataset.first), rows: null, visible: null, loading: null }));
+    let matches = null;  // row ids matching the current search, or null for all
+
+    function showRows(shard) {
+        for (let j = 0; j < shard.rows.length; j++) {
+            const show = (matches === null || matches.has(shard.first + j)) ? 1 : 0;
+            if (show !== shard.visible[j]) { shard.visible[j] = show; shard.rows[j].style.display = show ? '' : 'none'; }
+        }
+    }
+
+    function loadShard(shard) {
+        if (shard.loading) return shard.loading;
+        observer.unobserve(shard.el);
+        shard.loading = fetch(shard.el.dataset.src)
+            .then(r => { if (!r.ok) throw new Error(r.statusText); return r.text(); })
+            .then(text => {
+                shard.el.innerHTML = text;
+                shard.el.style.minHeight = '';
+                shard.rows = Array.from(shard.el.querySelectorAll('.cg-item-row'));
+                shard.visible = new Uint8Array(shard.rows.length).fill(1);
+                registerControls(shard.el);
+                // Items already in the cart show their count, not the + button
+                shard.el.querySelectorAll('.cg-qty-wrapper').forEach(w => {
+                    const item = cart.get(w.dataset.id);
+                    if (item) w.innerHTML = qtyControlsHtml(item.qty);
+                });
+                showRows(shard);
+            })
+            .catch(() => {
+                shard.el.innerHTML = "<p style='text-align:center; color:#999;'>This section couldn't be loaded. Reload the page to try again.</p>";
+            });
+        return shard.loading;
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => { if (entry.isIntersecting) loadShard(entry.target.shard); });
+    }, { rootMargin: '1500px 0px' });
+    shards.forEach(shard => { shard.el.shard = shard; observer.observe(shard.el); });
+
+    function shardsWithMatches() {
+        // Shards are in row id order, so each match's shard is a binary search away
+        const hit = new Uint8Array(shards.length);
+        for (const id of matches) {
+            let lo = 0, hi = shards.length - 1;
+            while (lo < hi) { const mid = (lo + hi + 1) >> 1; if (shards[mid].first <= id) lo = mid; else hi = mid - 1; }
+            hit[lo] = 1;
+        }
+        return hit;
+    }
+
+    // Replaces the standard page's applySearch, which the search box calls by name.
+    // The index is only fetched on the first search; shards with matches are fetched as needed.
+    let indexLoading = null;
+    let searchSeq = 0;
+    window.applySearch = async function (term) {
+        const seq = ++searchSeq;
+        if (term.toLowerCase().match(WORD_RE)) {
+            indexLoading = indexLoading || fetch(INDEX_URL).then(r => r.json()).then(index => { searchIndex = index; });
+            try { await indexLoading; } catch (e) { indexLoading = null; return; }
+        }
+        if (seq !== searchSeq) return;  // a newer search started while the index loaded
+        matches = findMatches(term);
+        const hit = matches === null ? null : shardsWithMatches();
+        shards.forEach((shard, i) => {
+            const show = hit === null || hit[i] === 1;
+            shard.el.style.display = show ? '' : 'none';
+            if (!show) return;
+            if (shard.rows) showRows(shard);
+            else if (hit !== null) loadShard(shard);  // its rows are filtered when it arrives
+        });
+    };
+})();
+"""
+
+def iter_shards(catalog, max_items=SHARD_MAX_ITEMS):
+    """(section, first row id, items) for every shard, in page order."""
+    first = 0
+    for section in catalog.sections:
+        for start in range(0, len(section.items), max_items):
+            items = section.items[start:start + max_items]
+            yield section, first, items
+            first += len(items)
+
+def _publish_shard(out_dir, items, price_changes, images=None):
+    data = minify_html("".join(render_item(item, previous=price_changes.get(item.name),
+                                           image=images.find(item) if images is not None else None)
+                               for item in items)).encode("utf-8")
+    url = f"{SHARD_DIR}/{hashlib.sha256(data).hexdigest()[:16]}.html"
+    return url, _publish_file(out_dir, url, data)
+
+def publish_shards(catalog, out_dir, assets, workers=None, price_changes=None, images=None):
+    """Writes the shards and the search index for `catalog` under out_dir/shards and returns
+    (index page HTML, {url: sizes}). `assets` comes from publish_assets(out_dir, "sharded").
+
+    Shards are rendered and written by a pool of `workers` threads: compressing them is most of
+    the work, and gzip and brotli release the GIL while they run."""
+    from concurrent.futures import ThreadPoolExecutor  # here, like the profilers: costly to import
+    shards = list(iter_shards(catalog))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        written = list(pool.map(lambda shard: _publish_shard(out_dir, shard[2], price_changes or {}, images), shards))
+    sizes = dict(written)
+
+    index = build_search_index(catalog).to_json().encode("utf-8")
+    index_url = f"{SHARD_DIR}/index.{hashlib.sha256(index).hexdigest()[:16]}.json"
+    sizes[index_url] = _publish_file(out_dir, index_url, index)
+
+    body = []
+    placeholders = iter(zip(shards, written))
+    pending = next(placeholders, None)
+    for section in catalog.sections:
+        if section.sid:
+            body.append(render_section_header(section))
+        while pending is not None and pending[0][0] is section:
+            (_, first, items), (url, _) = pending
+            body.append(f'<div class="cg-shard" data-src="{url}" data-first="{first}" '
+                        f'style="min-height:{len(items) * EST_ROW_PX}px"></div>')
+            pending = next(placeholders, None)
+    script = f'\n<script src="{assets["shards"]}" data-index="{index_url}"></script>'
+    page = get_html_head(assets) + "".join(body) + get_html_tail(catalog.nav(), script, assets=assets)
+    return page, sizes
+
+# --- OFFLINE PAGES ---
+# A published page can also come with a service worker and a web app manifest, so it opens
+# instantly from the browser's cache on repeat visits (and with no connection at all), and can
+# be added to a phone's home screen. The worker's cache is named after a hash of the page and
+# its assets: publishing a new week changes the worker file, the browser installs it in the
+# background, and it drops the old week's cache. Service workers need the page served over
+# HTTP(S), so this is a publish option only.
+THEME_COLOR = "#2c5e2e"
+
+_ICON_SVG = f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512">
+<rect width="512" height="512" rx="96" fill="{THEME_COLOR}"/>
+<text x="256" y="330" font-family="sans-serif" font-size="240" font-weight="bold" fill="#fff" text-anchor="middle">CG</text>
+</svg>
+"""
+
+_SW_REGISTER = """
+<script>
+    if ('serviceWorker' in navigator) window.addEventListener('load', () => {{
+        navigator.serviceWorker.register('{url}', {{ scope: './{page}' }}).catch(() => {{}});
+    }});
+</script>"""
+
+# Appended to "const CACHE = ..., PAGE = ..., PRECACHE = [...];" by publish_page
+_SW_JS = """
+const PREFIX = CACHE.slice(0, CACHE.lastIndexOf(':') + 1);
+
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(CACHE).then(cache => cache.addAll(PRECACHE)).then(() => self.skipWaiting()));
+});
+
+// Only this page's older versions are dropped; other pages in the same folder have their own prefix
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys()
+        .then(keys => Promise.all(keys.filter(k => k.startsWith(PREFIX) && k !== CACHE).map(k => caches.delete(k))))
+        .then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET' || new URL(request.url).origin !== location.origin) return;
+    if (request.mode === 'navigate') {
+        // The page: serve the cached copy at once and refresh it in the background
+        event.respondWith(caches.open(CACHE).then(async cache => {
+            const cached = await cache.match(PAGE);
+            const fresh = fetch(request).then(response => {
+                if (response.ok) cache.put(PAGE, response.clone());
+                return response;
+            });
+            if (!cached) return fresh;
+            event.waitUntil(fresh.catch(() => {}));
+            return cached;
+        }));
+        return;
+    }
+    // Everything else has a content hash in its name, so a cached copy is never stale
+    event.respondWith(caches.match(request).then(cached => cached || fetch(request).then(response => {
+        if (response.ok) {
+            const copy = response.clone();
+            event.waitUntil(caches.open(CACHE).then(cache => cache.put(request, copy)));
+        }
+        return response;
+    })));
+});
+"""
+
+def publish_offline_assets(out_dir, name):
+    """Writes the icon and the manifest for page `name`. Returns (assets, sizes) as publish_assets
+    does, with the 'icon', 'manifest', 'sw' and 'page' URLs for rendering and publish_service_worker."""
+    icon = _ICON_SVG.encode("utf-8")
+    icon_url = f"{ASSET_DIR}/icon.{hashlib.sha256(icon).hexdigest()[:12]}.svg"
+    sizes = {icon_url: _publish_file(out_dir, icon_url, icon)}
+    manifest = json.dumps({
+        'name': "Core Goods Order", 'short_name': "Core Goods", 'start_url': f"./{name}.html",
+        'scope': f"./{name}.html", 'display': "standalone", 'background_color': "#ffffff",
+        'theme_color': THEME_COLOR, 'icons': [{'src': icon_url, 'sizes': "any", 'type': "image/svg+xml"}],
+    }, indent=2).encode("utf-8")
+    manifest_url = f"{name}.webmanifest"
+    sizes[manifest_url] = write_compressed(os.path.join(out_dir, manifest_url), manifest)
+    assets = {'icon': icon_url, 'manifest': manifest_url, 'sw': f"{name}.sw.js", 'page': f"{name}.html"}
+    return assets, sizes
+
+def publish_service_worker(out_dir, page, assets):
+    """Writes the service worker for the already-rendered `page` (bytes). Its cache version is a
+    hash of the page and the asset URLs, which carry their own content hashes. Returns its sizes."""
+    precache = [assets['page']] + [url for role, url in assets.items() if role not in ('sw', 'page')]
+    version = hashlib.sha256(page + "\n".join(precache).encode("utf-8")).hexdigest()[:12]
+    cache = f"core-goods:{assets['page']}:{version}"
+    header = f"const CACHE = {json.dumps(cache)}, PAGE = {json.dumps(assets['page'])}, PRECACHE = {json.dumps(precache)};\n"
+    return write_compressed(os.path.join(out_dir, assets['sw']), (header + _SW_JS).encode("utf-8"))
@@ -0,0 +1,168 @@
+"""Price history across weeks, kept in a local SQLite file.
+
+Every conversion can record its parsed items, so "what did this cost last month" and "what
+changed since last week" are index lookups instead of re-parsing old CSVs:
+
+    python price_history.py history.db --changes                 # latest week, every menu
+    python price_history.py history.db --item "Oat Milk (qt)"    # one item, week by week
+
+convert_batch.py --history history.db records each sheet it converts and marks changed
+prices on the page.
+"""
+import os
+import re
+import sys
+import sqlite3
+import argparse
+import datetime
+from menu_core import Item, split_size
+
+DEFAULT_MENU = "menu"
+
+# One row per item per menu per week. The primary key doubles as the index for an item's
+# history in one menu; the other two serve lookups by name across menus and by week.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    menu       TEXT NOT NULL,
+    week       TEXT NOT NULL,     -- Monday of the week, YYYY-MM-DD
+    name       TEXT NOT NULL,
+    size       TEXT,              -- size label of a split row ("sm", "qt", ...), else NULL
+    price_str  TEXT NOT NULL,
+    std_cents  INTEGER NOT NULL,
+    std_per    INTEGER NOT NULL,
+    bulk_cents INTEGER NOT NULL,
+    bulk_per   INTEGER NOT NULL,
+    thresh     INTEGER NOT NULL,
+    PRIMARY KEY (menu, name, week)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prices_name ON prices (name, week);
+CREATE INDEX IF NOT EXISTS prices_week ON prices (week, menu);
+"""
+
+PRICE_COLUMNS = ("price_str", "std_cents", "std_per", "bulk_cents", "bulk_per", "thresh")
+
+def _columns(table):
+    return ", ".join(f"{table}.{column}" for column in PRICE_COLUMNS)
+
+_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+def week_of(day):
+    """The Monday of `day`'s week, as the store keys weeks."""
+    return (day - datetime.timedelta(days=day.weekday())).isoformat()
+
+def describe_input(csv_path):
+    """(menu, week) for a CSV: a YYYY-MM-DD in the file name gives the week and the rest of the
+    name is the menu ("store-a-2024-01-08.csv"); otherwise the file's modification date is used."""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    match = _DATE_RE.search(stem)
+    if match:
+        day = datetime.date(*map(int, match.groups()))
+        stem = (stem[:match.start()] + stem[match.end():]).strip(" -_")
+    else:
+        day = datetime.date.fromtimestamp(os.path.getmtime(csv_path))
+    return stem or DEFAULT_MENU, week_of(day)
+
+def _item(name, row):
+    return Item(name, row[0], "", *row[1:])
+
+class PriceHistory:
+    """Weekly prices per menu. Recording a week replaces what was stored for it, so a sheet that
+    is re-converted after mid-week edits keeps only its latest prices."""
+
+    def __init__(self, path):
+        # The batch converter records from several processes at once; they wait for each other
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, menu, week, catalog):
+        """Stores every priced item of `catalog` for `week`, in one transaction. Returns the count.
+        A name listed twice in the sheet keeps its last price, as the cart does."""
+        rows = {}
+        for item in catalog.items():
+            if item.std_cents:
+                rows[item.name] = (menu, week, item.name, split_size(item.name)[1], item.price_str,
+                                   item.std_cents, item.std_per, item.bulk_cents, item.bulk_per, item.thresh)
+        with self.db:
+            self.db.execute("DELETE FROM prices WHERE week = ? AND menu = ?", (week, menu))
+            self.db.executemany(f"INSERT INTO prices VALUES ({', '.join('?' * 10)})", rows.values())
+        return len(rows)
+
+    def weeks(self, menu=None):
+        if menu is None:
+            return [w for w, in self.db.execute("SELECT DISTINCT week FROM prices ORDER BY week")]
+        return [w for w, in self.db.execute("SELECT DISTINCT week FROM prices WHERE menu = ? ORDER BY week", (menu,))]
+
+    def menus(self):
+        return [m for m, in self.db.execute("SELECT DISTINCT menu FROM prices ORDER BY menu")]
+
+    def history(self, name, menu=None):
+        """[(menu, week, Item)] for one item, oldest first."""
+        query = f"SELECT menu, week, {_columns('prices')} FROM prices WHERE name = ?"
+        params = [name]
+        if menu is not None:
+            query += " AND menu = ?"
+            params.append(menu)
+        return [(row[0], row[1], _item(name, row[2:]))
+                for row in self.db.execute(query + " ORDER BY week, menu", params)]
+
+    def changes(self, menu, week):
+        """{name: (before, now)} for every item of `menu` whose unit price in `week` differs from
+        the last earlier week it was listed. Both are Items; the unit price is cents / per."""
+        rows = self.db.execute(f"""
+            SELECT cur.name, {_columns('prev')}, {_columns('cur')}
+            FROM prices AS cur
+            JOIN prices AS prev ON prev.menu = cur.menu AND prev.name = cur.name AND prev.week = (
+                SELECT MAX(week) FROM prices WHERE menu = cur.menu AND name = cur.name AND week < cur.week)
+            WHERE cur.menu = ? AND cur.week = ? AND cur.std_cents * prev.std_per != prev.std_cents * cur.std_per
+            ORDER BY cur.name""", (menu, week))
+        return {row[0]: (_item(row[0], row[1:7]), _item(row[0], row[7:13])) for row in rows}
+
+    def price_changes(self, menu, week):
+        """The {name: earlier Item} that convert_data_to_html(price_changes=...) annotates from."""
+        return {name: before for name, (before, _) in self.changes(menu, week).items()}
+
+# --- COMMAND LINE ---
+def _dollars(item):
+    return f"${item.std_cents / item.std_per / 100:.2f}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the weekly price history.")
+    parser.add_argument("db", help="History file (written by convert_batch.py --history)")
+    parser.add_argument("--menu", help="Only this menu (default: all)")
+    parser.add_argument("--week", help="Any date in the week to compare (default: the latest recorded)")
+    parser.add_argument("--changes", action="store_true", help="List prices that changed that week")
+    parser.add_argument("--item", help="Show one item's price week by week")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ Error: {args.db} doesn't exist")
+        return 1
+    with PriceHistory(args.db) as store:
+        if args.item:
+            for menu, week, item in store.history(args.item, args.menu):
+                print(f"{week}  {menu:<30} {item.price_str}")
+        if args.changes or not args.item:
+            week = week_of(datetime.date.fromisoformat(args.week)) if args.week else None
+            for menu in [args.menu] if args.menu else store.menus():
+                weeks = store.weeks(menu)
+                if not weeks:
+                    continue
+                current = week or weeks[-1]
+                changed = store.changes(menu, current)
+                print(f"{menu}, week of {current}: {len(changed)} price changes")
+                for name, (before, now) in changed.items():
+                    print(f"  {name:<50} {_dollars(before):>8} -> {_dollars(now):>8}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
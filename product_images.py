@@ -0,0 +1,209 @@
+"""Product photos for the menu, resized and converted to WebP locally with Pillow.
+
+    python product_images.py photos/ --out site/     # process ahead of a conversion, with a report
+
+Photos are matched to items by name: "Oat Milk (qt)" uses photos/oat-milk-qt.jpg, or else
+photos/oat-milk.jpg. A notes cell that names a file ("oat-milk-carton.png") picks that file
+instead, so the sheet can have an image column. Each photo is written at IMAGE_WIDTHS under
+<out>/images/, named by a hash of the original, and an index there remembers what was done:
+photos that haven't changed since the last run are neither decoded nor hashed again.
+
+Pass an ImageLibrary as convert_data_to_html(..., images=library), or use
+convert_batch.py --images photos/.
+"""
+import io
+import os
+import re
+import sys
+import html
+import json
+import base64
+import hashlib
+import argparse
+from menu_core import split_size, _atomic_write_bytes, _atomic_write_text
+
+try:
+    from PIL import Image, ImageOps
+    # What a bad photo raises: OSError covers "cannot identify image file"; a decompression bomb
+    # is a photo too large to decode safely
+    PHOTO_ERRORS = (OSError, Image.DecompressionBombError)
+except ImportError:  # Optional: only needed when there are photos to process
+    Image = None
+    PHOTO_ERRORS = OSError
+
+IMAGE_DIR = "images"
+IMAGE_WIDTHS = (80, 160, 320)   # 1x, 2x and 4x the row's 80px photo (THUMB_PX)
+WEBP_QUALITY = 80
+PLACEHOLDER_WIDTH = 16          # the inline preview, a few hundred bytes as a data: URI
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+# A file name in the notes, like "oat-milk-carton.png"
+IMAGE_REF_RE = re.compile(r"[\w.-]+\.(?:jpe?g|png|webp|gif)\b", re.I)
+
+def slug(name):
+    """The file stem a photo for `name` is looked up by: "Oat Milk (qt)" -> "oat-milk-qt"."""
+    return re.sub(r"[^a-z0-9]+", "-", html.unescape(name).lower()).strip("-")
+
+def _settings():
+    # Changing any of these invalidates every processed photo
+    return f"{IMAGE_WIDTHS} {WEBP_QUALITY} {PLACEHOLDER_WIDTH}"
+
+class ProductImage:
+    """One processed photo: its WebP files as [(url, width)], smallest first, the original's
+    size in pixels, and a tiny placeholder as a data: URI."""
+    __slots__ = ('files', 'width', 'height', 'placeholder')
+
+    def __init__(self, files, width, height, placeholder):
+        self.files = files
+        self.width = width
+        self.height = height
+        self.placeholder = placeholder
+
+    def __repr__(self):
+        return f"ProductImage({self.files[0][0]!r}, {self.width}x{self.height})"
+
+def _webp(image, width, quality=WEBP_QUALITY):
+    height = max(1, round(image.height * width / image.width))
+    out = io.BytesIO()
+    image.resize((width, height), Image.LANCZOS).save(out, "WEBP", quality=quality, method=6)
+    return out.getvalue()
+
+def process_photo(data, out_dir, digest):
+    """Decodes one photo's bytes and writes its WebP widths to out_dir/images/<digest>-<width>.webp.
+    Returns the index entry: {'size': [w, h], 'widths': [...], 'placeholder': data URI}."""
+    if Image is None:
+        raise ImportError("Product photos need Pillow (pip install Pillow)")
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)  # phone photos are often stored sideways
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    # Never scaled up: a small photo gets its own width instead of the larger ones
+    widths = [w for w in IMAGE_WIDTHS if w <= image.width] or [image.width]
+    for width in widths:
+        _atomic_write_bytes(os.path.join(out_dir, IMAGE_DIR, f"{digest}-{width}.webp"), _webp(image, width))
+    preview = _webp(image, min(PLACEHOLDER_WIDTH, image.width), quality=30)
+    return {'size': [image.width, image.height], 'widths': widths,
+            'placeholder': "data:image/webp;base64," + base64.b64encode(preview).decode("ascii")}
+
+class ImageLibrary:
+    """The photos in `photo_dir`, processed into `out_dir`. update() brings the output up to date,
+    and load() just reads what the last update() saved; find(item) is what the page renderers
+    call. The page must end up in `out_dir` (or link the images folder the same way), since
+    photos are linked as "images/..."."""
+
+    def __init__(self, photo_dir, out_dir):
+        self.photo_dir = photo_dir
+        self.out_dir = out_dir
+        self.index_path = os.path.join(out_dir, IMAGE_DIR, "index.json")
+        self.images = {}    # digest -> index entry
+        self.sources = {}   # file name -> [mtime_ns, size, digest]
+        self.by_name = {}   # slug or lowercased file name -> ProductImage
+        self.processed = 0
+        self.errors = {}    # file name -> message, for photos that couldn't be read
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get('settings') == _settings():
+                self.images, self.sources = index['images'], index['sources']
+        except (OSError, ValueError, KeyError):
+            pass  # no index yet (or a broken one): everything is processed again
+
+    def update(self, workers=None):
+        """Processes new and changed photos, drops removed ones from the index, and rebuilds the
+        lookup. Photos are processed by a pool of `workers` threads: Pillow releases the GIL while
+        it resizes and encodes. Returns self."""
+        from concurrent.futures import ThreadPoolExecutor  # here, like the profilers: costly to import
+        names = sorted(n for n in os.listdir(self.photo_dir) if n.lower().endswith(PHOTO_EXTENSIONS))
+        sources, todo = {}, {}
+        for name in names:
+            st = os.stat(os.path.join(self.photo_dir, name))
+            known = self.sources.get(name)
+            if known and known[:2] == [st.st_mtime_ns, st.st_size] and known[2] in self.images:
+                sources[name] = known
+                continue
+            with open(os.path.join(self.photo_dir, name), "rb") as f:
+                data = f.read()
+            # Content hash: a touched or renamed photo isn't processed again
+            digest = hashlib.sha256(data).hexdigest()[:16]
+            sources[name] = [st.st_mtime_ns, st.st_size, digest]
+            if digest not in self.images:
+                todo[digest] = data
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = dict(zip(todo, pool.map(self._process, todo.items())))
+        done = {digest: entry for digest, entry in results.items() if not isinstance(entry, str)}
+        # A photo that can't be read is left out (and tried again next run); the menu still builds
+        self.errors = {name: results[digest] for name, (_, _, digest) in sources.items()
+                       if isinstance(results.get(digest), str)}
+        for name in self.errors:
+            del sources[name]
+        self.processed = len(done)
+        used = {digest for _, _, digest in sources.values()}
+        images = {digest: entry for digest, entry in {**self.images, **done}.items() if digest in used}
+        if images != self.images or sources != self.sources:
+            self.images, self.sources = images, sources
+            _atomic_write_text(self.index_path, json.dumps(
+                {'settings': _settings(), 'images': self.images, 'sources': self.sources}, sort_keys=True))
+        return self.load()
+
+    def load(self):
+        """Builds the lookup from the index as it was saved, without listing, reading or processing
+        any photo: for the batch's worker processes, after update() has run once in the parent.
+        Returns self."""
+        self.by_name = {}
+        for name, (_, _, digest) in self.sources.items():
+            entry = self.images[digest]
+            image = ProductImage([(f"{IMAGE_DIR}/{digest}-{w}.webp", w) for w in entry['widths']],
+                                 entry['size'][0], entry['size'][1], entry['placeholder'])
+            self.by_name[name.lower()] = image
+            self.by_name.setdefault(slug(os.path.splitext(name)[0]), image)
+        return self
+
+    def _process(self, job):
+        digest, data = job
+        try:
+            return process_photo(data, self.out_dir, digest)
+        except PHOTO_ERRORS as e:
+            return f"can't read it ({type(e).__name__})"
+
+    def version(self):
+        """A hash of which photo is where, for cache keys: it changes when a photo does."""
+        return hashlib.sha256(json.dumps(self.sources, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+    def find(self, item):
+        """The ProductImage for an Item, or None."""
+        for ref in IMAGE_REF_RE.findall(item.notes):
+            image = self.by_name.get(ref.lower())
+            if image is not None:
+                return image
+        image = self.by_name.get(slug(item.name))
+        if image is None:
+            base, size = split_size(item.name)
+            if size is not None:
+                image = self.by_name.get(slug(base))
+        return image
+
+# --- COMMAND LINE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resize product photos for the menu.")
+    parser.add_argument("photos", help="Folder of photos, named after the items")
+    parser.add_argument("--out", default="site", help="Site folder; photos go under its images/ (default: site)")
+    parser.add_argument("--workers", type=int, default=None, help="Threads (default: Python's choice)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.photos):
+        print(f"❌ Error: {args.photos} isn't a folder")
+        return 1
+    try:
+        library = ImageLibrary(args.photos, args.out).update(args.workers)
+    except ImportError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    files = [os.path.join(args.out, url) for image in set(library.by_name.values()) for url, _ in image.files]
+    size = sum(os.path.getsize(path) for path in files)
+    for name, error in library.errors.items():
+        print(f"❌ {name}: {error}")
+    print(f"✅ {len(library.sources)} photos, {library.processed} processed this run: "
+          f"{len(files)} WebP files, {size / 1024:.1f} KB in {os.path.join(args.out, IMAGE_DIR)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
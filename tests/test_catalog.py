@@ -0,0 +1,83 @@
+import io
+import re
+from convert_menu import (parse_catalog, render_catalog, render_item, convert_data_to_html, amount_to_cents,
+                          catalog_to_page_data, item_id, Catalog, Section, Item)
+
+CSV_TEXT = """Loose Item Before Any Header,$1,,
+PREPARED FOODS,,,
+Item,Price,Notes,
+Soup - Cabbage Roll,$6.99 sm / $12.99 lg,vegan & gluten-free,
+Kombucha,2/$5.99,,
+BAKERY,,,
+Cookies,$2/each or $1.65/each for 6+,,
+Bread - Seasonal,Varies,,
+"""
+
+def parse():
+    return parse_catalog(io.StringIO(CSV_TEXT))
+
+def test_amount_to_cents():
+    assert amount_to_cents("5.99") == 599
+    assert amount_to_cents("5") == 500
+    assert amount_to_cents("5.") == 500
+    assert amount_to_cents("5.5") == 550
+    assert amount_to_cents("0.005") == 1
+
+def test_catalog_structure():
+    catalog = parse()
+    assert [(s.title, s.sid) for s in catalog.sections] == [
+        (None, None), ("PREPARED FOODS", "prepared-foods"), ("BAKERY", "bakery")]
+    assert catalog.nav() == [("PREPARED FOODS", "prepared-foods"), ("BAKERY", "bakery")]
+
+    soup_sm, soup_lg, kombucha = catalog.sections[1].items
+    assert soup_sm.name == "Soup - Cabbage Roll (sm)" and soup_sm.std_cents == 699
+    assert soup_lg.std_cents == 1299
+    # Bundles keep the quoted total and the bundle size, so no cents are lost
+    assert (kombucha.std_cents, kombucha.std_per, kombucha.thresh) == (599, 2, 2)
+    assert kombucha.std == 2.995
+
+    cookies, bread = catalog.sections[2].items
+    assert (cookies.std_cents, cookies.bulk_cents, cookies.thresh) == (200, 165, 6)
+    assert bread.std_cents == 0
+
+def test_render_catalog_matches_streaming_path():
+    assert render_catalog(parse()) == convert_data_to_html(io.StringIO(CSV_TEXT))
+
+def test_serialization_round_trips():
+    catalog = parse()
+    for restored in (Catalog.from_json(catalog.to_json()), Catalog.from_bytes(catalog.to_bytes())):
+        assert [(s.title, s.sid) for s in restored.sections] == [(s.title, s.sid) for s in catalog.sections]
+        assert list(restored.items()) == list(catalog.items())
+
+def test_binary_handles_large_values():
+    catalog = Catalog([Section(None, None, [Item("Truffle", "$9999999999", "", 999999999900)])])
+    restored = Catalog.from_bytes(catalog.to_bytes())
+    assert list(restored.items()) == list(catalog.items())
+
+def test_virtual_mode_ships_data_not_rows():
+    html = convert_data_to_html(io.StringIO(CSV_TEXT), mode="virtual")
+    assert "<span class=\"cg-name\">Kombucha</span>" not in html
+    assert html.count("<div class='cg-vlist'></div>") == 3
+    assert '"Soup - Cabbage Roll (sm)","$6.99"' in html
+    # Nav still comes from the section headers
+    assert "{Title: 'BAKERY', Id: 'bakery'}" in html
+
+def test_rows_carry_item_id_and_cents():
+    kombucha = [item for item in parse().items() if item.name == "Kombucha"][0]
+    row = render_item(kombucha)
+    assert f'data-id="{item_id("Kombucha")}"' in row
+    assert 'data-cents="599 2 599 2"' in row
+    # The page's delegated listener handles the buttons; rows carry no handlers of their own
+    assert "onclick" not in row and 'data-act="add"' in row
+    assert "onclick=\"updateQty" not in convert_data_to_html(io.StringIO(CSV_TEXT))
+
+def test_item_ids_are_stable_and_distinct():
+    assert item_id("Kombucha") == item_id("Kombucha")
+    assert re.fullmatch(r"[0-9a-f]{10}", item_id("Kombucha"))
+    assert len({item_id(item.name) for item in parse().items()}) == len(list(parse().items()))
+
+def test_virtual_data_matches_row_attributes():
+    data = catalog_to_page_data(parse())
+    cookies = [row for section in data['sections'] for row in section if row[0] == "Cookies"][0]
+    assert cookies[7] == item_id("Cookies")
+    assert cookies[8] == [200, 1, 165, 1]
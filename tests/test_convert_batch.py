@@ -0,0 +1,98 @@
+import os
+import shutil
+from convert_menu import convert_data_to_html, open_upload
+from convert_batch import find_inputs, run_batch, output_path, Watcher, WATCH_DEBOUNCE
+
+SAMPLE_CSV = "Core Goods Product List - Sheet1.csv"
+
+def quiet(*args):
+    pass
+
+def make_inputs(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    shutil.copy(SAMPLE_CSV, src / "store-a.csv")
+    (src / "store-b.csv").write_text("BEVERAGES,,,\nRoot Beer,$2.99,Barmy Soda (Pittsburgh),\n", encoding="utf-8")
+    (src / "notes.txt").write_text("not a csv", encoding="utf-8")
+    return src
+
+def test_find_inputs_takes_dirs_globs_and_files(tmp_path):
+    src = make_inputs(tmp_path)
+    found = find_inputs([str(src), str(src / "store-*.csv"), str(src / "store-a.csv")])
+    assert [os.path.basename(p) for p in found] == ["store-a.csv", "store-b.csv"]
+
+def test_batch_output_matches_the_app(tmp_path):
+    src = make_inputs(tmp_path)
+    out = tmp_path / "site"
+    results = run_batch(find_inputs([str(src)]), str(out), workers=2, log=quiet)
+    assert all(not r['skipped'] for r in results.values())
+    for path in results:
+        with open(path, "rb") as f:
+            expected = convert_data_to_html(open_upload(f.read()))
+        with open(output_path(path, str(out)), "r", encoding="utf-8", newline="") as f:
+            assert f.read() == expected
+
+def test_unchanged_inputs_are_skipped(tmp_path):
+    src = make_inputs(tmp_path)
+    out = str(tmp_path / "site")
+    inputs = find_inputs([str(src)])
+    run_batch(inputs, out, workers=1, log=quiet)
+
+    (src / "store-b.csv").write_text("BEVERAGES,,,\nGinger Ale,$2.49,,\n", encoding="utf-8")
+    results = run_batch(inputs, out, workers=1, log=quiet)
+    assert results[str(src / "store-a.csv")]['skipped']
+    assert not results[str(src / "store-b.csv")]['skipped']
+    assert "Ginger Ale" in (tmp_path / "site" / "store-b.html").read_text(encoding="utf-8")
+
+    results = run_batch(inputs, out, workers=1, force=True, log=quiet)
+    assert not any(r['skipped'] for r in results.values())
+
+def test_a_bad_file_does_not_stop_the_batch(tmp_path):
+    src = make_inputs(tmp_path)
+    missing = str(src / "gone.csv")
+    results = run_batch([missing, str(src / "store-b.csv")], str(tmp_path / "site"), workers=1, log=quiet)
+    assert 'error' in results[missing]
+    assert not results[str(src / "store-b.csv")]['skipped']
+
+def test_watch_rebuilds_a_changed_file_once_it_settles(tmp_path):
+    src = make_inputs(tmp_path)
+    out = tmp_path / "site"
+    watcher = Watcher([str(src)], str(out), log=quiet)
+    assert len(watcher.poll(now=0)) == 2  # the first poll builds everything
+
+    csv_b = src / "store-b.csv"
+    csv_b.write_text("BEVERAGES,,,\nRoot Beer,$2.99,Barmy Soda (Pittsburgh),\nGinger Ale,$2.49,,\n", encoding="utf-8")
+    assert watcher.poll(now=100) == []  # still inside the debounce window
+    assert watcher.poll(now=100 + WATCH_DEBOUNCE) == [str(csv_b)]
+    page = (out / "store-b.html").read_text(encoding="utf-8")
+    assert "Ginger Ale" in page
+    assert page == convert_data_to_html(open_upload(csv_b.read_bytes()))
+    # The unchanged row came from the fragment cache
+    assert watcher.fragments[str(csv_b)].hits == 1 and watcher.fragments[str(csv_b)].misses == 1
+
+def test_watch_skips_a_save_that_changed_nothing(tmp_path):
+    src = make_inputs(tmp_path)
+    logged = []
+    watcher = Watcher([str(src)], str(tmp_path / "site"), log=logged.append)
+    watcher.poll(now=0)
+    csv_a = src / "store-a.csv"
+    os.utime(csv_a, ns=(0, 0))
+    assert watcher.poll(now=100 + WATCH_DEBOUNCE) == []
+    assert watcher.poll(now=200) == [str(csv_a)]
+    assert logged[-1].endswith("unchanged, skipped")
+
+def test_publish_rebuild_counts_each_row_once(tmp_path):
+    src = make_inputs(tmp_path)
+    watcher = Watcher([str(src / "store-b.csv")], str(tmp_path / "site"), publish=True,
+                      history=str(tmp_path / "h.db"), log=quiet)
+    watcher.poll(now=0)
+    cache = watcher.fragments[str(src / "store-b.csv")]
+    # The price history and the page both go through the cache, and there is no second
+    # conversion for the size report: one cold row is one miss and nothing else
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    (src / "store-b.csv").write_text("BEVERAGES,,,\nRoot Beer,$2.99,Barmy Soda (Pittsburgh),\nGinger Ale,$2.49,,\n",
+                                     encoding="utf-8")
+    watcher.poll(now=100)
+    assert watcher.poll(now=100 + WATCH_DEBOUNCE) == [str(src / "store-b.csv")]
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,30 @@
+import io
+from convert_menu import convert_data_to_html, FragmentCache
+
+WEEK_1 = """PRODUCE,,,
+Item,Price,Notes,
+Apples - Honeycrisp,$2.99 / lb,local,
+Soup - Cabbage Roll,$6.99 sm / $12.99 lg,vegan & gluten-free,
+"""
+WEEK_2 = WEEK_1 + "Pears - Bosc,$3.29 / lb,organic,\n"
+
+def test_unchanged_rows_are_reused(tmp_path):
+    path = str(tmp_path / "fragments.json")
+
+    first = FragmentCache(path)
+    convert_data_to_html(io.StringIO(WEEK_1), first)
+    first.save()
+    assert (first.hits, first.misses) == (0, 2)
+
+    second = FragmentCache(path)
+    html = convert_data_to_html(io.StringIO(WEEK_2), second)
+    assert (second.hits, second.misses) == (2, 1)
+    # Cached rows render exactly like fresh ones
+    assert html == convert_data_to_html(io.StringIO(WEEK_2))
+
+def test_damaged_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "fragments.json"
+    path.write_text("{not json", encoding="utf-8")
+    cache = FragmentCache(str(path))
+    convert_data_to_html(io.StringIO(WEEK_1), cache)
+    assert cache.misses == 2
@@ -1,5 +1,6 @@
 import pytest
 from playwright.sync_api import Page, expect
+import io
 import os
 import re
 
@@ -102,4 +103,148 @@ def test_cart_modal_flow(menu_page: Page):
     
     # Close Cart
     menu_page.locator(".cg-close-btn").click()
-    expect(modal).not_to_have_class(re.compile(r"open"))
\ No newline at end of file
+    expect(modal).not_to_have_class(re.compile(r"open"))
+
+def test_row_and_cart_line_stay_in_sync(menu_page: Page):
+    """Row +/- and the cart modal's +/- change the same entry; at zero the row gets its + back"""
+    row = menu_page.locator(".cg-item-row", has=menu_page.locator(".cg-add-btn")).first
+    row.locator(".cg-add-btn").click()
+    row.locator(".cg-qty-btn").nth(1).click()
+    expect(row.locator(".cg-qty-val")).to_have_text("2")
+    expect(menu_page.locator("#cartCount")).to_have_text("2")
+
+    menu_page.locator("#checkoutBar").click()
+    expect(menu_page.locator(".cg-cart-item")).to_have_count(1)
+    menu_page.locator(".cg-cart-controls .cg-qty-btn").nth(0).click()
+    expect(menu_page.locator(".cg-cart-controls .cg-qty")).to_have_text("1")
+    expect(row.locator(".cg-qty-val")).to_have_text("1")
+    menu_page.locator(".cg-cart-controls .cg-qty-btn").nth(0).click()
+    expect(menu_page.locator(".cg-cart-item")).to_have_count(0)
+    expect(menu_page.locator("#cartList")).to_contain_text("Your cart is empty")
+    expect(row.locator(".cg-add-btn")).to_be_visible()
+    expect(menu_page.locator("#cartTotal")).to_have_text("$0.00")
+
+def test_bulk_threshold_uses_cent_totals(menu_page: Page):
+    """$2/each or $1.65/each for 6+: six bagels are $9.90, not $12.00 or $9.899999"""
+    row = menu_page.locator(".cg-item-row", has_text="Asiago")
+    row.locator(".cg-add-btn").click()
+    for _ in range(5):
+        row.locator(".cg-qty-btn").nth(1).click()
+    expect(menu_page.locator("#cartTotal")).to_have_text("$9.90")
+
+# --- LARGE-MENU (VIRTUALIZED) MODE ---
+VIRTUAL_HTML_PATH = os.path.abspath("tests/sample_menu_virtual.html")
+
+@pytest.fixture(scope="function")
+def virtual_page(page: Page):
+    page.goto(f"file://{VIRTUAL_HTML_PATH}")
+    return page
+
+def test_virtual_rows_render_and_add_to_cart(virtual_page: Page):
+    """Rows near the viewport are built from the JSON data and the cart still works"""
+    rows = virtual_page.locator(".cg-item-row")
+    expect(rows.first).to_be_visible()
+
+    virtual_page.locator(".cg-add-btn").first.click()
+    expect(virtual_page.locator(".cg-qty-val").first).to_have_text("1")
+    expect(virtual_page.locator("#cartCount")).to_have_text("1")
+
+def test_search_matches_word_prefixes(menu_page: Page):
+    """Every query word has to start a word of the item's name or notes, in any order"""
+    menu_page.locator("#cgSearch").fill("garlic humm")
+    menu_page.wait_for_timeout(300)
+    visible = [t for t in menu_page.locator(".cg-item-row:visible .cg-name").all_inner_texts()]
+    assert visible and all("Hummus" in t and "Garlic" in t for t in visible)
+
+    menu_page.locator("#cgSearch").fill("")
+    menu_page.wait_for_timeout(300)
+    assert menu_page.locator(".cg-item-row:visible").count() == menu_page.locator(".cg-item-row").count()
+
+def test_virtual_search_filters_data(virtual_page: Page):
+    """Searching rebuilds the lists from the data, so non-matching rows are never built"""
+    virtual_page.locator("#cgSearch").type("zzzzzz", delay=50)
+    virtual_page.wait_for_timeout(300)
+    assert virtual_page.locator(".cg-item-row").count() == 0
+
+    virtual_page.locator("#cgSearch").fill("hummus")
+    virtual_page.wait_for_timeout(300)
+    expect(virtual_page.locator(".cg-item-row").first).to_contain_text("Hummus")
+
+def test_virtual_cart_modal_controls(virtual_page: Page):
+    virtual_page.locator(".cg-add-btn").first.click()
+    virtual_page.locator("#checkoutBar").click()
+    virtual_page.locator(".cg-cart-controls .cg-qty-btn").nth(1).click()
+    expect(virtual_page.locator(".cg-cart-controls .cg-qty")).to_have_text("2")
+
+@pytest.fixture(scope="function")
+def sharded_page(page: Page, tmp_path):
+    """The sharded site is served over HTTP: pages can't fetch() their shards from file://"""
+    import functools, http.server, threading
+    from convert_menu import publish_page
+    with open("Core Goods Product List - Sheet1.csv", "rb") as f:
+        publish_page(f.read(), str(tmp_path), mode="sharded")
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    page.goto(f"http://127.0.0.1:{server.server_port}/core_goods_menu.html")
+    yield page
+    server.shutdown()
+
+def test_sharded_search_loads_sections_and_keeps_the_cart(sharded_page: Page):
+    """A search fetches the shards it matches, and the cart carries across shards"""
+    sharded_page.locator(".cg-add-btn").first.click()
+    expect(sharded_page.locator("#cartCount")).to_have_text("1")
+
+    # The last row of the sheet, far below the shards loaded at first
+    sharded_page.locator("#cgSearch").fill("turmeric chai")
+    row = sharded_page.locator(".cg-item-row:visible", has_text="Turmeric Chai")
+    expect(row).to_have_count(1)
+    row.locator(".cg-add-btn").click()
+    expect(sharded_page.locator("#cartCount")).to_have_text("2")
+
+    sharded_page.locator("#cgSearch").fill("")
+    sharded_page.wait_for_timeout(300)
+    expect(sharded_page.locator(".cg-qty-val").first).to_have_text("1")
+
+def test_cart_survives_a_reload(menu_page: Page):
+    """The cart is saved in localStorage and restored with the rows' own prices"""
+    menu_page.locator(".cg-add-btn").first.click()
+    menu_page.locator(".cg-qty-btn").nth(1).click()
+    total = menu_page.locator("#cartTotal").text_content()
+
+    menu_page.reload()
+    expect(menu_page.locator(".cg-qty-val").first).to_have_text("2")
+    expect(menu_page.locator("#cartCount")).to_have_text("2")
+    expect(menu_page.locator("#cartTotal")).to_have_text(total)
+
+    menu_page.on("dialog", lambda dialog: dialog.accept())
+    menu_page.locator("#checkoutBar").click()
+    menu_page.locator(".cg-empty-btn").click()
+    menu_page.reload()
+    expect(menu_page.locator(".cg-qty-val")).to_have_count(0)
+
+def test_saved_cart_takes_the_new_menus_prices(page: Page, tmp_path):
+    """On a large-menu page, restored items are priced from the menu's data even when their rows
+    aren't built, and items the new menu doesn't list are dropped"""
+    from convert_menu import convert_data_to_html
+    filler = "".join(f"Filler {i},$1.00,,\n" for i in range(300))
+    path = tmp_path / "menu.html"
+
+    def write(rows):
+        path.write_text(convert_data_to_html(io.StringIO("GOODS,,,\n" + filler + rows), mode="virtual"),
+                        encoding="utf-8")
+
+    write("Zucchini Bread,$5.00,,\nYak Butter,$3.00,,\n")
+    page.goto(f"file://{path}")
+    for term in ("zucchini", "yak"):
+        page.locator("#cgSearch").fill(term)
+        page.wait_for_timeout(300)
+        page.locator(".cg-add-btn").first.click()
+    expect(page.locator("#cartTotal")).to_have_text("$8.00")
+
+    write("Zucchini Bread,$6.00,,\n")
+    page.reload()
+    # Both rows are far below the screen, so neither is built
+    expect(page.locator(".cg-item-row", has_text="Zucchini")).to_have_count(0)
+    expect(page.locator("#cartCount")).to_have_text("1")
+    expect(page.locator("#cartTotal")).to_have_text("$6.00")
@@ -0,0 +1,108 @@
+import io
+import os
+import re
+import pytest
+from convert_menu import convert_data_to_html, catalog_to_page_data, parse_catalog, FragmentCache, Item
+from convert_batch import run_batch, Watcher, WATCH_DEBOUNCE
+from product_images import ImageLibrary, slug, IMAGE_WIDTHS
+
+Image = pytest.importorskip("PIL.Image")
+
+ROWS = "SPREADS,,,\nHummus - Roasted Garlic,$4.49,vegan,\nChili,$4.99 sm / $8.99 lg,,\nOat Milk,$5.49,carton.png,\nBread,$4,,\n"
+
+def quiet(*args):
+    pass
+
+def make_photos(tmp_path):
+    photos = tmp_path / "photos"
+    photos.mkdir()
+    Image.new("RGB", (800, 600), (200, 80, 40)).save(photos / "hummus-roasted-garlic.jpg")
+    Image.new("RGB", (100, 100), (20, 80, 200)).save(photos / "chili.jpg")
+    Image.new("RGBA", (400, 400), (0, 0, 0, 0)).save(photos / "carton.png")
+    (photos / "broken.jpg").write_bytes(b"not a photo")
+    return photos
+
+def test_photos_are_resized_and_matched_to_items(tmp_path):
+    library = ImageLibrary(str(make_photos(tmp_path)), str(tmp_path / "site")).update()
+    assert library.processed == 3 and list(library.errors) == ["broken.jpg"]
+    hummus = library.find(Item("Hummus - Roasted Garlic", "$4.49", "vegan"))
+    assert [width for _, width in hummus.files] == list(IMAGE_WIDTHS)
+    assert (hummus.width, hummus.height) == (800, 600) and hummus.placeholder.startswith("data:image/webp;base64,")
+    for url, width in hummus.files:
+        with Image.open(tmp_path / "site" / url) as image:
+            assert image.format == "WEBP" and image.size == (width, width * 3 // 4)
+    # Never scaled up; sizes fall back to the base name; a file named in the notes wins
+    assert [width for _, width in library.find(Item("Chili (lg)", "$8.99", "")).files] == [80]
+    assert library.find(Item("Oat Milk", "$5.49", "carton.png")).files[-1][1] == 320
+    assert library.find(Item("Bread", "$4", "")) is None
+    assert slug("Mac &amp; Cheese (qt)") == "mac-cheese-qt"
+
+def test_unchanged_photos_are_not_processed_again(tmp_path):
+    photos = make_photos(tmp_path)
+    ImageLibrary(str(photos), str(tmp_path / "site")).update()
+    again = ImageLibrary(str(photos), str(tmp_path / "site")).update()
+    assert again.processed == 0
+    # A copy under another name is the same content
+    (photos / "bread.jpg").write_bytes((photos / "chili.jpg").read_bytes())
+    Image.new("RGB", (300, 300), (0, 200, 0)).save(photos / "chili.jpg")
+    changed = ImageLibrary(str(photos), str(tmp_path / "site")).update()
+    assert changed.processed == 1 and changed.version() != again.version()
+    # load() only reads the saved index: it doesn't even look at the photo folder
+    for photo in photos.iterdir():
+        photo.unlink()
+    loaded = ImageLibrary(str(photos), str(tmp_path / "site")).load()
+    assert loaded.version() == changed.version() and loaded.by_name.keys() == changed.by_name.keys()
+
+def test_a_photo_too_large_to_decode_is_reported_not_fatal(tmp_path, monkeypatch):
+    photos = make_photos(tmp_path)
+    Image.new("RGB", (300, 300), (0, 0, 0)).save(photos / "bread.jpg")
+    # Over twice the limit is an error, not just a warning
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 300 * 300 // 2 - 1)
+    library = ImageLibrary(str(photos), str(tmp_path / "site")).update()
+    assert "DecompressionBombError" in library.errors["bread.jpg"]
+    assert library.find(Item("Chili", "$4.99", "")) is not None
+
+def test_rows_get_lazy_responsive_images(tmp_path):
+    library = ImageLibrary(str(make_photos(tmp_path)), str(tmp_path / "site")).update()
+    page = convert_data_to_html(io.StringIO(ROWS), images=library)
+    tags = re.findall(r"<img [^>]+>", page)
+    assert len(tags) == 4  # both sizes of the chili
+    assert all('loading="lazy"' in tag and "srcset=" in tag and 'width="80"' in tag and "data:image/webp" in tag
+               for tag in tags)
+    assert 'height="60"' in tags[0]
+    cache = FragmentCache(str(tmp_path / "f.json"))
+    convert_data_to_html(io.StringIO(ROWS), cache)
+    assert convert_data_to_html(io.StringIO(ROWS), cache, images=library) == page
+    rows = [row for section in catalog_to_page_data(parse_catalog(io.StringIO(ROWS)), images=library)['sections']
+            for row in section]
+    assert [len(row) for row in rows] == [11, 11, 11, 11, 9]
+    # Without photos, pages are the same as before
+    assert "<img" not in convert_data_to_html(io.StringIO(ROWS))
+
+def test_batch_adds_photos(tmp_path):
+    photos = make_photos(tmp_path)
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "menu.csv").write_text(ROWS, encoding="utf-8")
+    out = tmp_path / "site"
+    run_batch([str(src / "menu.csv")], str(out), workers=1, log=quiet, images=str(photos))
+    page = (out / "menu.html").read_text(encoding="utf-8")
+    assert all(os.path.exists(out / url) for url in re.findall(r'src="(images/[^"]+)"', page))
+    # A changed photo rebuilds the page even though the sheet didn't change
+    Image.new("RGB", (300, 300), (0, 200, 0)).save(photos / "chili.jpg")
+    results = run_batch([str(src / "menu.csv")], str(out), workers=1, log=quiet, images=str(photos))
+    assert not results[str(src / "menu.csv")]['skipped']
+
+def test_watch_rebuilds_when_a_photo_changes(tmp_path):
+    photos = make_photos(tmp_path)
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "menu.csv").write_text(ROWS, encoding="utf-8")
+    out = tmp_path / "site"
+    watcher = Watcher([str(src)], str(out), log=quiet, images=str(photos))
+    assert watcher.poll(now=0) == [str(src / "menu.csv")]
+    assert len(re.findall(r"<img ", (out / "menu.html").read_text(encoding="utf-8"))) == 4
+    Image.new("RGB", (200, 200), (90, 60, 30)).save(photos / "bread.jpg")
+    assert watcher.poll(now=100) == []   # still settling
+    assert watcher.poll(now=100 + WATCH_DEBOUNCE) == [str(src / "menu.csv")]
+    assert len(re.findall(r"<img ", (out / "menu.html").read_text(encoding="utf-8"))) == 5
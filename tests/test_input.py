@@ -0,0 +1,50 @@
+import io
+import codecs
+import pytest
+from convert_menu import (convert_data_to_html, open_upload, map_input, detect_encoding, parse_catalog,
+                          ENCODING_SNIFF_BYTES)
+
+SAMPLE_CSV = "Core Goods Product List - Sheet1.csv"
+ROWS = "BEVERAGES,,,\nCrème Soda,$2.99,Barmy Soda (Pittsburgh),\n"
+
+def names(stream):
+    with stream:
+        return [item.name for section in parse_catalog(stream).sections for item in section.items]
+
+def test_streamed_upload_matches_decoding_it_whole():
+    with open(SAMPLE_CSV, "rb") as f:
+        data = f.read()
+    with open_upload(data) as stream:
+        assert convert_data_to_html(stream) == convert_data_to_html(
+            io.StringIO(data.decode("utf-8", errors='replace')))
+
+@pytest.mark.parametrize("data", [
+    ROWS.encode("utf-8"),
+    codecs.BOM_UTF8 + ROWS.encode("utf-8"),  # Excel's "CSV UTF-8"
+    ROWS.encode("cp1252"),                   # Excel's plain "CSV" on Windows
+    ROWS.encode("utf-16"),
+])
+def test_encodings_and_boms_are_detected(data):
+    assert names(open_upload(data)) == ["Crème Soda"]
+
+def test_utf8_cut_at_the_end_of_the_sample_is_still_utf8():
+    data = b"a" * (ENCODING_SNIFF_BYTES - 1) + "é".encode("utf-8")
+    assert detect_encoding(data) == "utf-8"
+
+def test_oversized_input_is_refused(tmp_path):
+    with pytest.raises(ValueError, match="limit"):
+        open_upload(ROWS.encode("utf-8"), max_bytes=10)
+    path = tmp_path / "big.csv"
+    path.write_bytes(ROWS.encode("utf-8"))
+    with pytest.raises(ValueError, match="limit"):
+        with map_input(str(path), max_bytes=10):
+            pass
+
+def test_mapped_input_can_be_closed_after_parsing(tmp_path):
+    path = tmp_path / "menu.csv"
+    path.write_bytes(ROWS.encode("utf-8"))
+    (tmp_path / "empty.csv").write_bytes(b"")
+    with map_input(str(path)) as data:
+        assert names(open_upload(data)) == ["Crème Soda"]
+    with map_input(str(tmp_path / "empty.csv")) as data:
+        assert names(open_upload(data)) == []
@@ -0,0 +1,22 @@
+import io
+from convert_menu import convert_data_to_html, convert_parallel, split_at_sections, Section
+from generate_sample import write_synthetic_csv
+
+SAMPLE_CSV = "Core Goods Product List - Sheet1.csv"
+
+def test_parallel_page_is_identical():
+    with open(SAMPLE_CSV, "r", encoding="utf-8") as f:
+        text = f.read()
+    assert convert_parallel(io.StringIO(text), workers=2, chunk_rows=7) == convert_data_to_html(io.StringIO(text))
+
+    synthetic = io.StringIO()
+    write_synthetic_csv(synthetic, 3000, seed=3)
+    text = synthetic.getvalue()
+    assert convert_parallel(io.StringIO(text), workers=2, chunk_rows=250) == convert_data_to_html(io.StringIO(text))
+
+def test_pre_scan_finds_headers_and_numbers_repeats():
+    rows = [["SOUPS", ""], ["Minestrone", "$4.99"], ["TURN YOUR PHONE SIDEWAYS", ""],
+            ["SOUPS", ""], ["Chili", "$5.99"], ["Bread", "$3"], ["SOUPS", ""]]
+    parts = split_at_sections(rows, chunk_rows=1)
+    assert [p.sid if isinstance(p, Section) else len(p) for p in parts] == \
+        ["soups", 1, 1, "soups-x", 1, 1, "soups-x-x"]
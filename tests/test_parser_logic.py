@@ -1,5 +1,5 @@
 import pytest
-from convert_menu import parse_price_info, generate_badges, SKIP_PHRASES
+from convert_menu import parse_price_info, generate_badges, is_junk_row, KeywordMatcher, SKIP_PHRASES
 
 # 1. TEST PRICE EXTRACTION
 def test_standard_price():
@@ -37,6 +37,18 @@ def test_no_badges():
     html = generate_badges("Regular Sourdough Bread")
     assert "span class='cg-badge'" not in html
 
+def test_badges_keep_config_order():
+    """Badges come out in BADGE_MAP order, not text order"""
+    html = generate_badges("gluten-free, vegan")
+    assert html.index("#e67c23") < html.index("#27ae60")
+
+def test_overlapping_badge_keys():
+    """A key that is a prefix of another key still matches on its own word boundary"""
+    style = {'label': 'X', 'color': '#000'}
+    matcher = KeywordMatcher({'dairy': style, 'dairy-free': style, 'free': style}, [])
+    assert matcher.find_badges("dairy-free") == ['dairy', 'dairy-free', 'free']
+    assert matcher.find_badges("dairyfree") == []
+
 # 3. TEST JUNK FILTER
 def test_skip_phrases():
     """Ensure junk rows are caught by the filter list"""
@@ -44,4 +56,8 @@ def test_skip_phrases():
     assert any(phrase in junk_row.lower() for phrase in SKIP_PHRASES)
 
     valid_row = "Sourdough Bread"
-    assert not any(phrase in valid_row.lower() for phrase in SKIP_PHRASES)
\ No newline at end of file
+    assert not any(phrase in valid_row.lower() for phrase in SKIP_PHRASES)
+
+def test_is_junk_row():
+    assert is_junk_row("core goods item list - week of 1/28/26")
+    assert not is_junk_row("sourdough bread")
\ No newline at end of file
@@ -0,0 +1,89 @@
+import io
+import os
+import datetime
+from convert_menu import (parse_catalog, convert_data_to_html, catalog_to_page_data, render_catalog,
+                          FragmentCache, Item)
+from convert_batch import run_batch
+from price_history import PriceHistory, split_size, describe_input, week_of
+
+WEEK_1 = "SOUPS,,,\nMinestrone,$4.99,vegan,\nOat Milk,$5.49,,\nBread,2/$7,,\nChili,$4.99 sm / $8.99 lg,,\n"
+WEEK_2 = "SOUPS,,,\nMinestrone,$4.49,vegan,\nOat Milk,$5.49,,\nBread,2/$6,,\nChili,$4.99 sm / $9.49 lg,,\n"
+
+def catalog(text):
+    return parse_catalog(io.StringIO(text))
+
+def quiet(*args):
+    pass
+
+def test_changes_compare_unit_prices_with_the_last_listed_week(tmp_path):
+    with PriceHistory(str(tmp_path / "h.db")) as store:
+        store.record("store", "2026-10-05", catalog(WEEK_1))
+        store.record("store", "2026-10-12", catalog(WEEK_2))
+        changes = store.changes("store", "2026-10-12")
+        assert sorted(changes) == ["Bread", "Chili (lg)", "Minestrone"]
+        before, now = changes["Minestrone"]
+        assert (before.std_cents, now.std_cents) == (499, 449)
+        assert store.price_changes("store", "2026-10-12")["Bread"].price_str == "2/$7"
+        # Nothing to compare the first week with
+        assert store.changes("store", "2026-10-05") == {}
+        assert [week for _, week, _ in store.history("Chili (lg)")] == ["2026-10-05", "2026-10-12"]
+
+def test_recording_a_week_again_replaces_it(tmp_path):
+    with PriceHistory(str(tmp_path / "h.db")) as store:
+        store.record("store", "2026-10-05", catalog(WEEK_1))
+        store.record("store", "2026-10-12", catalog(WEEK_1))
+        store.record("store", "2026-10-12", catalog(WEEK_2))
+        assert len(store.history("Minestrone")) == 2
+        assert "Minestrone" in store.changes("store", "2026-10-12")
+
+def test_sizes_weeks_and_menus():
+    assert split_size("Chili (lg)") == ("Chili", "lg")
+    assert split_size("Salsa (Mild)") == ("Salsa (Mild)", None)
+    assert describe_input("archive/store-a-2026-10-08.csv") == ("store-a", "2026-10-05")
+    assert describe_input("2026-10-12.csv") == ("menu", "2026-10-12")
+    assert week_of(datetime.date(2026, 10, 18)) == "2026-10-12"
+
+def test_changed_prices_are_annotated_in_every_page_type(tmp_path):
+    changes = {"Minestrone": Item("Minestrone", "$4.99", "", 499)}
+    page = convert_data_to_html(io.StringIO(WEEK_2), price_changes=changes)
+    assert page.count("cg-was") == 1 and "▼ was $4.99" in page
+    assert render_catalog(catalog(WEEK_2), changes).count("cg-was") == 1
+    # From a primed cache too: the marked row is rendered again instead of taken from the cache
+    fragments = FragmentCache(str(tmp_path / "f.json"))
+    convert_data_to_html(io.StringIO(WEEK_2), fragments)
+    fragments.next_run()
+    cached = convert_data_to_html(io.StringIO(WEEK_2), fragments, price_changes=changes)
+    assert fragments.hits > 0 and cached == page and "cg-was" in cached
+    rows = [row for section in catalog_to_page_data(catalog(WEEK_2), changes)['sections'] for row in section]
+    assert [len(row) for row in rows].count(10) == 1
+    # Without changes, pages are the same as before
+    assert "cg-was" not in convert_data_to_html(io.StringIO(WEEK_2))
+
+def test_batch_records_history_and_marks_changes(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "store-2026-10-05.csv").write_text(WEEK_1, encoding="utf-8")
+    (src / "store-2026-10-12.csv").write_text(WEEK_2, encoding="utf-8")
+    history = str(tmp_path / "h.db")
+    results = run_batch(sorted(str(p) for p in src.iterdir()), str(tmp_path / "site"), workers=2,
+                        log=quiet, history=history)
+    assert [r['changes'] for r in results.values()] == [0, 3]
+    assert "▲ was $8.99" in (tmp_path / "site" / "store-2026-10-12.html").read_text(encoding="utf-8")
+    assert os.path.exists(history)
+
+def test_adding_an_earlier_week_rebuilds_the_later_page(tmp_path):
+    src, site = tmp_path / "in", str(tmp_path / "site")
+    src.mkdir()
+    history = str(tmp_path / "h.db")
+    (src / "store-2026-10-12.csv").write_text(WEEK_2, encoding="utf-8")
+    run_batch([str(src / "store-2026-10-12.csv")], site, workers=1, log=quiet, history=history)
+    assert "cg-was" not in (tmp_path / "site" / "store-2026-10-12.html").read_text(encoding="utf-8")
+    # The later sheet hasn't changed, but now there's a week to compare it with
+    (src / "store-2026-10-05.csv").write_text(WEEK_1, encoding="utf-8")
+    results = run_batch(sorted(str(p) for p in src.iterdir()), site, workers=1, log=quiet, history=history)
+    later = results[str(src / "store-2026-10-12.csv")]
+    assert not later['skipped'] and later['changes'] == 3
+    assert "cg-was" in (tmp_path / "site" / "store-2026-10-12.html").read_text(encoding="utf-8")
+    # A third run has nothing new to show
+    results = run_batch(sorted(str(p) for p in src.iterdir()), site, workers=1, log=quiet, history=history)
+    assert all(r['skipped'] for r in results.values())
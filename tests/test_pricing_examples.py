@@ -1,4 +1,4 @@
-from convert_menu import parse_price_info
+from convert_menu import parse_price_info, scan_price, tokenize_price
 
 def test_weird_formats():
     examples = [
@@ -19,4 +19,21 @@ def test_weird_formats():
         print(f"   -> Parsed: ${result['std']} (Thresh: {result['thresh']})")
         
         # Optional: Fail the test if math is wrong
-        assert result['std'] == exp_std
\ No newline at end of file
+        assert result['std'] == exp_std
+
+def test_size_splits():
+    """Multi-size rows come back as (price, label) pairs from the same scan"""
+    examples = [
+        ("$4.99 sm / $6.99 lg", [("4.99", "sm"), ("6.99", "lg")]),
+        ("$1.99 small, $3.99 large", [("1.99", "small"), ("3.99", "large")]),
+        ("$6 half pt, $11 pt (+$1.50 jar deposit)", [("6", "half"), ("11", "pt")]),
+        ("$8.49 small", [("8.49", "small")]),
+        ("$6.99 lg2", []),
+    ]
+    for text, expected in examples:
+        assert scan_price(text)[1] == expected, text
+
+
+def test_tokenizer_kinds():
+    kinds = [kind for kind, _ in tokenize_price("2 for $5.99 sm")]
+    assert kinds == ['num', 'ws', 'for', 'ws', '$', 'num', '.', 'num', 'ws', 'size']
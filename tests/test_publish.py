@@ -0,0 +1,92 @@
+import gzip
+import json
+import hashlib
+import os
+import re
+import convert_menu
+from convert_menu import (convert_data_to_html, publish_page, format_publish_report, minify_html, minify_css,
+                          open_upload, parse_catalog, iter_shards, Catalog, Section, Item, PAGE_CSS, PAGE_JS)
+
+SAMPLE_CSV = "Core Goods Product List - Sheet1.csv"
+
+def sample_bytes():
+    with open(SAMPLE_CSV, "rb") as f:
+        return f.read()
+
+def test_single_file_is_still_the_default():
+    page = convert_data_to_html(open_upload(sample_bytes()))
+    assert f"<style>{PAGE_CSS}</style>" in page
+    assert PAGE_JS in page
+    assert "<link" not in page and "<script src=" not in page
+
+def test_publish_writes_hashed_assets(tmp_path):
+    report = publish_page(sample_bytes(), str(tmp_path), mode="virtual")
+    page = (tmp_path / "core_goods_menu.html").read_text(encoding="utf-8")
+    assert "<style>" not in page and PAGE_JS not in page
+    linked = re.findall(r'(?:href|src)="(assets/[^"]+)"', page)
+    assert len(linked) == 3 and set(linked) <= set(report['artifacts'])
+    for url in linked:
+        data = (tmp_path / url).read_bytes()
+        assert hashlib.sha256(data).hexdigest()[:12] in url
+        assert gzip.decompress((tmp_path / (url + ".gz")).read_bytes()) == data
+        assert os.path.exists(tmp_path / (url + ".br")) == (convert_menu.brotli is not None)
+    assert "core_goods_menu.html" in format_publish_report(report)
+
+def test_assets_are_shared_between_pages(tmp_path):
+    first = publish_page(sample_bytes(), str(tmp_path), name="week-1")
+    second = publish_page(b"BEVERAGES,,,\nRoot Beer,$2.99,,\n", str(tmp_path), name="week-2")
+    assert [p for p in first['artifacts'] if p.startswith("assets/")] == \
+           [p for p in second['artifacts'] if p.startswith("assets/")]
+    assert len(os.listdir(tmp_path / "assets")) in (4, 6)  # css + js, with .gz (and .br)
+
+def test_minify_html_keeps_scripts_and_text():
+    page = "<div>\n    <span>a</span>\n\n    <span>b</span>\n</div>\n<script>\n  let x = 1;\n  // note\n</script>\n"
+    assert minify_html(page) == "<div>\n<span>a</span>\n<span>b</span>\n</div>\n<script>\n  let x = 1;\n  // note\n</script>\n"
+
+def test_minify_css_keeps_descendant_pseudo_selectors():
+    assert minify_css(".a :hover { color: red; }\n.b > .c , .d { margin: 0 auto; }") == \
+        ".a :hover{color:red}.b>.c,.d{margin:0 auto}"
+
+def test_sharded_site_has_every_row_once(tmp_path):
+    report = publish_page(sample_bytes(), str(tmp_path), mode="sharded")
+    page = (tmp_path / "core_goods_menu.html").read_text(encoding="utf-8")
+    assert "cg-item-row" not in page
+    srcs = re.findall(r'data-src="(shards/[^"]+)"', page)
+    assert srcs and set(srcs) <= set(report['artifacts'])
+    rows = "".join((tmp_path / src).read_text(encoding="utf-8") for src in srcs)
+    catalog = parse_catalog(open_upload(sample_bytes()))
+    assert rows.count("cg-item-row") == len(list(catalog.items()))
+    index_url = re.search(r'data-index="(shards/index\.[0-9a-f]+\.json)"', page).group(1)
+    assert json.loads((tmp_path / index_url).read_text(encoding="utf-8"))['t']
+    assert "shards/ (" in format_publish_report(report)
+
+def test_long_sections_are_split_and_shards_are_reused(tmp_path):
+    first = publish_page(sample_bytes(), str(tmp_path), name="week-1", mode="sharded")
+    second = publish_page(sample_bytes(), str(tmp_path), name="week-2", mode="sharded")
+    shards = lambda report: [p for p in report['artifacts'] if p.startswith("shards/")]
+    assert shards(first) == shards(second)
+
+    catalog = Catalog([Section("BIG", "big", [Item(f"Item {i}", "$1", "", 100) for i in range(5)])])
+    assert [(start, len(items)) for _, start, items in iter_shards(catalog, max_items=2)] == [(0, 2), (2, 2), (4, 1)]
+
+def test_offline_page_has_a_versioned_service_worker(tmp_path):
+    report = publish_page(sample_bytes(), str(tmp_path), offline=True)
+    page = (tmp_path / "core_goods_menu.html").read_text(encoding="utf-8")
+    assert '<link rel="manifest" href="core_goods_menu.webmanifest">' in page
+    assert "serviceWorker.register('core_goods_menu.sw.js'" in page
+    manifest = json.loads((tmp_path / "core_goods_menu.webmanifest").read_text(encoding="utf-8"))
+    assert manifest['start_url'] == "./core_goods_menu.html" and manifest['icons'][0]['src'] in report['artifacts']
+    worker = (tmp_path / "core_goods_menu.sw.js").read_text(encoding="utf-8")
+    precache = json.loads(re.search(r"PRECACHE = (\[.*?\]);", worker).group(1))
+    assert "core_goods_menu.html" in precache and all(os.path.exists(tmp_path / url) for url in precache)
+    assert "core_goods_menu.sw.js" in report['artifacts'] and "Offline:" in format_publish_report(report)
+
+    cache = lambda: re.search(r'const CACHE = "([^"]+)"', (tmp_path / "core_goods_menu.sw.js").read_text()).group(1)
+    before = cache()
+    publish_page(sample_bytes(), str(tmp_path), offline=True)
+    assert cache() == before
+    publish_page(b"BEVERAGES,,,\nRoot Beer,$2.99,,\n", str(tmp_path), offline=True)
+    assert cache() != before and cache().startswith("core-goods:core_goods_menu.html:")
+    # Without the option nothing changes
+    publish_page(sample_bytes(), str(tmp_path / "plain"))
+    assert "serviceWorker" not in (tmp_path / "plain" / "core_goods_menu.html").read_text(encoding="utf-8")
@@ -0,0 +1,37 @@
+from convert_menu import ResultCache, result_key
+import menu_core
+
+def test_lru_eviction_by_count():
+    cache = ResultCache(max_entries=2, max_bytes=1000)
+    cache.put("a", "A", 1)
+    cache.put("b", "B", 1)
+    cache.get("a")          # "b" is now the least recently used
+    cache.put("c", "C", 1)
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+def test_eviction_by_size():
+    cache = ResultCache(max_entries=10, max_bytes=10)
+    cache.put("a", "A", 6)
+    cache.put("b", "B", 6)
+    assert len(cache) == 1 and cache.total_bytes == 6
+    cache.put("huge", "H", 11)  # Bigger than the cap, never stored
+    assert cache.get("huge") is None
+
+def test_key_changes_with_config(monkeypatch):
+    data = b"Item,Price,Notes\nBread,$5,vegan\n"
+    before = result_key(data)
+    assert result_key(data) == before
+    # The config lives in the engine module; convert_menu only re-exports it
+    monkeypatch.setattr(menu_core, "SKIP_PHRASES", menu_core.SKIP_PHRASES + ["sold out"])
+    assert result_key(data) != before
+
+def test_key_changes_with_the_renderer(monkeypatch):
+    data = b"Item,Price,Notes\nBread,$5,vegan\n"
+    before = result_key(data)
+    monkeypatch.setattr(menu_core, "PAGE_JS", menu_core.PAGE_JS + "\n// new cart feature\n")
+    assert result_key(data) != before
+    monkeypatch.undo()
+    monkeypatch.setattr(menu_core, "FRAGMENT_VERSION", menu_core.FRAGMENT_VERSION + 1)
+    assert result_key(data) != before
@@ -0,0 +1,53 @@
+import io
+import json
+import re
+from convert_menu import SearchIndex, convert_data_to_html, parse_catalog, build_search_index
+
+CSV_TEXT = """PREPARED FOODS,,,
+Item,Price,Notes,
+Hummus - Roasted Garlic,$4.49,vegan & gluten-free,
+Soup - Cabbage Roll,$6.99 sm / $12.99 lg,vegan & gluten-free,
+BEVERAGES,,,
+Root Beer,$2.99,Barmy Soda (Pittsburgh),
+"""
+
+def embedded_index(page):
+    match = re.search(r'<script id="cgSearchIndex" type="application/json">(.*?)</script>', page)
+    return json.loads(match.group(1).replace("<\\/", "</"))
+
+def test_words_point_at_rows():
+    index = SearchIndex()
+    index.add("Hummus - Roasted Garlic", "vegan & gluten-free")
+    index.add("Root Beer", "Barmy Soda (Pittsburgh)")
+    data = json.loads(index.to_json())
+    assert data['t'] == sorted(data['t'])
+    postings = dict(zip(data['t'], data['p']))
+    assert postings['vegan'] == [0]
+    assert postings['gluten'] == [0] and postings['free'] == [0]
+    assert postings['pittsburgh'] == [1]
+    assert "-" not in postings and "&" not in postings
+
+def test_escaped_names_are_indexed_as_text():
+    index = SearchIndex()
+    index.add("Mac &amp; Cheese", "")
+    assert set(json.loads(index.to_json())['t']) == {"mac", "cheese"}
+
+def test_index_cannot_close_the_script_tag():
+    index = SearchIndex()
+    index.add("</script>", "")
+    assert "</" not in index.to_json()
+
+def test_page_embeds_index_in_row_order():
+    page = convert_data_to_html(io.StringIO(CSV_TEXT))
+    data = embedded_index(page)
+    postings = dict(zip(data['t'], data['p']))
+    # The multi-size soup splits into two rows, so Root Beer is row 3
+    assert postings['soup'] == [1, 2]
+    assert postings['beer'] == [3]
+
+def test_virtual_page_uses_the_same_row_ids():
+    static = convert_data_to_html(io.StringIO(CSV_TEXT))
+    virtual = convert_data_to_html(io.StringIO(CSV_TEXT), mode="virtual")
+    assert embedded_index(virtual) == embedded_index(static)
+    catalog = parse_catalog(io.StringIO(CSV_TEXT))
+    assert json.loads(build_search_index(catalog).to_json()) == embedded_index(static)
@@ -0,0 +1,113 @@
+import json
+import socket
+import asyncio
+import threading
+import http.client
+import pytest
+import menu_core
+from convert_menu import convert_data_to_html, parse_catalog, open_upload, Catalog
+from convert_service import ConversionService
+
+SAMPLE_CSV = "Core Goods Product List - Sheet1.csv"
+
+def sample_bytes():
+    with open(SAMPLE_CSV, "rb") as f:
+        return f.read()
+
+@pytest.fixture
+def service():
+    """A service on a free port, run by an event loop in a background thread."""
+    loop = asyncio.new_event_loop()
+    service = ConversionService(workers=1, queue=1, max_bytes=1024 * 1024)
+    server = loop.run_until_complete(service.start(port=0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    service.port = server.sockets[0].getsockname()[1]
+    service.run = lambda coroutine: asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+    yield service
+
+    async def shutdown():
+        server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    service.run(shutdown())
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    service.close()
+
+def post(service, path, body, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", service.port, timeout=30)
+    conn.request("POST", path, body, headers or {})
+    response = conn.getresponse()
+    try:
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+def test_convert_matches_the_app_and_is_cached(service):
+    status, headers, page = post(service, "/convert", sample_bytes())
+    assert status == 200 and headers['X-Cache'] == "miss"
+    assert page.decode("utf-8") == convert_data_to_html(open_upload(sample_bytes()))
+    status, again, _ = post(service, "/convert", sample_bytes())
+    assert again['X-Cache'] == "hit" and again['ETag'] == headers['ETag']
+
+    status, headers, body = post(service, "/convert", sample_bytes(), {'If-None-Match': headers['ETag']})
+    assert status == 304 and body == b""
+    status, headers, _ = post(service, "/convert?mode=virtual", sample_bytes(), {'If-None-Match': headers['ETag']})
+    assert status == 200  # another mode, another ETag
+
+def test_catalog_json(service):
+    status, headers, body = post(service, "/catalog", sample_bytes())
+    assert status == 200 and headers['Content-Type'] == "application/json"
+    assert Catalog.from_json(body.decode("utf-8")).to_json() == parse_catalog(open_upload(sample_bytes())).to_json()
+
+def test_errors_and_backpressure(service):
+    assert post(service, "/convert?mode=pdf", b"a,b\n")[0] == 400
+    assert post(service, "/nope", b"")[0] == 404
+    # Refused from the headers alone, before the body is read
+    with socket.create_connection(("127.0.0.1", service.port), timeout=30) as sock:
+        sock.sendall(b"POST /convert HTTP/1.1\r\nContent-Length: 2000000\r\n\r\n")
+        assert sock.recv(1024).startswith(b"HTTP/1.1 413 ")
+    # Every worker busy and the queue full: turned away at once, with a hint when to retry
+    service.pending = service.workers + service.queue
+    status, headers, _ = post(service, "/convert", b"BEVERAGES,,,\nRoot Beer,$2.99,,\n")
+    service.pending = 0
+    assert status == 503 and headers['Retry-After'] == "1"
+
+def test_identical_requests_share_one_conversion(service):
+    async def burst():
+        data = b"BEVERAGES,,,\nRoot Beer,$2.99,,\n"
+        return await asyncio.gather(*(service.convert("convert", data, "static", "k") for _ in range(3)))
+    results = service.run(burst())
+    assert [served for _, served in results] == ["miss", "joined", "joined"]
+    assert len({page for page, _ in results}) == 1
+
+def test_joined_requests_outlive_the_one_they_joined(service):
+    async def owner_goes_away():
+        data = b"BEVERAGES,,,\nRoot Beer,$2.99,,\n"
+        owner = asyncio.ensure_future(service.convert("convert", data, "static", "k"))
+        await asyncio.sleep(0)  # the owner registers the conversion
+        joined = asyncio.ensure_future(service.convert("convert", data, "static", "k"))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await joined
+    page, served = service.run(owner_goes_away())
+    assert served == "miss" and b"Root Beer" in page
+
+def test_metrics(service):
+    post(service, "/convert", sample_bytes())
+    conn = http.client.HTTPConnection("127.0.0.1", service.port, timeout=30)
+    conn.request("GET", "/metrics")
+    metrics = json.loads(conn.getresponse().read())
+    assert metrics['statuses'] == {'200': 1} and metrics['cache'] == {'miss': 1}
+    assert metrics['latency_ms']['p50'] > 0 and metrics['throughput_rps'] > 0
+
+def test_etag_changes_when_the_page_does(service, monkeypatch):
+    status, headers, _ = post(service, "/convert", sample_bytes())
+    # An upgrade that changes the page template: the old ETag no longer matches
+    monkeypatch.setattr(menu_core, "PAGE_JS", menu_core.PAGE_JS + "\n// new cart feature\n")
+    status, again, _ = post(service, "/convert", sample_bytes(), {'If-None-Match': headers['ETag']})
+    assert status == 200 and again['ETag'] != headers['ETag']
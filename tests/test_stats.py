@@ -0,0 +1,54 @@
+import io
+import pytest
+from convert_menu import ConversionStats, convert_data_to_html, FragmentCache
+
+CSV_TEXT = """Core Goods Item List - Week of 2/11/26 - 2/15/26,,,
+,,,
+PREPARED FOODS,,,
+Item,Price,Notes,
+Hummus - Roasted Garlic,$4.49,vegan & gluten-free,
+Soup - Cabbage Roll,$6.99 sm / $12.99 lg,vegan & gluten-free,
+Bread - Seasonal,Varies,,
+BEVERAGES,,,
+Root Beer,$2.99,Barmy Soda (Pittsburgh),
+"""
+
+def test_counts():
+    stats = ConversionStats()
+    convert_data_to_html(io.StringIO(CSV_TEXT), stats=stats)
+    assert stats.counts == {'rows': 9, 'blank rows': 1, 'junk rows': 1, 'table headers': 1, 'sections': 2,
+                            'items': 5, 'split rows': 1, 'unpriced items': 1, 'cached rows': 0}
+
+def test_stages_add_up_to_the_total():
+    stats = ConversionStats()
+    convert_data_to_html(io.StringIO(CSV_TEXT * 20), stats=stats)
+    assert stats.total_seconds > 0
+    assert sum(stats.seconds.values()) == pytest.approx(stats.total_seconds)
+    for stage in ("read", "junk filter", "headers", "price parsing", "badges", "html", "assembly"):
+        assert stats.seconds[stage] > 0, stage
+
+def test_output_is_the_same_with_stats():
+    plain = convert_data_to_html(io.StringIO(CSV_TEXT))
+    for mode in ("static", "virtual"):
+        assert convert_data_to_html(io.StringIO(CSV_TEXT), mode=mode, stats=ConversionStats()) == \
+            convert_data_to_html(io.StringIO(CSV_TEXT), mode=mode)
+    assert convert_data_to_html(io.StringIO(CSV_TEXT), stats=ConversionStats()) == plain
+
+def test_cached_rows_are_counted(tmp_path):
+    cache = FragmentCache(str(tmp_path / "fragments.json"))
+    convert_data_to_html(io.StringIO(CSV_TEXT), cache)
+    stats = ConversionStats()
+    convert_data_to_html(io.StringIO(CSV_TEXT), cache, stats=stats)
+    assert stats.counts['cached rows'] == 4
+    assert stats.counts['items'] == 5 and stats.counts['split rows'] == 1
+
+@pytest.mark.parametrize("profile", ["cprofile", "tracemalloc"])
+def test_profilers(profile):
+    stats = ConversionStats(profile)
+    convert_data_to_html(io.StringIO(CSV_TEXT), stats=stats)
+    assert stats.profile_report
+    assert (stats.peak_bytes is not None) == (profile == "tracemalloc")
+
+def test_unknown_profiler():
+    with pytest.raises(ValueError):
+        ConversionStats("perf")
@@ -0,0 +1,44 @@
+import io
+from convert_menu import (convert_data_to_html, iter_html, write_html, render_sections, render_catalog,
+                          parse_catalog, get_html_template, SearchIndex)
+
+SAMPLE_CSV = "Core Goods Product List - Sheet1.csv"
+SAMPLE_HTML = "tests/sample_menu.html"
+
+CSV_TEXT = """PREPARED FOODS,,,
+Item,Price,Notes,
+Hummus - Roasted Garlic,$4.49,vegan & gluten-free,
+Soup - Cabbage Roll,$6.99 sm / $12.99 lg,vegan & gluten-free,
+BEVERAGES,,,
+Root Beer,$2.99,Barmy Soda (Pittsburgh),
+"""
+
+def test_streamed_output_matches_full_render():
+    """Joining the streamed chunks must give exactly the page built from the parsed catalog"""
+    streamed = "".join(iter_html(io.StringIO(CSV_TEXT)))
+    assert streamed == render_catalog(parse_catalog(io.StringIO(CSV_TEXT)))
+
+def test_streamed_output_matches_the_fixture():
+    """The checked-in page the frontend tests use is what streaming the sample sheet gives"""
+    with open(SAMPLE_CSV, encoding="utf-8") as f:
+        streamed = "".join(iter_html(f))
+    with open(SAMPLE_HTML, encoding="utf-8") as f:
+        assert streamed == f.read()
+
+def test_write_html_to_file_object():
+    out = io.StringIO()
+    write_html(io.StringIO(CSV_TEXT), out)
+    html = out.getvalue()
+    assert html == render_catalog(parse_catalog(io.StringIO(CSV_TEXT)))
+    # Nav is emitted after the body, once every section has been seen
+    assert html.index("{Title: 'BEVERAGES', Id: 'beverages'}") > html.index("Root Beer")
+
+def test_render_sections_rebuilds_the_page():
+    search_index = SearchIndex()
+    body_sections = render_sections(io.StringIO(CSV_TEXT), search_index=search_index)
+    assert [(title, sid) for title, sid, _ in body_sections] == [
+        ("PREPARED FOODS", "prepared-foods"), ("BEVERAGES", "beverages")]
+    assert "Root Beer" in body_sections[1][2] and "Root Beer" not in body_sections[0][2]
+    nav = [(title, sid) for title, sid, _ in body_sections]
+    rebuilt = get_html_template(nav, "".join(html for _, _, html in body_sections), search_index)
+    assert rebuilt == convert_data_to_html(io.StringIO(CSV_TEXT))
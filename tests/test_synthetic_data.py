@@ -0,0 +1,24 @@
+import io
+from convert_menu import parse_catalog, is_junk_row
+from generate_sample import synthetic_rows, write_synthetic_csv
+
+def test_row_count_and_seed():
+    assert len(list(synthetic_rows(1000))) == 1000
+    assert list(synthetic_rows(200, seed=1)) == list(synthetic_rows(200, seed=1))
+    assert list(synthetic_rows(200, seed=1)) != list(synthetic_rows(200, seed=2))
+
+def test_sheet_has_the_real_shapes():
+    rows = list(synthetic_rows(5000))
+    assert any(row[:3] == ["Item", "Price", "Notes"] or row[:3] == ["Item", "Price", "Farm/Notes"] for row in rows)
+    assert any(is_junk_row(" ".join(row)) for row in rows)
+    assert any(not any(row) for row in rows)
+
+    text = io.StringIO()
+    write_synthetic_csv(text, 5000)
+    catalog = parse_catalog(io.StringIO(text.getvalue()))
+    items = list(catalog.items())
+    assert len(catalog.sections) > 10
+    assert any(item.bulk > 0 and item.thresh > 1 for item in items)
+    assert any(item.name.endswith(("(sm)", "(lg)", "(pt)", "(half pt)")) for item in items)
+    assert any(item.std == 0 for item in items)
+    assert not any(item.name.startswith("Core Goods Item List") for item in items)